@@ -9,6 +9,7 @@ from faker import Faker
 from core.models import StudentProfile, StaffProfile, Branch, School, ClassTime
 from academy.models import Textbook, Attendance, ClassLog
 from vocab.models import WordBook, Word, TestResult
+from vocab.grading import normalize_word_key
 from exam.models import Question, TestPaper, ExamResult, ExamResultDetail
 
 class Command(BaseCommand):
@@ -80,7 +81,7 @@ class Command(BaseCommand):
             words = []
             for i in range(50):
                 eng = fake.unique.word()
-                words.append(Word(book=word_book, number=i//10+1, english=eng, korean=fake.word()))
+                words.append(Word(book=word_book, number=i//10+1, english=eng, english_key=normalize_word_key(eng), korean=fake.word()))
             Word.objects.bulk_create(words, ignore_conflicts=True)
             self.stdout.write("✅ 단어 데이터 50개 생성")
 
@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
 from django.core.files.base import ContentFile
-from pdf2image import convert_from_bytes
+from utils.pdf_pages import PdfPages
 import re
 import io
 import platform
@@ -91,7 +91,8 @@ def upload_images_bulk(request):
 
             if filename.endswith('.pdf'):
                 try:
-                    pages = convert_from_bytes(f.read(), poppler_path=POPPLER_PATH, dpi=200, strict=False, use_cropbox=True)
+                    # 몇 장씩 나눠 렌더링 (큰 PDF 도 전체 페이지를 한 번에 메모리에 올리지 않음)
+                    pages = PdfPages(f, poppler_path=POPPLER_PATH, dpi=200, strict=False, use_cropbox=True)
                     for i, page in enumerate(pages):
                         try:
                             question_number = (i + 1) + start_offset
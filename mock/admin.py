@@ -1,6 +1,6 @@
 # mock/admin.py
 from django.contrib import admin
-from .models import MockExamInfo, MockExamQuestion, MockExam
+from .models import MockExamInfo, MockExamQuestion, MockExam, OMRJob, OMRJobPage
 
 # 1. 문항(Questions)을 모의고사 정보 안에서 바로 수정하기 위한 인라인 설정
 class QuestionInline(admin.TabularInline):
@@ -53,4 +53,27 @@ class MockExamAdmin(admin.ModelAdmin):
             'fields': ('wrong_question_numbers', 'student_answers'),
             'classes': ('collapse',) # 클릭해야 펼쳐지도록 접어두기
         }),
-    )
\ No newline at end of file
+    )
+
+
+# 4. OMR 대량 채점 작업 (run_omr_jobs 워커가 처리)
+class OMRJobPageInline(admin.TabularInline):
+    model = OMRJobPage
+    extra = 0
+    fields = ('page_number', 'is_success', 'message', 'mock_exam')
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(OMRJob)
+class OMRJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'exam_info', 'status', 'processed_pages', 'total_pages', 'success_count', 'fail_count', 'created_by', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('total_pages', 'processed_pages', 'success_count', 'fail_count', 'error', 'started_at', 'heartbeat_at', 'finished_at')
+    inlines = [OMRJobPageInline]
+    actions = ['retry_jobs']
+
+    @admin.action(description="선택한 작업 다시 처리 (저장된 페이지 다음부터)")
+    def retry_jobs(self, request, queryset):
+        count = queryset.filter(status='FAILED').update(status='PENDING', error='')
+        self.message_user(request, f"{count}개 작업을 다시 대기열에 넣었습니다.")
@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from mock.models import OMRJob
+from mock.omr_jobs import claim_next_job, process_job
+
+
+class Command(BaseCommand):
+    help = 'OMR 대량 채점 작업(업로드된 스캔 파일)을 처리하는 워커입니다. (중단된 작업은 이어서 처리, 여러 개를 띄워도 작업은 하나씩만 가져감)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기 중인 작업을 모두 처리하면 종료')
+        parser.add_argument('--job', type=int, help='이 작업만 처리 (실패한 작업 재시도 포함)')
+        parser.add_argument('--workers', type=int, help='판독 프로세스 수 (기본값: settings.MOCK_OMR_WORKERS)')
+        parser.add_argument('--interval', type=float, default=3.0, help='대기 작업이 없을 때 다시 확인하는 간격(초)')
+
+    def handle(self, *args, **options):
+        if options['job']:
+            job = OMRJob.objects.select_related('exam_info', 'created_by').filter(pk=options['job']).first()
+            if job is None:
+                raise CommandError(f"작업 #{options['job']} 이 없습니다.")
+            self._run(job, options['workers'])
+            return
+
+        self.stdout.write("OMR 워커 시작 (Ctrl+C 로 종료)")
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']: break
+                    time.sleep(options['interval'])
+                    continue
+                self._run(job, options['workers'])
+        except KeyboardInterrupt:
+            self.stdout.write("OMR 워커 종료 (처리 중이던 작업은 다음 실행 때 이어서 처리)")
+
+    def _run(self, job, workers):
+        status = process_job(job, workers=workers)
+        job.refresh_from_db()
+        message = f"작업 #{job.pk} {job.get_status_display()}: {job.processed_pages}/{job.total_pages}장 (성공 {job.success_count}, 실패 {job.fail_count})"
+        if status == 'DONE':
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.ERROR(f"{message} - {job.error}"))
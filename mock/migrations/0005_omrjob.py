@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mock', '0004_mockexam_student_answers_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OMRJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='omr_jobs/%Y/%m/', verbose_name='스캔 파일')),
+                ('status', models.CharField(choices=[('PENDING', '대기'), ('RUNNING', '처리 중'), ('DONE', '완료'), ('FAILED', '실패')], db_index=True, default='PENDING', max_length=10, verbose_name='상태')),
+                ('total_pages', models.IntegerField(default=0, verbose_name='전체 페이지 수')),
+                ('processed_pages', models.IntegerField(default=0, verbose_name='처리한 페이지 수')),
+                ('success_count', models.IntegerField(default=0, verbose_name='성공')),
+                ('fail_count', models.IntegerField(default=0, verbose_name='실패')),
+                ('error', models.TextField(blank=True, verbose_name='오류 내용')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='처리 시작')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='처리 완료')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='업로드한 선생님')),
+                ('exam_info', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='omr_jobs', to='mock.mockexaminfo', verbose_name='시험')),
+            ],
+            options={
+                'verbose_name': 'OMR 채점 작업',
+                'verbose_name_plural': 'OMR 채점 작업',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OMRJobPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.IntegerField(verbose_name='페이지')),
+                ('is_success', models.BooleanField(default=False, verbose_name='성공 여부')),
+                ('message', models.CharField(max_length=200, verbose_name='처리 로그')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='mock.omrjob')),
+                ('mock_exam', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='omr_page', to='mock.mockexam', verbose_name='저장된 성적')),
+            ],
+            options={
+                'verbose_name': 'OMR 페이지 결과',
+                'verbose_name_plural': 'OMR 페이지 결과',
+                'ordering': ['page_number'],
+                'unique_together': {('job', 'page_number')},
+            },
+        ),
+    ]
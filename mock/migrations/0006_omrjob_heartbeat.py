@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mock', '0005_omrjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='omrjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='마지막 처리 시각'),
+        ),
+    ]
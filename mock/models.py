@@ -116,6 +116,69 @@ class MockExamQuestion(models.Model):
     def __str__(self):
         return f"{self.number}번 ({self.get_category_display()})"
     
+class OMRJob(models.Model):
+    """
+    OMR 대량 채점 작업 (업로드한 스캔 파일 1개)
+    - 업로드 요청에서는 파일만 저장하고, 판독/채점은 run_omr_jobs 명령(로컬 워커)이 처리
+    - 페이지별 결과는 OMRJobPage 에 성적(MockExam)과 같은 트랜잭션으로 저장 -> 중단돼도 이어서 처리
+    """
+    STATUS_CHOICES = [
+        ('PENDING', '대기'),
+        ('RUNNING', '처리 중'),
+        ('DONE', '완료'),
+        ('FAILED', '실패'),
+    ]
+
+    exam_info = models.ForeignKey(MockExamInfo, on_delete=models.CASCADE, related_name='omr_jobs', verbose_name="시험")
+    file = models.FileField(upload_to='omr_jobs/%Y/%m/', verbose_name="스캔 파일")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', db_index=True, verbose_name="상태")
+
+    total_pages = models.IntegerField(default=0, verbose_name="전체 페이지 수")
+    processed_pages = models.IntegerField(default=0, verbose_name="처리한 페이지 수")
+    success_count = models.IntegerField(default=0, verbose_name="성공")
+    fail_count = models.IntegerField(default=0, verbose_name="실패")
+    error = models.TextField(blank=True, verbose_name="오류 내용")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name="업로드한 선생님"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="처리 시작")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="마지막 처리 시각")  # 워커가 살아있는지 확인용
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="처리 완료")
+
+    class Meta:
+        verbose_name = "OMR 채점 작업"
+        verbose_name_plural = "OMR 채점 작업"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"[{self.get_status_display()}] {self.exam_info.title} ({self.processed_pages}/{self.total_pages})"
+
+
+class OMRJobPage(models.Model):
+    """OMR 작업의 페이지별 처리 결과 (작업 + 페이지 번호당 1개 -> 같은 페이지를 두 번 저장하지 않음)"""
+    job = models.ForeignKey(OMRJob, on_delete=models.CASCADE, related_name='pages')
+    page_number = models.IntegerField(verbose_name="페이지")
+    is_success = models.BooleanField(default=False, verbose_name="성공 여부")
+    message = models.CharField(max_length=200, verbose_name="처리 로그")
+    mock_exam = models.OneToOneField(
+        MockExam, on_delete=models.SET_NULL, null=True, blank=True, related_name='omr_page', verbose_name="저장된 성적"
+    )
+
+    class Meta:
+        verbose_name = "OMR 페이지 결과"
+        verbose_name_plural = "OMR 페이지 결과"
+        ordering = ['page_number']
+        unique_together = ('job', 'page_number')
+
+    def __str__(self):
+        return self.message
+
+
 # mock/models.py (기존 코드 아래에 추가)
 
 from django.db.models.signals import post_save
@@ -3,8 +3,26 @@ import numpy as np
 import imutils
 import traceback
 
+OMR_TARGET_HEIGHT = 1600  # 판독 기준 높이 (영역 비율 / 버블 크기 필터가 이 높이 기준)
+
+
+def _filled_pixels(thresh, contour, rect):
+    """
+    마킹 여부 판정용: 컨투어 내부의 흰 픽셀 수
+    - 페이지 전체 크기 마스크 대신 컨투어의 bounding box 크기 마스크만 만들어 계산 (결과는 동일)
+    """
+    (x, y, w_box, h_box) = rect
+    roi = thresh[y:y + h_box, x:x + w_box]
+    mask = np.zeros(roi.shape, dtype="uint8")
+    cv2.drawContours(mask, [contour], -1, 255, -1, offset=(-x, -y))
+    return cv2.countNonZero(cv2.bitwise_and(roi, roi, mask=mask))
+
+
 def scan_omr(image_bytes, debug_mode=False):
     """
+    image_bytes: 이미지 파일 bytes / 파일 객체, 또는 np.ndarray (흑백 2차원 또는 BGR)
+    - 흑백 배열이 OMR_TARGET_HEIGHT 높이로 들어오면 디코딩 / 리사이즈 / 흑백 변환 없이 바로 판독
+
     [Core] OMR Engine v45 (Noise Rejection & ROI Fix)
     - 문제: 하단 영역 과다 확장으로 '감독관 확인란'을 9번 마킹으로 오인 -> 그리드 전체 밀림
     - 해결 1 (Size Filter): w, h가 55px을 넘는 큰 박스(감독관란 등)는 무조건 배제
@@ -13,28 +31,32 @@ def scan_omr(image_bytes, debug_mode=False):
     """
     try:
         # 1. 이미지 로드
-        if hasattr(image_bytes, 'read'):
-            file_bytes = np.frombuffer(image_bytes.read(), np.uint8)
+        if isinstance(image_bytes, np.ndarray):
+            image = image_bytes
         else:
-            file_bytes = np.frombuffer(image_bytes, np.uint8)
-            
-        image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-        if image is None: return None, None
+            if hasattr(image_bytes, 'read'):
+                file_bytes = np.frombuffer(image_bytes.read(), np.uint8)
+            else:
+                file_bytes = np.frombuffer(image_bytes, np.uint8)
+            image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+        if image is None or image.size == 0: return None, None
 
-        target_height = 1600
-        image = imutils.resize(image, height=target_height) 
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if image.shape[0] != OMR_TARGET_HEIGHT:
+            image = imutils.resize(image, height=OMR_TARGET_HEIGHT) 
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
         blur = cv2.GaussianBlur(gray, (5, 5), 0)
         _, thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
         
         (h, w) = gray.shape 
-        debug_img = image.copy()
+        debug_img = None
+        if debug_mode:
+            debug_img = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image.copy()
 
         # ---------------------------------------------------------
         # [Part A] 수험번호 판독 (노이즈 제거 강화)
         # ---------------------------------------------------------
-        cnts = cv2.findContours(thresh.copy(), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        cnts = cv2.findContours(thresh, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
         cnts = imutils.grab_contours(cnts)
         
         id_cnts = []
@@ -119,9 +141,7 @@ def scan_omr(image_bytes, debug_mode=False):
                         cv2.rectangle(debug_img, (x, y), (x+wb, y+hb), (255, 200, 0), 1)
 
                 for (x, y, wb, hb, c) in col:
-                    mask = np.zeros(thresh.shape, dtype="uint8")
-                    cv2.drawContours(mask, [c], -1, 255, -1)
-                    total = cv2.countNonZero(cv2.bitwise_and(thresh, thresh, mask=mask))
+                    total = _filled_pixels(thresh, c, (x, y, wb, hb))
                     
                     if total > 50: 
                         if total > max_px: max_px, best_y, best_rect = total, y, (x, y, wb, hb)
@@ -152,7 +172,7 @@ def scan_omr(image_bytes, debug_mode=False):
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (60, 5))
         closed_bottom = cv2.morphologyEx(bottom_roi, cv2.MORPH_CLOSE, kernel)
         
-        anchor_cnts = imutils.grab_contours(cv2.findContours(closed_bottom.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
+        anchor_cnts = imutils.grab_contours(cv2.findContours(closed_bottom, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
         valid_anchors = []
         for c in anchor_cnts:
             (ax, ay, aw, ah) = cv2.boundingRect(c)
@@ -173,7 +193,7 @@ def scan_omr(image_bytes, debug_mode=False):
             col_thresh = cv2.threshold(col_roi_gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
             col_dilated = cv2.dilate(col_thresh, np.ones((4, 4), np.uint8), iterations=2)
             
-            q_cnts = imutils.grab_contours(cv2.findContours(col_dilated.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
+            q_cnts = imutils.grab_contours(cv2.findContours(col_dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
             bubbles = []
             for c in q_cnts:
                 (bx, by, bw, bh) = cv2.boundingRect(c)
@@ -200,9 +220,7 @@ def scan_omr(image_bytes, debug_mode=False):
                 
                 bubbled_idx, max_px = None, 0
                 for i, (bx, by, bw, bh, c) in enumerate(row):
-                    mask = np.zeros(col_thresh.shape, dtype="uint8")
-                    cv2.drawContours(mask, [c], -1, 255, -1) 
-                    total = cv2.countNonZero(cv2.bitwise_and(col_thresh, col_thresh, mask=mask))
+                    total = _filled_pixels(col_thresh, c, (bx, by, bw, bh))
                     if total > 50:
                         if total > max_px: max_px, bubbled_idx = total, i + 1
                 if bubbled_idx:
@@ -219,11 +237,13 @@ def scan_omr(image_bytes, debug_mode=False):
         traceback.print_exc()
         return None, None
 
-def calculate_score(student_answers, exam_info):
+def calculate_score(student_answers, exam_info, questions=None):
     """
     [Logic] 채점 및 통계 계산 함수 (views.py에서 중복 제거됨)
+    - questions: 여러 장을 채점할 때 미리 읽어둔 문항 목록 (없으면 exam_info 에서 조회)
     """
-    questions = exam_info.questions.all().order_by('number')
+    if questions is None:
+        questions = exam_info.questions.all().order_by('number')
     total_score = 0
     wrong_counts = {'LISTENING': 0, 'VOCAB': 0, 'GRAMMAR': 0, 'READING': 0}
     wrong_question_numbers = [] 
@@ -0,0 +1,74 @@
+# mock/omr_batch.py
+"""
+OMR 여러 장 병렬 판독 (bulk_omr_upload)
+- scan_omr 은 DB 를 쓰지 않고 CPU 만 쓰므로 페이지별로 프로세스 풀에 나눠서 실행 (fork 방식)
+- 결과는 페이지 순서대로 돌려줌 -> 학생 조회 / 성적 저장은 호출한 프로세스에서 한 번에
+- 페이지는 iterable 로 받아서 조금씩 넘김 (utils.pdf_pages.PdfPages 와 같이 쓰면 메모리가 페이지 수에 비례하지 않음)
+- 프로세스 수: settings.MOCK_OMR_WORKERS (기본값: CPU 코어 수)
+"""
+import os
+import logging
+import platform
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from .omr import scan_omr
+
+logger = logging.getLogger(__name__)
+
+OMR_WORKERS = getattr(settings, 'MOCK_OMR_WORKERS', os.cpu_count() or 1)
+
+
+def get_poppler_path():
+    """
+    OS에 따라 Poppler 경로를 다르게 반환합니다.
+    - Windows: 개발자 PC의 로컬 경로 반환 (수정 필요!)
+    - Linux(Lightsail): None 반환 (시스템 경로 사용)
+    """
+    system_name = platform.system()
+    
+    if system_name == 'Windows':
+        # ⚠️ 본인 컴퓨터의 Poppler bin 폴더 경로로 수정해주세요!
+        # r"..." 을 사용해야 경로 에러가 안 납니다.
+        return r"C:\Program Files (x86)\poppler\Library\bin"  
+    else:
+        # 리눅스 서버(Lightsail)에서는 'apt-get install poppler-utils'로 설치하므로
+        # 별도 경로 지정이 필요 없습니다.
+        return None
+
+
+def scan_page(pil_image):
+    """
+    PIL 이미지 1장 -> (수험번호, 답안 목록) (실패 시 (None, None))
+    - JPEG 로 다시 인코딩하지 않고 흑백 배열 그대로 넘김 (판독 높이로 렌더링된 페이지는 리사이즈도 생략)
+    """
+    if pil_image.mode != 'L':
+        pil_image = pil_image.convert('L')
+    return scan_omr(np.asarray(pil_image), debug_mode=False)
+
+
+def scan_pages(images, workers=None):
+    """
+    여러 페이지 판독 -> (수험번호, 답안 목록) 을 images 순서대로 넘겨주는 generator
+    - 프로세스 풀에 동시에 넘기는 페이지는 workers * 2 장까지만
+    - workers <= 1 이면 현재 프로세스에서 순서대로 처리
+    """
+    workers = OMR_WORKERS if workers is None else workers
+    if workers <= 1:
+        for image in images:
+            yield scan_page(image)
+        return
+
+    logger.info("OMR 병렬 판독 시작 (workers=%d)", workers)
+    connections.close_all()  # fork 된 프로세스가 부모의 DB 연결을 같이 쓰지 않도록
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        pending = deque()
+        for image in images:
+            pending.append(pool.submit(scan_page, image))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
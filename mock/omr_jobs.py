@@ -0,0 +1,143 @@
+# mock/omr_jobs.py
+"""
+OMR 채점 작업(OMRJob) 처리 - run_omr_jobs 워커 명령에서 호출
+- 페이지마다 성적(MockExam) + 페이지 결과(OMRJobPage) + 작업 진행 수를 한 트랜잭션으로 저장
+- 결과가 저장된 페이지 다음부터 렌더링/판독 -> 중단된 작업도 처음부터 다시 하지 않고 이어서 처리
+- (작업, 페이지 번호)는 unique 라서 같은 페이지의 성적이 두 번 저장되지 않음
+- 워커는 조건부 update 로 작업을 가져가므로(claim) 여러 개를 띄워도 같은 작업을 동시에 처리하지 않음
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from core.models import StudentProfile
+from .models import MockExam, OMRJob, OMRJobPage
+from .omr import calculate_score, OMR_TARGET_HEIGHT
+from .omr_batch import scan_pages, get_poppler_path
+
+logger = logging.getLogger(__name__)
+
+# 이 시간 동안 진행이 없는 RUNNING 작업은 워커가 죽은 것으로 보고 다른 워커가 이어서 처리
+STALE_AFTER = timedelta(seconds=getattr(settings, 'MOCK_OMR_JOB_STALE_SECONDS', 10 * 60))
+
+
+def claim_next_job():
+    """
+    다음에 처리할 작업을 가져옴 (중단된 RUNNING 작업 먼저, 그다음 오래된 PENDING 순, 없으면 None)
+    - 상태/마지막 처리 시각이 읽은 그대로일 때만 update -> 한 워커만 성공
+    """
+    now = timezone.now()
+    candidates = OMRJob.objects.filter(
+        Q(status='PENDING') | Q(status='RUNNING', heartbeat_at__lt=now - STALE_AFTER) | Q(status='RUNNING', heartbeat_at__isnull=True)
+    ).order_by(F('started_at').asc(nulls_last=True), 'created_at').values_list('pk', 'status', 'heartbeat_at')[:10]
+
+    for pk, status, heartbeat_at in candidates:
+        claimed = OMRJob.objects.filter(pk=pk, status=status, heartbeat_at=heartbeat_at).update(
+            status='RUNNING', heartbeat_at=now
+        )
+        if claimed:
+            return OMRJob.objects.select_related('exam_info', 'created_by').get(pk=pk)
+    return None
+
+
+def open_pages(job, start):
+    """작업 파일 -> (전체 페이지 수, start 페이지부터의 페이지 iterable)"""
+    if job.file.name.lower().endswith('.pdf'):
+        from utils.pdf_pages import PdfPages
+        # 판독 높이(OMR_TARGET_HEIGHT)에 맞는 해상도의 흑백으로 바로 렌더링 (리사이즈 / 색 변환 생략)
+        pages = PdfPages(
+            job.file.path, start=start, poppler_path=get_poppler_path(),
+            grayscale=True, size=(None, OMR_TARGET_HEIGHT)
+        )
+        return len(pages), pages
+
+    from PIL import Image
+    with job.file.open('rb') as f:
+        image = Image.open(f)
+        image.load()
+    return 1, [image] if start <= 1 else []
+
+
+def build_page_result(job, page_number, scan, questions):
+    """판독 결과 1장 -> (처리 로그, 저장할 MockExam 또는 None)"""
+    student_id_str, answers = scan
+    if not student_id_str or len(student_id_str) < 4 or "?" in student_id_str:
+        return f"PAGE {page_number}: ⚠️ 수험번호 인식 실패 (값: {student_id_str})", None
+
+    matched = list(StudentProfile.objects.filter(attendance_code=student_id_str)[:2])
+    if not matched:
+        return f"PAGE {page_number}: ❌ 학생 없음 (번호: {student_id_str})", None
+    if len(matched) > 1:
+        return f"PAGE {page_number}: ❌ 같은 번호의 학생이 여러 명 (번호: {student_id_str})", None
+    student = matched[0]
+
+    if not answers or len(answers) < 10:
+        return f"PAGE {page_number}: ⚠️ 답안 인식 실패 (개수: {len(answers or [])}) - {student.name}", None
+
+    result = calculate_score(answers, job.exam_info, questions=questions)
+    exam = MockExam(
+        student=student,
+        title=job.exam_info.title,
+        exam_date=timezone.now().date(),
+        score=result['score'],
+        grade=result['grade'],
+        student_answers=result['student_answers_dict'],
+        wrong_question_numbers=result['wrong_question_numbers'],
+        wrong_listening=result['wrong_counts']['LISTENING'],
+        wrong_vocab=result['wrong_counts']['VOCAB'],
+        wrong_grammar=result['wrong_counts']['GRAMMAR'],
+        wrong_reading=result['wrong_counts']['READING'],
+        recorded_by=job.created_by
+    )
+    return f"PAGE {page_number}: ✅ {student.name} ({result['score']}점)", exam
+
+
+def save_page(job, page_number, message, exam):
+    """페이지 1장 결과 저장 (성적 + 페이지 결과 + 진행 수를 함께 커밋, 이미 저장된 페이지면 False)"""
+    try:
+        with transaction.atomic():
+            if exam is not None:
+                exam.save()
+            OMRJobPage.objects.create(
+                job=job, page_number=page_number, is_success=exam is not None, message=message, mock_exam=exam
+            )
+            OMRJob.objects.filter(pk=job.pk).update(
+                heartbeat_at=timezone.now(),
+                processed_pages=F('processed_pages') + 1,
+                success_count=F('success_count') + (1 if exam is not None else 0),
+                fail_count=F('fail_count') + (0 if exam is not None else 1),
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def process_job(job, workers=None):
+    """작업 1개 처리 (이미 결과가 있는 페이지는 건너뜀) -> 최종 상태"""
+    done = set(job.pages.values_list('page_number', flat=True))
+    start = max(done, default=0) + 1
+    OMRJob.objects.filter(pk=job.pk).update(
+        status='RUNNING', started_at=job.started_at or timezone.now(), heartbeat_at=timezone.now(),
+        finished_at=None, error=''
+    )
+    logger.info("OMR 작업 #%d 시작 (%d페이지부터)", job.pk, start)
+
+    try:
+        total, pages = open_pages(job, start)
+        OMRJob.objects.filter(pk=job.pk).update(total_pages=total)
+        questions = list(job.exam_info.questions.all().order_by('number'))
+
+        for page_number, scan in enumerate(scan_pages(pages, workers), start):
+            if page_number in done: continue
+            message, exam = build_page_result(job, page_number, scan, questions)
+            save_page(job, page_number, message, exam)
+    except Exception as e:
+        logger.exception("OMR 작업 #%d 실패", job.pk)
+        OMRJob.objects.filter(pk=job.pk).update(status='FAILED', error=str(e)[:1000], finished_at=timezone.now())
+        return 'FAILED'
+
+    OMRJob.objects.filter(pk=job.pk).update(status='DONE', finished_at=timezone.now())
+    logger.info("OMR 작업 #%d 완료", job.pk)
+    return 'DONE'
@@ -8,4 +8,5 @@ urlpatterns = [
     path('list/', views.student_list, name='student_list'),
     path('input/<int:student_id>/', views.input_score, name='input_score'),
     path('bulk-upload/', views.bulk_omr_upload, name='bulk_upload'),
+    path('bulk-upload/jobs/<int:job_id>/', views.omr_job_status, name='omr_job_status'),
 ]
\ No newline at end of file
@@ -1,34 +1,17 @@
 # mock/views.py
-import platform, json # [필수] OS 확인용 (윈도우/리눅스 구분)
+import json
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.db.models import Q
 from django.contrib import messages
-from django.utils import timezone
 from core.models import StudentProfile
-from .models import MockExam, MockExamInfo, MockExamQuestion
+from .models import MockExam, MockExamInfo, MockExamQuestion, OMRJob
 from .forms import MockExamForm
-from .omr import scan_omr, calculate_score
 
-# ---------------------------------------------------------
-# [Helper] Poppler 경로 설정 함수
-# ---------------------------------------------------------
-def get_poppler_path():
-    """
-    OS에 따라 Poppler 경로를 다르게 반환합니다.
-    - Windows: 개발자 PC의 로컬 경로 반환 (수정 필요!)
-    - Linux(Lightsail): None 반환 (시스템 경로 사용)
-    """
-    system_name = platform.system()
-    
-    if system_name == 'Windows':
-        # ⚠️ 본인 컴퓨터의 Poppler bin 폴더 경로로 수정해주세요!
-        # r"..." 을 사용해야 경로 에러가 안 납니다.
-        return r"C:\Program Files (x86)\poppler\Library\bin"  
-    else:
-        # 리눅스 서버(Lightsail)에서는 'apt-get install poppler-utils'로 설치하므로
-        # 별도 경로 지정이 필요 없습니다.
-        return None
+OMR_UPLOAD_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png')
 
 # ---------------------------------------------------------
 # [View] 학생 목록 및 개별 입력
@@ -130,8 +113,18 @@ def input_score(request, student_id):
         'standard_map_json': json.dumps(standard_map) 
     })
 
-@login_required
+def _visible_omr_jobs(user):
+    """본인이 올린 작업만 (원장/관리자 슈퍼유저는 전체) -> 로그에 학생 이름/점수가 있으므로"""
+    jobs = OMRJob.objects.select_related('exam_info')
+    return jobs if user.is_superuser else jobs.filter(created_by=user)
+
+
+@staff_member_required
 def bulk_omr_upload(request):
+    """
+    OMR 대량 채점: 업로드한 파일은 작업(OMRJob)으로 저장만 하고 판독/채점은 run_omr_jobs 워커가 처리
+    - 화면은 ?job=<id> 로 진행 상황을 조회 (새로고침 / 프록시 타임아웃과 무관)
+    """
     if request.method == 'POST':
         exam_id = request.POST.get('exam_info_id')
         uploaded_file = request.FILES.get('omr_file')
@@ -140,82 +133,40 @@ def bulk_omr_upload(request):
             messages.error(request, "시험 정보와 파일을 모두 선택해주세요.")
             return redirect('mock:bulk_upload')
 
-        exam_info = get_object_or_404(MockExamInfo, id=exam_id)
-        logs, success_count, fail_count = [], 0, 0
-
-        try:
-            filename = uploaded_file.name.lower()
-            images = []
-            
-            if filename.endswith('.pdf'):
-                try:
-                    from pdf2image import convert_from_bytes
-                    images = convert_from_bytes(uploaded_file.read(), poppler_path=get_poppler_path())
-                except ImportError:
-                    messages.error(request, "pdf2image 모듈이 없습니다.")
-                    return redirect('mock:bulk_upload')
-                except Exception as e:
-                    messages.error(request, f"PDF 변환 오류: {e}")
-                    return redirect('mock:bulk_upload')
-            else:
-                from PIL import Image
-                images = [Image.open(uploaded_file)]
-
-            for i, pil_image in enumerate(images):
-                import io
-                img_byte_arr = io.BytesIO()
-                pil_image.save(img_byte_arr, format='JPEG')
-                img_bytes = img_byte_arr.getvalue()
-
-                # [수정] scan_omr 호출 (디버그 모드는 필요시 True로 변경)
-                # 실제 운영시에는 False로 두는 것이 성능상 좋습니다.
-                student_id_str, answers = scan_omr(img_bytes, debug_mode=False)
-                
-                if not student_id_str or len(student_id_str) < 4 or "?" in student_id_str:
-                    logs.append(f"PAGE {i+1}: ⚠️ 수험번호 인식 실패 (값: {student_id_str})")
-                    fail_count += 1
-                    continue
-                
-                try:
-                    student = StudentProfile.objects.get(attendance_code=student_id_str)
-                except StudentProfile.DoesNotExist:
-                    logs.append(f"PAGE {i+1}: ❌ 학생 없음 (번호: {student_id_str})")
-                    fail_count += 1
-                    continue
-
-                if not answers or len(answers) < 10:
-                     logs.append(f"PAGE {i+1}: ⚠️ 답안 인식 실패 (개수: {len(answers)}) - {student.name}")
-                     fail_count += 1
-                     continue
-
-                result = calculate_score(answers, exam_info)
-                
-                MockExam.objects.create(
-                    student=student,
-                    title=exam_info.title,
-                    exam_date=timezone.now().date(),
-                    score=result['score'],
-                    grade=result['grade'],
-                    student_answers=result['student_answers_dict'],
-                    wrong_question_numbers=result['wrong_question_numbers'],
-                    wrong_listening=result['wrong_counts']['LISTENING'],
-                    wrong_vocab=result['wrong_counts']['VOCAB'],
-                    wrong_grammar=result['wrong_counts']['GRAMMAR'],
-                    wrong_reading=result['wrong_counts']['READING'],
-                    recorded_by=request.user
-                )
-                success_count += 1
-                logs.append(f"PAGE {i+1}: ✅ {student.name} ({result['score']}점)")
-
-            summary = f"총 {len(images)}장 처리: 성공 {success_count}, 실패 {fail_count}"
-            return render(request, 'mock/bulk_upload.html', {
-                'exams': MockExamInfo.objects.filter(is_active=True).order_by('-created_at'),
-                'logs': logs, 'summary': summary
-            })
-
-        except Exception as e:
-            messages.error(request, f"처리 중 오류: {e}")
+        if not uploaded_file.name.lower().endswith(OMR_UPLOAD_EXTENSIONS):
+            messages.error(request, "PDF 또는 이미지(jpg, png) 파일만 업로드할 수 있습니다.")
             return redirect('mock:bulk_upload')
 
+        exam_info = get_object_or_404(MockExamInfo, id=exam_id)
+        job = OMRJob.objects.create(exam_info=exam_info, file=uploaded_file, created_by=request.user)
+        return redirect(f"{reverse('mock:bulk_upload')}?job={job.id}")
+
     exams = MockExamInfo.objects.filter(is_active=True).order_by('-year', '-month')
-    return render(request, 'mock/bulk_upload.html', {'exams': exams})
+    job = None
+    if request.GET.get('job', '').isdigit():
+        job = _visible_omr_jobs(request.user).filter(id=request.GET['job']).first()
+    recent_jobs = OMRJob.objects.filter(created_by=request.user).select_related('exam_info')[:5]
+    return render(request, 'mock/bulk_upload.html', {'exams': exams, 'job': job, 'recent_jobs': recent_jobs})
+
+
+@staff_member_required
+def omr_job_status(request, job_id):
+    """
+    [API] OMR 작업 진행 상황 (bulk_upload 화면에서 폴링)
+    - after: 이미 받은 마지막 페이지 번호 -> 그 뒤 페이지 로그만 반환
+    """
+    job = get_object_or_404(_visible_omr_jobs(request.user), id=job_id)
+    try: after = int(request.GET.get('after', 0))
+    except ValueError: after = 0
+
+    pages = job.pages.filter(page_number__gt=after).values('page_number', 'is_success', 'message')
+    return JsonResponse({
+        'status': job.status,
+        'status_label': job.get_status_display(),
+        'total': job.total_pages,
+        'processed': job.processed_pages,
+        'success': job.success_count,
+        'fail': job.fail_count,
+        'error': job.error,
+        'logs': list(pages),
+    })
@@ -0,0 +1,74 @@
+# utils/pdf_pages.py
+"""
+PDF 페이지를 몇 장씩 나눠 렌더링하는 iterable (OMR 일괄 업로드 / 문제 이미지 일괄 업로드 공용)
+- convert_from_bytes 는 모든 페이지를 한 번에 PIL 이미지로 만들어서 200장짜리 스캔이면 메모리가 GB 단위가 됨
+- PDF 를 임시 파일(또는 업로드 임시 파일)로 두고 first_page/last_page 로 window 장씩만 렌더링
+  -> 메모리는 전체 페이지 수가 아니라 window 크기에 비례
+"""
+import os
+import tempfile
+from django.conf import settings
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+PDF_PAGE_WINDOW = getattr(settings, 'PDF_PAGE_WINDOW', 8)  # 한 번에 렌더링할 페이지 수
+
+
+class PdfPages:
+    """
+    for page in PdfPages(업로드 파일, poppler_path=..., dpi=200): ...  (페이지 순서대로 PIL 이미지)
+    - pdf_file: 파일 경로 / 업로드 파일 / bytes
+    - start: 이 페이지부터 렌더링 (중단된 작업을 이어서 처리할 때)
+    - len(): 전체 페이지 수 (생성할 때 pdfinfo 로 확인 -> PDF 가 깨졌으면 여기서 예외)
+    - 나머지 키워드 인자(dpi, grayscale, size, use_cropbox ...)는 pdf2image 에 그대로 전달
+    """
+
+    def __init__(self, pdf_file, window=None, start=1, poppler_path=None, **options):
+        self.window = max(1, window or PDF_PAGE_WINDOW)
+        self.start = max(1, start)
+        self.poppler_path = poppler_path
+        self.options = options
+        self._tmp = None
+
+        if isinstance(pdf_file, (str, os.PathLike)):
+            self.path = os.fspath(pdf_file)
+        elif hasattr(pdf_file, 'temporary_file_path'):
+            # 큰 업로드는 Django 가 이미 디스크에 저장해 둠 -> 복사하지 않고 그대로 사용
+            self.path = pdf_file.temporary_file_path()
+        else:
+            self._tmp = tempfile.NamedTemporaryFile(suffix='.pdf')
+            if isinstance(pdf_file, (bytes, bytearray)):
+                self._tmp.write(pdf_file)
+            elif hasattr(pdf_file, 'chunks'):
+                for chunk in pdf_file.chunks():
+                    self._tmp.write(chunk)
+            else:
+                self._tmp.write(pdf_file.read())
+            self._tmp.flush()
+            self.path = self._tmp.name
+
+        try:
+            self.page_count = pdfinfo_from_path(self.path, poppler_path=poppler_path)['Pages']
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.page_count
+
+    def __iter__(self):
+        try:
+            for first in range(self.start, self.page_count + 1, self.window):
+                last = min(first + self.window - 1, self.page_count)
+                pages = convert_from_path(
+                    self.path, first_page=first, last_page=last, poppler_path=self.poppler_path, **self.options
+                )
+                pages.reverse()
+                while pages:
+                    yield pages.pop()  # 넘겨준 페이지는 이 목록에서 바로 놓아줌
+        finally:
+            self.close()
+
+    def close(self):
+        if self._tmp is not None:
+            self._tmp.close()  # NamedTemporaryFile 은 닫으면 삭제됨
+            self._tmp = None
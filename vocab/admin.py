@@ -1,11 +1,12 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.http import HttpResponse
 from django.utils.html import format_html
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils.http import urlencode
-from .services import calculate_score
+from .regrade import regrade_results
+from .services import grading_inbox_user_ids, invalidate_grading_inbox
 
 from .models import WordBook, Word, TestResult, TestResultDetail, MonthlyTestResult, MonthlyTestResultDetail, Publisher, RankingEvent
 
@@ -16,8 +17,10 @@ User = get_user_model()
 # ==========================================
 @admin.register(WordBook)
 class WordBookAdmin(admin.ModelAdmin):
-    list_display = ('title', 'publisher', 'uploaded_by', 'created_at', 'word_list_link')
+    list_display = ('title', 'publisher', 'uploaded_by', 'created_at', 'import_status', 'word_list_link')
+    list_filter = ('import_status',)
     search_fields = ('title',)
+    readonly_fields = ('import_status', 'import_message', 'import_started_at')
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -27,6 +30,13 @@ class WordBookAdmin(admin.ModelAdmin):
         if not obj.uploaded_by:
             obj.uploaded_by = request.user
         super().save_model(request, obj, form, change)
+        if obj.import_status == 'PENDING' and obj.csv_import_deferred:
+            self.message_user(
+                request,
+                "CSV 파일이 커서 백그라운드에서 등록합니다. 'python manage.py run_wordbook_imports' 워커가 실행 중인지 확인하고, "
+                "진행 상태는 'CSV 등록 상태'에서 확인해주세요.",
+                level=messages.WARNING
+            )
     
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "uploaded_by":
@@ -114,35 +124,16 @@ class TestResultAdmin(admin.ModelAdmin):
 
     # [수정] change_view 함수는 삭제했습니다. (inlines가 그 역할을 대신합니다)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # 인라인에서 처리 여부를 직접 바꿨을 수 있음 -> 이 학생을 보는 선생님 건수만 다시 셈
+        invalidate_grading_inbox(grading_inbox_user_ids(form.instance.student))
+
     @admin.action(description='선택한 시험 결과 재채점 하기 (수정된 로직 적용)')
     def recalculate_scores(self, request, queryset):
-        success_count = 0
-        for result in queryset:
-            details = result.details.all()
-            details_data = []
-            for d in details:
-                details_data.append({
-                    'english': d.word_question,
-                    'korean': d.correct_answer,
-                    'user_input': d.student_answer
-                })
-            
-            new_score, wrong_count, processed_details = calculate_score(details_data)
-            
-            result.score = new_score
-            result.wrong_count = wrong_count
-            result.save()
-            
-            for db_detail, new_result in zip(details, processed_details):
-                if db_detail.is_correct != new_result['c']:
-                    db_detail.is_correct = new_result['c']
-                    if db_detail.is_correct:
-                        db_detail.is_resolved = True 
-                    db_detail.save()
-            
-            success_count += 1
-            
-        self.message_user(request, f"{success_count}건의 시험 결과를 재채점했습니다.")
+        # chunk 단위 일괄 재채점 (대량은 manage.py regrade_results 사용)
+        report = regrade_results(queryset)
+        self.message_user(request, f"{report.results}건의 시험 결과를 재채점했습니다. (판정 변경 답안 {report.changed_details}건)")
 
 # ==========================================
 # 5. 월말 평가 결과 (MonthlyTestResult) 관리
@@ -156,6 +147,10 @@ class MonthlyTestResultAdmin(admin.ModelAdmin):
     # [추가] 월말 평가도 답안을 볼 수 있게 인라인 추가
     inlines = [MonthlyTestResultDetailInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_grading_inbox(grading_inbox_user_ids(form.instance.student))
+
     def get_student_name(self, obj): return obj.student.name
     get_student_name.short_description = "학생 이름"
 
@@ -0,0 +1,78 @@
+# vocab/answer_cache.py
+import threading
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from .grading import compile_answer_keys
+from .models import Word
+
+# korean: {영어: 한글 뜻 원문}, candidates: {영어: frozenset(채점용 정답 후보)}
+BookAnswers = namedtuple('BookAnswers', ['korean', 'candidates'])
+
+
+class AnswerKeyCache:
+    """
+    채점용 정답지 캐시 (프로세스 내 LRU)
+    - 키: (단어장 id, answer_version) -> 단어가 바뀌면 버전이 올라가서 자동으로 새로 로드됨
+    - 값: BookAnswers (정답 원문 + 미리 계산된 정답 후보 집합)
+    """
+
+    def __init__(self, max_books=64):
+        self.max_books = max_books
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, book):
+        key = (book.pk, book.answer_version)
+        with self._lock:
+            answers = self._data.get(key)
+            if answers is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return answers
+            self.misses += 1
+
+        korean, candidates = {}, {}
+        for english, kor, keys in Word.objects.filter(book_id=book.pk).values_list('english', 'korean', 'answer_keys'):
+            korean[english] = kor
+            candidates[english] = frozenset(keys) if keys is not None else compile_answer_keys(kor or "")
+        answers = BookAnswers(korean, candidates)
+
+        with self._lock:
+            # 같은 단어장의 이전 버전은 더 이상 쓰이지 않으므로 제거
+            for old_key in [k for k in self._data if k[0] == book.pk and k != key]:
+                del self._data[old_key]
+            self._data[key] = answers
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_books:
+                self._data.popitem(last=False)
+        return answers
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'books': len(self._data),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def answers_for_words(word_ids):
+    """단어장 단위가 아닌 시험(오답모드 / 전체 월말평가)용: 출제된 단어만 조회해서 BookAnswers 구성"""
+    korean, candidates = {}, {}
+    for english, kor, keys in Word.objects.filter(id__in=word_ids).values_list('english', 'korean', 'answer_keys'):
+        korean[english] = kor
+        candidates[english] = frozenset(keys) if keys is not None else compile_answer_keys(kor or "")
+    return BookAnswers(korean, candidates)
+
+
+answer_key_cache = AnswerKeyCache(max_books=getattr(settings, 'VOCAB_ANSWER_CACHE_SIZE', 64))
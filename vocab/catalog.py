@@ -0,0 +1,92 @@
+# vocab/catalog.py
+"""
+단어장 목록 캐시 (출판사 -> 단어장 -> Day 목록 + 단어 수)
+- 메인 화면 단어장 선택 / api_get_chapters 가 같이 사용
+- 쿼리 3번(출판사, 단어장, Day별 단어 수 GROUP BY)으로 한 번에 만들고 Django cache 에 저장
+- 단어/단어장/출판사가 바뀌면 models 의 signal 에서 invalidate_catalog() (bulk 등록은 importer 에서 직접)
+- 여러 프로세스가 각자 메모리 캐시를 쓰는 경우를 위해 VOCAB_CATALOG_TTL 초 뒤에는 다시 만듦
+"""
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from .models import Publisher, WordBook, Word
+
+CATALOG_CACHE_KEY = 'vocab:catalog'
+CATALOG_TTL = getattr(settings, 'VOCAB_CATALOG_TTL', 60 * 5)
+DATE_BASED_PUBLISHER = "개인단어장"  # Day 번호가 날짜(MMDD)인 단어장
+
+
+def chapter_label(number, is_date_based):
+    if is_date_based:
+        return f"{number // 100}월 {number % 100}일"
+    return f"Day {number}"
+
+
+def build_catalog():
+    chapters = defaultdict(list)
+    rows = Word.objects.values_list('book_id', 'number').annotate(count=Count('id')).order_by('book_id', 'number')
+    for book_id, number, count in rows:
+        chapters[book_id].append((number, count))
+
+    books = {}
+    for book_id, title, publisher_id, publisher_name, uploader_id, by_superuser, created_at in WordBook.objects.values_list(
+        'id', 'title', 'publisher_id', 'publisher__name', 'uploaded_by_id', 'uploaded_by__is_superuser', 'created_at'
+    ).order_by('id'):
+        is_date_based = publisher_name == DATE_BASED_PUBLISHER
+        books[book_id] = {
+            'id': book_id,
+            'title': title,
+            'publisher_id': publisher_id,
+            'uploaded_by_id': uploader_id,
+            'by_superuser': by_superuser,
+            'created_at': created_at,
+            'is_date_based': is_date_based,
+            'word_count': sum(count for _, count in chapters[book_id]),
+            'chapters': [
+                {'value': number, 'label': chapter_label(number, is_date_based), 'count': count}
+                for number, count in chapters[book_id]
+            ],
+        }
+
+    publishers = [
+        {'id': pub_id, 'name': name, 'book_ids': [b['id'] for b in books.values() if b['publisher_id'] == pub_id]}
+        for pub_id, name in Publisher.objects.exclude(name='시스템').order_by('name').values_list('id', 'name')
+    ]
+    etc_book_ids = [
+        b['id'] for b in sorted(books.values(), key=lambda b: b['created_at'], reverse=True)
+        if b['publisher_id'] is None
+    ]
+    return {'publishers': publishers, 'etc_book_ids': etc_book_ids, 'books': books}
+
+
+def get_catalog():
+    catalog = cache.get(CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(CATALOG_CACHE_KEY, catalog, CATALOG_TTL)
+    return catalog
+
+
+def invalidate_catalog():
+    cache.delete(CATALOG_CACHE_KEY)
+
+
+def get_book_entry(book_id):
+    try: return get_catalog()['books'].get(int(book_id))
+    except (TypeError, ValueError): return None
+
+
+def visible_catalog(user):
+    """학생 화면용: 본인 또는 관리자가 올린 단어장만 -> (출판사 목록[{'id','name','books'}], 기타 단어장 목록)"""
+    catalog = get_catalog()
+    books = catalog['books']
+
+    def visible(book_ids):
+        return [
+            books[book_id] for book_id in book_ids
+            if books[book_id]['uploaded_by_id'] == user.id or books[book_id]['by_superuser']
+        ]
+
+    publishers = [{'id': p['id'], 'name': p['name'], 'books': visible(p['book_ids'])} for p in catalog['publishers']]
+    return publishers, visible(catalog['etc_book_ids'])
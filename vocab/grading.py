@@ -0,0 +1,107 @@
+# vocab/grading.py
+"""
+채점 엔진
+- 정답 후보(정규화 + 공백 제거)는 단어 저장 시 한 번만 계산해서 Word.answer_keys 에 저장
+- 채점 시에는 학생 답안 토큰만 정규화한 뒤 집합 포함 여부만 확인
+- 결과는 services.calculate_score (기준 구현)와 완전히 동일해야 합니다.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# 괄호/숫자목록/슬래시/특수문자가 하나도 없는 토큰은 clean_text 를 거쳐도 그대로이므로 정규식 3단계를 생략
+_PLAIN_TOKEN = re.compile(r'\w+')
+
+
+def clean_text(text):
+    """
+    텍스트 정제 함수 (업그레이드)
+    1. 괄호와 그 안의 내용 제거
+    2. [수정] 숫자(1. 2.)와 슬래시(/)를 모두 콤마(,)로 치환하여 정답을 분리함
+    3. 나머지 특수문자 제거
+    """
+    if not text: return ""
+    
+    # 1. 괄호와 그 안의 내용 제거 (소괄호, 대괄호)
+    text = re.sub(r'\(.*?\)|\[.*?\]', '', text)
+    
+    # 2. [핵심 수정] 숫자목록(1. 2.) 또는 슬래시(/)를 콤마로 변경
+    # 예: "신뢰, 믿음 / 신뢰하다" -> "신뢰, 믿음 , 신뢰하다"
+    text = re.sub(r'\d+\.|/', ',', text)
+    
+    # 3. 특수문자 제거 (한글, 영문, 숫자, 콤마, 공백 제외하고 모두 제거)
+    text = re.sub(r'[^\w\s,]', ' ', text)
+    
+    return text.strip()
+
+
+def normalize_word_key(text):
+    """영어 단어 비교/중복 제거용 키: 앞뒤 공백 제거 + 소문자 (Word.english_key, WordMastery.word_key)"""
+    return (text or "").strip().lower()
+
+
+def build_answer_keys(korean):
+    """
+    정답 원문 -> 비교용 후보 목록 (정렬된 list, Word.answer_keys 저장용)
+    예: "1. 회피하다 2. 외면 하다" -> ['외면하다', '회피하다']
+    """
+    cleaned = clean_text(unicodedata.normalize('NFC', korean or ""))
+    return sorted({
+        token.strip().lower().replace(" ", "")
+        for token in cleaned.split(',')
+        if token.strip()
+    })
+
+
+@lru_cache(maxsize=8192)
+def compile_answer_keys(korean):
+    """저장된 후보가 없는 정답(과거 답안지 등)용: 같은 정답 문자열은 한 번만 계산"""
+    return frozenset(build_answer_keys(korean))
+
+
+def user_answer_tokens(user_input):
+    """학생 답안 -> 비교용 토큰 목록 (콤마로 분리, 소문자, 공백/특수문자 제거)"""
+    tokens = []
+    for raw in unicodedata.normalize('NFC', user_input).split(','):
+        token = raw.strip().lower()
+        if not token: continue
+        compact = token.replace(" ", "")
+        if not _PLAIN_TOKEN.fullmatch(compact):
+            compact = clean_text(compact).replace(" ", "")
+        tokens.append(compact)
+    return tokens
+
+
+def grade_details(details_data, answer_keys=None):
+    """
+    calculate_score 와 같은 입력/출력 형식의 채점 함수
+    - answer_keys: {영어: frozenset(정답 후보)} (정답지 캐시에서 전달). 없는 단어는 item['korean'] 으로 계산
+    """
+    answer_keys = answer_keys or {}
+    score = 0
+    wrong_count = 0
+    processed_details = []
+
+    for item in details_data:
+        user_input = item.get('user_input', '') or ""
+        ans_origin = item.get('korean', '') or ""
+
+        candidates = answer_keys.get(item.get('english'))
+        if candidates is None:
+            candidates = compile_answer_keys(ans_origin)
+
+        is_correct = any(token in candidates for token in user_answer_tokens(user_input))
+
+        if is_correct:
+            score += 1
+        else:
+            wrong_count += 1
+
+        processed_details.append({
+            'q': item.get('english'),
+            'u': user_input,
+            'a': ans_origin,
+            'c': is_correct
+        })
+
+    return score, wrong_count, processed_details
@@ -0,0 +1,56 @@
+# vocab/import_jobs.py
+"""
+단어장 CSV 등록 작업 처리 - WordBook.save(작은 파일) / run_wordbook_imports 워커(큰 파일)에서 호출
+- 등록은 (book, english) 기준 update_conflicts 라서 중단된 작업을 처음부터 다시 돌려도 단어가 중복되지 않음
+- 워커는 조건부 update 로 단어장을 가져가므로(claim) 여러 개를 띄워도 같은 파일을 동시에 등록하지 않음
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .importer import import_wordbook_csv
+from .models import WordBook
+
+logger = logging.getLogger(__name__)
+
+# 이 시간이 지나도 끝나지 않은 RUNNING 작업은 워커가 죽은 것으로 보고 다른 워커가 다시 등록
+STALE_AFTER = timedelta(seconds=getattr(settings, 'VOCAB_CSV_IMPORT_STALE_SECONDS', 30 * 60))
+
+
+def claim_next_import():
+    """
+    다음에 등록할 단어장을 가져옴 (중단된 RUNNING 먼저, 그다음 오래된 PENDING 순, 없으면 None)
+    - 상태/시작 시각이 읽은 그대로일 때만 update -> 한 워커만 성공
+    """
+    now = timezone.now()
+    candidates = WordBook.objects.filter(
+        Q(import_status='PENDING') | Q(import_status='RUNNING', import_started_at__lt=now - STALE_AFTER)
+        | Q(import_status='RUNNING', import_started_at__isnull=True)
+    ).order_by(F('import_started_at').asc(nulls_last=True), 'created_at').values_list('pk', 'import_status', 'import_started_at')[:10]
+
+    for pk, status, started_at in candidates:
+        claimed = WordBook.objects.filter(pk=pk, import_status=status, import_started_at=started_at).update(
+            import_status='RUNNING', import_started_at=now
+        )
+        if claimed:
+            return WordBook.objects.get(pk=pk)
+    return None
+
+
+def run_import(book):
+    """단어장 1개의 CSV 등록 -> 최종 상태 (결과 요약은 import_message 에 저장)"""
+    WordBook.objects.filter(pk=book.pk).update(
+        import_status='RUNNING', import_started_at=book.import_started_at or timezone.now(), import_message=''
+    )
+    try:
+        report = import_wordbook_csv(book)
+    except Exception as e:
+        logger.exception("단어장 #%d CSV 등록 실패", book.pk)
+        WordBook.objects.filter(pk=book.pk).update(import_status='FAILED', import_message=str(e)[:1000])
+        book.import_status = 'FAILED'
+        return 'FAILED'
+
+    WordBook.objects.filter(pk=book.pk).update(import_status='DONE', import_message=str(report))
+    book.import_status = 'DONE'
+    return 'DONE'
@@ -0,0 +1,139 @@
+# vocab/importer.py
+"""
+단어장 CSV 가져오기 (스트리밍)
+- 인코딩은 파일 앞부분만 읽어서 한 번만 판별 (utf-8-sig / cp949)
+- 행을 generator 로 읽으면서 일정 개수씩 bulk_create -> 파일 크기와 상관없이 메모리 일정
+- 형식: Day, 영어, 뜻, (예문)  / 첫 줄은 헤더
+"""
+import codecs
+import csv
+import logging
+from io import TextIOWrapper
+from django.db import transaction
+from .catalog import invalidate_catalog
+from .grading import build_answer_keys, normalize_word_key
+from .models import Word
+from .search import index_words
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 64 * 1024
+HEADER_WORDS = ['word', 'english', '영어']
+
+
+class ImportReport:
+    """가져오기 결과: 등록 수 + 거부된 행(줄 번호, 사유)"""
+    MAX_REJECTS = 500  # 보관할 거부 행 수 (개수는 전부 셈)
+
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0
+        self.reject_count = 0
+        self.rejects = []
+
+    def reject(self, line_no, reason):
+        self.reject_count += 1
+        if len(self.rejects) < self.MAX_REJECTS:
+            self.rejects.append((line_no, reason))
+
+    def __str__(self):
+        return f"등록 {self.imported}개, 중복 {self.duplicates}개, 거부 {self.reject_count}행"
+
+
+def sniff_encoding(file_obj):
+    """파일 앞부분으로 인코딩 판별 (읽은 뒤 처음 위치로 되돌림)"""
+    file_obj.seek(0)
+    sample = file_obj.read(SNIFF_BYTES)
+    file_obj.seek(0)
+    try:
+        # final=False: 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+        codecs.getincrementaldecoder('utf-8-sig')().decode(sample, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp949'
+
+
+def iter_csv_words(book, text_stream, report):
+    """CSV 행 -> Word 객체 generator (잘못된 행은 report 에 기록하고 건너뜀)"""
+    for line_no, row in enumerate(csv.reader(text_stream), 1):
+        if line_no == 1 or not row: continue  # 헤더 / 빈 줄
+
+        if len(row) < 3:
+            report.reject(line_no, "열 부족 (Day, 영어, 뜻 필요)")
+            continue
+        if any('\ufffd' in cell for cell in row):
+            report.reject(line_no, "인코딩 오류 (깨진 글자)")
+            continue
+
+        day_str = row[0].strip()
+        eng_val = row[1].strip()
+        kor_val = row[2].strip()
+        example_val = row[3].strip() if len(row) > 3 else ""
+
+        if not eng_val or not kor_val:
+            report.reject(line_no, "영어 또는 뜻이 비어 있음")
+            continue
+        if eng_val.lower() in HEADER_WORDS: continue
+
+        try: num_val = int(day_str)
+        except ValueError: num_val = 1
+
+        yield Word(
+            book=book,
+            english=eng_val,
+            english_key=normalize_word_key(eng_val),
+            korean=kor_val,
+            number=num_val,
+            example_sentence=example_val,
+            answer_keys=build_answer_keys(kor_val)
+        )
+
+
+def import_wordbook_csv(book, file_obj=None, batch_size=500):
+    """
+    CSV 를 단어장에 등록 (배치마다 별도 트랜잭션)
+    - 같은 영어가 여러 번 나오면 기존과 같이 뒤의 행이 최종값 (update_conflicts)
+    - file_obj 를 주지 않으면 book.csv_file 사용
+    """
+    report = ImportReport()
+    own_file = file_obj is None
+    if own_file:
+        file_obj = book.csv_file.open('rb')
+
+    encoding = sniff_encoding(file_obj)
+    text_stream = TextIOWrapper(file_obj, encoding=encoding, errors='replace', newline='')
+    logger.info("단어장 '%s' CSV 가져오기 시작 (%s)", book.title, encoding)
+
+    seen = set()
+    batch = {}
+
+    def flush():
+        with transaction.atomic():
+            Word.objects.bulk_create(
+                batch.values(),
+                update_conflicts=True,
+                unique_fields=['book', 'english'],
+                update_fields=['english_key', 'korean', 'number', 'example_sentence', 'answer_keys'],
+            )
+            index_words(Word.objects.filter(book=book, english__in=list(batch)))
+        batch.clear()
+
+    try:
+        for word in iter_csv_words(book, text_stream, report):
+            if word.english in seen:
+                report.duplicates += 1
+            else:
+                seen.add(word.english)
+            batch[word.english] = word
+            if len(batch) >= batch_size: flush()
+        if batch: flush()
+    finally:
+        text_stream.detach()  # TextIOWrapper 가 원본 파일을 닫지 않도록 분리
+        if own_file: book.csv_file.close()
+
+    report.imported = len(seen)
+    if report.imported:
+        book.bump_answer_version()  # bulk_create는 signal을 보내지 않으므로 직접 증가
+        invalidate_catalog()
+    logger.info("단어장 '%s' CSV 가져오기 완료: %s", book.title, report)
+    return report
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from vocab.grading import build_answer_keys, grade_details
+from vocab.models import Word, TestResultDetail, MonthlyTestResultDetail
+from vocab.services import calculate_score
+
+
+class Command(BaseCommand):
+    help = '저장된 모든 답안을 기준 채점(calculate_score)과 새 채점 엔진(grade_details)으로 각각 채점해 결과가 같은지 검증합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk', type=int, default=2000, help='한 번에 비교할 답안 수')
+        parser.add_argument('--show', type=int, default=20, help='출력할 불일치 예시 개수')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk']
+        mismatches = []
+
+        # 1. 저장된 답안 재채점 결과 비교
+        checked = 0
+        for Detail in (TestResultDetail, MonthlyTestResultDetail):
+            rows = Detail.objects.values_list('id', 'word_question', 'correct_answer', 'student_answer').iterator(chunk_size=chunk_size)
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    mismatches += self.compare(Detail.__name__, batch)
+                    checked += len(batch)
+                    batch = []
+            if batch:
+                mismatches += self.compare(Detail.__name__, batch)
+                checked += len(batch)
+
+        # 2. Word 에 저장된 정답 후보가 현재 korean 과 일치하는지 확인 (None 은 채점 시 즉석 계산되므로 제외)
+        stale_words = 0
+        words = Word.objects.filter(answer_keys__isnull=False).values_list('id', 'english', 'korean', 'answer_keys')
+        for word_id, english, korean, keys in words.iterator(chunk_size=chunk_size):
+            if keys != build_answer_keys(korean):
+                stale_words += 1
+                mismatches.append(f"Word#{word_id} '{english}': 저장된 후보 {keys} != {build_answer_keys(korean)}")
+
+        for line in mismatches[:options['show']]:
+            self.stdout.write(self.style.WARNING(line))
+
+        summary = f"답안 {checked}건 비교, 불일치 {len(mismatches) - stale_words}건 / 정답 후보가 오래된 단어 {stale_words}개"
+        if mismatches:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(f"=== 채점 결과 일치: {summary} ==="))
+
+    def compare(self, label, rows):
+        items = [{'english': q, 'korean': a, 'user_input': u} for (_, q, a, u) in rows]
+        _, _, expected = calculate_score(items)
+        _, _, actual = grade_details(items)
+        return [
+            f"{label}#{row[0]} '{row[1]}' 답안='{row[3]}' 정답='{row[2]}': 기준={e['c']} 엔진={a['c']}"
+            for row, e, a in zip(rows, expected, actual)
+            if e['c'] != a['c']
+        ]
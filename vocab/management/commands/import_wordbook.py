@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from vocab.importer import import_wordbook_csv
+from vocab.models import WordBook
+
+
+class Command(BaseCommand):
+    help = '단어장 CSV(Day, 영어, 뜻, 예문)를 배치 단위로 등록합니다. 대용량 출판사 단어 목록용.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('book_id', type=int, help='단어를 등록할 단어장 ID')
+        parser.add_argument('--file', help='등록할 CSV 경로 (생략 시 단어장에 업로드된 CSV 사용)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            book = WordBook.objects.get(id=options['book_id'])
+        except WordBook.DoesNotExist:
+            raise CommandError(f"단어장 ID {options['book_id']} 가 없습니다.")
+
+        if options['file']:
+            with open(options['file'], 'rb') as f:
+                report = import_wordbook_csv(book, f, batch_size=options['batch_size'])
+        elif book.csv_file:
+            report = import_wordbook_csv(book, batch_size=options['batch_size'])
+        else:
+            raise CommandError("단어장에 업로드된 CSV 가 없습니다. --file 로 경로를 지정해주세요.")
+
+        for line_no, reason in report.rejects:
+            self.stdout.write(self.style.WARNING(f"  {line_no}행: {reason}"))
+        if report.reject_count > len(report.rejects):
+            self.stdout.write(self.style.WARNING(f"  ... 외 {report.reject_count - len(report.rejects)}행"))
+        self.stdout.write(self.style.SUCCESS(f"=== [{book.title}] {report} ==="))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from vocab.services import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = '도전모드 결과 전체로부터 이달의 왕 / 이벤트 랭킹 집계 테이블을 다시 계산합니다. (배포 직후 백필, 데이터 정리 후 사용)'
+
+    def handle(self, *args, **options):
+        monthly_count, event_count = rebuild_rankings()
+        self.stdout.write(self.style.SUCCESS(f"=== 랭킹 재계산 완료: 월간 {monthly_count}건, 이벤트 {event_count}개 ==="))
@@ -0,0 +1,47 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from vocab.models import TestResult, MonthlyTestResult
+from vocab.regrade import regrade_results
+
+
+class Command(BaseCommand):
+    help = '저장된 시험 답안을 현재 채점 규칙으로 일괄 재채점합니다. (채점 로직 수정 후 과거 기록에 적용, --dry-run 으로 변경 내역만 확인)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--monthly', action='store_true', help='도전모드 대신 월말평가 결과를 재채점')
+        parser.add_argument('--since', help='응시일 시작 (YYYY-MM-DD)')
+        parser.add_argument('--until', help='응시일 끝 (YYYY-MM-DD, 포함)')
+        parser.add_argument('--book', type=int, help='단어장 ID')
+        parser.add_argument('--chunk', type=int, default=500, help='한 번에 처리할 시험 결과 수')
+        parser.add_argument('--workers', type=int, default=1, help='채점 프로세스 수')
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 바뀔 답안만 출력')
+        parser.add_argument('--show', type=int, default=50, help='출력할 변경 답안 개수')
+
+    def handle(self, *args, **options):
+        model = MonthlyTestResult if options['monthly'] else TestResult
+        queryset = model.objects.all()
+        try:
+            if options['since']:
+                queryset = queryset.filter(created_at__date__gte=datetime.date.fromisoformat(options['since']))
+            if options['until']:
+                queryset = queryset.filter(created_at__date__lte=datetime.date.fromisoformat(options['until']))
+        except ValueError as e:
+            raise CommandError(f"날짜 형식 오류 (YYYY-MM-DD): {e}")
+        if options['book']:
+            queryset = queryset.filter(book_id=options['book'])
+
+        report = regrade_results(
+            queryset, chunk_size=options['chunk'], dry_run=options['dry_run'], workers=options['workers']
+        )
+
+        for c in report.diffs[:options['show']]:
+            before, after = ('X', 'O') if c.is_correct else ('O', 'X')
+            self.stdout.write(
+                f"  {model.__name__}#{c.result_id} '{c.word_question}' 답안='{c.student_answer}' "
+                f"정답='{c.correct_answer}': {before} -> {after}"
+            )
+        if report.changed_details > options['show']:
+            self.stdout.write(f"  ... 외 {report.changed_details - options['show']}건")
+
+        label = "[DRY RUN] 변경 예정" if options['dry_run'] else "재채점 완료"
+        self.stdout.write(self.style.SUCCESS(f"=== {label}: {report} ==="))
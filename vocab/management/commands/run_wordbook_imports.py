@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from vocab.models import WordBook
+from vocab.import_jobs import claim_next_import, run_import
+
+
+class Command(BaseCommand):
+    help = '큰 단어장 CSV(관리자 화면에서 자동 등록하지 않은 파일)를 등록하는 워커입니다. (여러 개를 띄워도 단어장은 하나씩만 가져감)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기 중인 단어장을 모두 등록하면 종료')
+        parser.add_argument('--book', type=int, help='이 단어장만 등록 (실패한 작업 재시도 포함)')
+        parser.add_argument('--interval', type=float, default=3.0, help='대기 작업이 없을 때 다시 확인하는 간격(초)')
+
+    def handle(self, *args, **options):
+        if options['book']:
+            book = WordBook.objects.filter(pk=options['book']).first()
+            if book is None:
+                raise CommandError(f"단어장 #{options['book']} 이 없습니다.")
+            if not book.csv_file:
+                raise CommandError(f"단어장 #{book.pk} 에 CSV 파일이 없습니다.")
+            self._run(book)
+            return
+
+        self.stdout.write("단어장 CSV 워커 시작 (Ctrl+C 로 종료)")
+        try:
+            while True:
+                book = claim_next_import()
+                if book is None:
+                    if options['once']: break
+                    time.sleep(options['interval'])
+                    continue
+                self._run(book)
+        except KeyboardInterrupt:
+            self.stdout.write("단어장 CSV 워커 종료 (등록 중이던 단어장은 다음 실행 때 다시 등록)")
+
+    def _run(self, book):
+        status = run_import(book)
+        book.refresh_from_db()
+        message = f"단어장 #{book.pk} '{book.title}' {book.get_import_status_display()}: {book.import_message}"
+        if status == 'DONE':
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.ERROR(message))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_word_mastery(apps, schema_editor):
+    """기존 시험 답안 전체를 한 번만 훑어 WordMastery 초기값을 채웁니다."""
+    TestResultDetail = apps.get_model('vocab', 'TestResultDetail')
+    MonthlyTestResultDetail = apps.get_model('vocab', 'MonthlyTestResultDetail')
+    WordMastery = apps.get_model('vocab', 'WordMastery')
+
+    stats = {}
+    for Detail in (TestResultDetail, MonthlyTestResultDetail):
+        rows = Detail.objects.values_list(
+            'result__student_id', 'word_question', 'is_correct', 'result__created_at'
+        ).iterator(chunk_size=2000)
+        for student_id, question, is_correct, created_at in rows:
+            key = (question or '').strip().lower()
+            if not key: continue
+            entry = stats.setdefault((student_id, key), [0, 0, None])
+            entry[0] += 1
+            if not is_correct: entry[1] += 1
+            if entry[2] is None or created_at > entry[2]: entry[2] = created_at
+
+    WordMastery.objects.bulk_create(
+        [
+            WordMastery(student_id=student_id, word_key=key, attempt_count=a, wrong_count=w, last_seen_at=seen)
+            for (student_id, key), (a, w, seen) in stats.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_popup_branch'),
+        ('vocab', '0004_rankingevent_branch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalwrongword',
+            name='last_correct_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='personalwrongword',
+            name='success_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='WordMastery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word_key', models.CharField(max_length=100, verbose_name='단어 (정규화)')),
+                ('attempt_count', models.IntegerField(default=0, verbose_name='출제 횟수')),
+                ('wrong_count', models.IntegerField(default=0, verbose_name='오답 횟수')),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True, verbose_name='마지막 출제 시간')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_masteries', to='core.studentprofile')),
+            ],
+            options={
+                'verbose_name': '단어 숙련도',
+                'verbose_name_plural': '단어 숙련도',
+                'unique_together': {('student', 'word_key')},
+            },
+        ),
+        migrations.RunPython(backfill_word_mastery, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_popup_branch'),
+        ('vocab', '0005_wordmastery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRankingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_score', models.IntegerField(default=0, verbose_name='누적 점수')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.branch', verbose_name='지점')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='vocab.rankingevent')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_ranking_scores', to='core.studentprofile')),
+            ],
+            options={
+                'verbose_name': '이벤트 랭킹 집계',
+                'verbose_name_plural': '이벤트 랭킹 집계',
+                'indexes': [models.Index(fields=['event', '-total_score'], name='vocab_event_event_i_89a027_idx'), models.Index(fields=['event', 'branch', '-total_score'], name='vocab_event_event_i_5345a5_idx')],
+                'unique_together': {('event', 'student')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyRankingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='집계 월 (1일)')),
+                ('total_score', models.IntegerField(default=0, verbose_name='누적 점수')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.branch', verbose_name='지점')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_ranking_scores', to='core.studentprofile')),
+            ],
+            options={
+                'verbose_name': '월간 랭킹 집계',
+                'verbose_name_plural': '월간 랭킹 집계',
+                'indexes': [models.Index(fields=['month', '-total_score'], name='vocab_month_month_9ca2fc_idx'), models.Index(fields=['month', 'branch', '-total_score'], name='vocab_month_month_3bffc8_idx')],
+                'unique_together': {('month', 'student')},
+            },
+        ),
+    ]
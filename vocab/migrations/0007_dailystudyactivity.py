@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_daily_activity(apps, schema_editor):
+    """제출된(답안이 있는) 도전모드 결과로 일일 기록을 채웁니다."""
+    TestResult = apps.get_model('vocab', 'TestResult')
+    TestResultDetail = apps.get_model('vocab', 'TestResultDetail')
+    DailyStudyActivity = apps.get_model('vocab', 'DailyStudyActivity')
+
+    rows = TestResult.objects.filter(
+        Exists(TestResultDetail.objects.filter(result=OuterRef('pk')))
+    ).values_list('student_id', 'created_at', 'score').iterator(chunk_size=2000)
+
+    stats = {}
+    for student_id, created_at, score in rows:
+        entry = stats.setdefault((student_id, created_at.date()), [0, 0, 0])
+        entry[0] += 1
+        if score >= 27: entry[1] += 1
+        entry[2] = max(entry[2], score)
+
+    DailyStudyActivity.objects.bulk_create(
+        [
+            DailyStudyActivity(student_id=student_id, date=date, test_count=t, pass_count=p, best_score=b)
+            for (student_id, date), (t, p, b) in stats.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_popup_branch'),
+        ('vocab', '0006_rankingscores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStudyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('test_count', models.IntegerField(default=0, verbose_name='응시 횟수')),
+                ('pass_count', models.IntegerField(default=0, verbose_name='통과 횟수')),
+                ('best_score', models.IntegerField(default=0, verbose_name='최고 점수')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activities', to='core.studentprofile')),
+            ],
+            options={
+                'verbose_name': '일일 학습 기록',
+                'verbose_name_plural': '일일 학습 기록',
+                'indexes': [models.Index(fields=['date', 'pass_count'], name='vocab_daily_date_5abd50_idx')],
+                'unique_together': {('student', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_activity, migrations.RunPython.noop),
+    ]
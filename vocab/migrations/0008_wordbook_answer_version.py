@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0007_dailystudyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordbook',
+            name='answer_version',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:00
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# 이 마이그레이션 시점의 vocab.grading.clean_text / build_answer_keys 사본
+# (앱 코드가 바뀌어도 새 DB 에서 이 마이그레이션이 하는 일은 그대로 유지)
+def clean_text(text):
+    if not text: return ""
+    text = re.sub(r'\(.*?\)|\[.*?\]', '', text)
+    text = re.sub(r'\d+\.|/', ',', text)
+    text = re.sub(r'[^\w\s,]', ' ', text)
+    return text.strip()
+
+
+def build_answer_keys(korean):
+    cleaned = clean_text(unicodedata.normalize('NFC', korean or ""))
+    return sorted({
+        token.strip().lower().replace(" ", "")
+        for token in cleaned.split(',')
+        if token.strip()
+    })
+
+
+def compile_answer_keys(apps, schema_editor):
+    Word = apps.get_model('vocab', 'Word')
+    batch = []
+    for word in Word.objects.only('id', 'korean').iterator(chunk_size=2000):
+        word.answer_keys = build_answer_keys(word.korean)
+        batch.append(word)
+        if len(batch) >= 1000:
+            Word.objects.bulk_update(batch, ['answer_keys'])
+            batch = []
+    if batch:
+        Word.objects.bulk_update(batch, ['answer_keys'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0008_wordbook_answer_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='answer_keys',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compile_answer_keys, migrations.RunPython.noop),
+    ]
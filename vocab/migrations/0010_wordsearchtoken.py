@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:04
+
+import django.db.models.deletion
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# 이 마이그레이션 시점의 vocab.search.build_search_tokens 사본 (필요한 vocab.grading 함수 포함)
+# (앱 코드가 바뀌어도 새 DB 에서 이 마이그레이션이 하는 일은 그대로 유지)
+def clean_text(text):
+    if not text: return ""
+    text = re.sub(r'\(.*?\)|\[.*?\]', '', text)
+    text = re.sub(r'\d+\.|/', ',', text)
+    text = re.sub(r'[^\w\s,]', ' ', text)
+    return text.strip()
+
+
+def build_answer_keys(korean):
+    cleaned = clean_text(unicodedata.normalize('NFC', korean or ""))
+    return sorted({
+        token.strip().lower().replace(" ", "")
+        for token in cleaned.split(',')
+        if token.strip()
+    })
+
+
+def build_search_tokens(english, korean, answer_keys=None):
+    tokens = set()
+    eng = (english or "").strip().lower()
+    if eng:
+        tokens.add(('en', eng))
+        for part in eng.split():
+            tokens.add(('en', part))
+    if answer_keys is None:
+        answer_keys = build_answer_keys(korean)
+    for key in answer_keys:
+        tokens.add(('ko', key[:100]))
+    return sorted(tokens)
+
+
+def build_search_index(apps, schema_editor):
+    Word = apps.get_model('vocab', 'Word')
+    WordSearchToken = apps.get_model('vocab', 'WordSearchToken')
+    batch = []
+    for word_id, english, korean, answer_keys in Word.objects.values_list('id', 'english', 'korean', 'answer_keys').iterator(chunk_size=2000):
+        for kind, token in build_search_tokens(english, korean, answer_keys):
+            batch.append(WordSearchToken(word_id=word_id, kind=kind, token=token))
+        if len(batch) >= 5000:
+            WordSearchToken.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        WordSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0009_word_answer_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('en', '영어'), ('ko', '한글 뜻')], max_length=2)),
+                ('token', models.CharField(max_length=100)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='vocab.word')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token'], name='vocab_words_kind_9e2dbb_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0010_wordsearchtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DictionaryCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=100, unique=True, verbose_name='검색어')),
+                ('english', models.CharField(blank=True, max_length=100)),
+                ('korean', models.CharField(blank=True, max_length=255)),
+                ('source', models.CharField(blank=True, max_length=30)),
+                ('found', models.BooleanField(default=False, verbose_name='검색 성공')),
+                ('fetched_at', models.DateTimeField(verbose_name='조회 시간')),
+                ('expires_at', models.DateTimeField(verbose_name='만료 시간')),
+            ],
+            options={
+                'verbose_name': '외부 사전 캐시',
+                'verbose_name_plural': '외부 사전 캐시',
+            },
+        ),
+    ]
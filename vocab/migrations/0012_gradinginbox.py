@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0011_dictionarycache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pending_count', models.IntegerField(default=0)),
+                ('version', models.BigIntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '채점 대기 건수',
+                'verbose_name_plural': '채점 대기 건수',
+            },
+        ),
+    ]
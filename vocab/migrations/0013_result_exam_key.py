@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0012_gradinginbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlytestresult',
+            name='exam_key',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True, verbose_name='시험 세션 키'),
+        ),
+        migrations.AddField(
+            model_name='testresult',
+            name='exam_key',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True, verbose_name='시험 세션 키'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+def normalize_word_key(text):
+    """이 마이그레이션 시점의 vocab.grading.normalize_word_key 사본 (앱 코드가 바뀌어도 그대로 유지)"""
+    return (text or "").strip().lower()
+
+
+def fill_english_key(apps, schema_editor):
+    Word = apps.get_model('vocab', 'Word')
+    batch = []
+    for word in Word.objects.only('id', 'english').iterator(chunk_size=2000):
+        word.english_key = normalize_word_key(word.english)
+        batch.append(word)
+        if len(batch) >= 1000:
+            Word.objects.bulk_update(batch, ['english_key'])
+            batch = []
+    if batch:
+        Word.objects.bulk_update(batch, ['english_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0013_result_exam_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='english_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_english_key, migrations.RunPython.noop),
+    ]
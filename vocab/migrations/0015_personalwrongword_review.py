@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_popup_branch'),
+        ('vocab', '0014_word_english_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalwrongword',
+            name='due_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True, verbose_name='다음 복습 시각'),
+        ),
+        migrations.AddField(
+            model_name='personalwrongword',
+            name='lapse_count',
+            field=models.IntegerField(default=0, verbose_name='다시 틀린 횟수'),
+        ),
+        migrations.AddIndex(
+            model_name='personalwrongword',
+            index=models.Index(fields=['student', 'due_at'], name='vocab_perso_student_877d3a_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+
+def queue_unimported_books(apps, schema_editor):
+    """CSV 는 있는데 단어가 없는 단어장(용량 초과로 자동 등록되지 않았던 파일)을 워커 대기열에 올립니다."""
+    WordBook = apps.get_model('vocab', 'WordBook')
+    WordBook.objects.exclude(csv_file='').exclude(csv_file__isnull=True).filter(words__isnull=True).update(import_status='PENDING')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0015_personalwrongword_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordbook',
+            name='import_message',
+            field=models.TextField(blank=True, editable=False, verbose_name='CSV 등록 결과'),
+        ),
+        migrations.AddField(
+            model_name='wordbook',
+            name='import_started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='CSV 등록 시작'),
+        ),
+        migrations.AddField(
+            model_name='wordbook',
+            name='import_status',
+            field=models.CharField(blank=True, choices=[('PENDING', '대기'), ('RUNNING', '등록 중'), ('DONE', '완료'), ('FAILED', '실패')], db_index=True, default='', editable=False, max_length=10, verbose_name='CSV 등록 상태'),
+        ),
+        migrations.AlterField(
+            model_name='wordbook',
+            name='csv_file',
+            field=models.FileField(blank=True, help_text="작은 파일은 저장 직후 바로 등록되고, 큰 파일(VOCAB_CSV_INLINE_MAX_BYTES 초과)은 'python manage.py run_wordbook_imports' 워커가 등록합니다. 진행 상태는 'CSV 등록 상태'에서 확인하세요.", null=True, upload_to='csvs/', verbose_name='CSV 파일'),
+        ),
+        migrations.RunPython(queue_unimported_books, migrations.RunPython.noop),
+    ]
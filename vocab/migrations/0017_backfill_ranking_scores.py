@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+PASS_SCORE = 27
+
+
+def backfill_ranking_scores(apps, schema_editor):
+    """
+    기존 도전모드 결과로 월간 / 이벤트 랭킹 집계(0006 에서 빈 테이블로 생성)를 채웁니다.
+    - services.rebuild_rankings 와 같은 계산 (마이그레이션은 앱 코드를 import 하지 않도록 복사)
+    - 처음부터 다시 계산하므로 여러 번 실행해도 결과가 같음
+    """
+    TestResult = apps.get_model('vocab', 'TestResult')
+    RankingEvent = apps.get_model('vocab', 'RankingEvent')
+    MonthlyRankingScore = apps.get_model('vocab', 'MonthlyRankingScore')
+    EventRankingScore = apps.get_model('vocab', 'EventRankingScore')
+
+    rows = TestResult.objects.filter(score__gte=PASS_SCORE).annotate(
+        month=TruncMonth('created_at')
+    ).values('month', 'student_id', 'student__branch_id').annotate(total=Sum('score'))
+
+    MonthlyRankingScore.objects.all().delete()
+    MonthlyRankingScore.objects.bulk_create([
+        MonthlyRankingScore(
+            month=r['month'].date() if hasattr(r['month'], 'date') else r['month'],
+            student_id=r['student_id'],
+            branch_id=r['student__branch_id'],
+            total_score=r['total']
+        )
+        for r in rows
+    ], batch_size=1000)
+
+    EventRankingScore.objects.all().delete()
+    for event in RankingEvent.objects.all():
+        rows = TestResult.objects.filter(
+            book_id=event.target_book_id,
+            created_at__gte=event.start_date,
+            created_at__lt=event.end_date + timedelta(days=1),
+            score__gte=PASS_SCORE
+        ).values('student_id', 'student__branch_id').annotate(total=Sum('score'))
+        EventRankingScore.objects.bulk_create([
+            EventRankingScore(event=event, student_id=r['student_id'], branch_id=r['student__branch_id'], total_score=r['total'])
+            for r in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0016_wordbook_import_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ranking_scores, migrations.RunPython.noop),
+    ]
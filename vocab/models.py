@@ -1,12 +1,11 @@
-import csv
-from io import TextIOWrapper
 from django.db import models
 from django.conf import settings
 from django.db import transaction
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from core.models import Branch
+from core.models import Branch, StaffProfile, StudentProfile
+from .grading import build_answer_keys, normalize_word_key
 from datetime import timedelta
 
 # ==========================================
@@ -24,70 +23,71 @@ class WordBook(models.Model):
     title = models.CharField(max_length=100, verbose_name="단어장 제목")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="등록자")
     created_at = models.DateTimeField(auto_now_add=True)
-    csv_file = models.FileField(upload_to='csvs/', blank=True, null=True, verbose_name="CSV 파일")
+    csv_file = models.FileField(
+        upload_to='csvs/', blank=True, null=True, verbose_name="CSV 파일",
+        help_text="작은 파일은 저장 직후 바로 등록되고, 큰 파일(VOCAB_CSV_INLINE_MAX_BYTES 초과)은 "
+                  "'python manage.py run_wordbook_imports' 워커가 등록합니다. 진행 상태는 'CSV 등록 상태'에서 확인하세요."
+    )
+    # 단어(정답) 변경 시 증가 -> 채점용 정답지 캐시 무효화 키
+    answer_version = models.IntegerField(default=0, editable=False)
+
+    # CSV 등록 작업 상태 (큰 파일은 run_wordbook_imports 워커가 처리, 빈 값: 등록할 CSV 없음 / 작업 전)
+    IMPORT_STATUS_CHOICES = [
+        ('PENDING', '대기'),
+        ('RUNNING', '등록 중'),
+        ('DONE', '완료'),
+        ('FAILED', '실패'),
+    ]
+    import_status = models.CharField(
+        max_length=10, choices=IMPORT_STATUS_CHOICES, blank=True, default='', db_index=True, editable=False,
+        verbose_name="CSV 등록 상태"
+    )
+    import_message = models.TextField(blank=True, editable=False, verbose_name="CSV 등록 결과")
+    import_started_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="CSV 등록 시작")
 
     def __str__(self):
         return self.title
 
+    def bump_answer_version(self):
+        WordBook.objects.filter(pk=self.pk).update(answer_version=models.F('answer_version') + 1)
+        self.refresh_from_db(fields=['answer_version'])
+
     class Meta:
         verbose_name = "단어장"
         verbose_name_plural = "단어장"
 
     # [핵심] CSV 파일 자동 등록 로직
-    @transaction.atomic
+    # - 작은 파일: 저장 트랜잭션이 끝난 뒤(on_commit) 바로 등록
+    # - 큰 파일(VOCAB_CSV_INLINE_MAX_BYTES 초과): PENDING 으로 두고 run_wordbook_imports 워커가 등록 -> 관리자 요청을 붙잡지 않음
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        if not self.csv_file or self.words.exists():
+        if not self.csv_file or self.import_status or self.words.exists():
             return
-        
-        print(f"--- [DEBUG] 단어장 '{self.title}' 파일 분석 시작 ---")
-        file_obj = self.csv_file.file
-        file_obj.seek(0)
-        
-        # 인코딩 처리 (utf-8-sig 또는 cp949)
-        try:
-            decoded_file = TextIOWrapper(file_obj, encoding='utf-8-sig')
-            reader = csv.reader(decoded_file)
-            rows = list(reader)
-        except UnicodeDecodeError:
-            file_obj.seek(0)
-            decoded_file = TextIOWrapper(file_obj, encoding='cp949')
-            reader = csv.reader(decoded_file)
-            rows = list(reader)
-
-        unique_words = {}
-        for i, row in enumerate(rows):
-            if i == 0 or len(row) < 3: continue # 헤더거나 데이터 부족하면 패스
-            
-            day_str = row[0].strip()
-            eng_val = row[1].strip()
-            kor_val = row[2].strip()
-            example_val = row[3].strip() if len(row) > 3 else ""
-            
-            if not eng_val or not kor_val: continue
-            if eng_val.lower() in ['word', 'english', '영어']: continue 
-            
-            try: num_val = int(day_str)
-            except ValueError: num_val = 1 
-
-            unique_words[eng_val] = Word(
-                book=self, 
-                english=eng_val, 
-                korean=kor_val, 
-                number=num_val, 
-                example_sentence=example_val
-            )
-
-        if unique_words:
-            Word.objects.bulk_create(unique_words.values())
-            print(f"--- [성공] {len(unique_words)}개 단어 등록 완료 ---")
+
+        self.import_status = 'PENDING'
+        WordBook.objects.filter(pk=self.pk).update(import_status='PENDING')
+        if not self.csv_import_deferred:
+            from .import_jobs import run_import  # import_jobs -> models 순환 import 방지
+            transaction.on_commit(lambda: run_import(self))
+
+    @property
+    def csv_import_deferred(self):
+        """업로드 파일이 커서 저장 요청에서 등록하지 않고 워커에 넘기는 경우"""
+        if not self.csv_file: return False
+        limit = getattr(settings, 'VOCAB_CSV_INLINE_MAX_BYTES', 256 * 1024)
+        try: return self.csv_file.size > limit
+        except (OSError, ValueError): return False
 
 class Word(models.Model):
     book = models.ForeignKey(WordBook, on_delete=models.CASCADE, related_name='words')
     number = models.IntegerField(default=1, verbose_name="Day/Unit")
     english = models.CharField(max_length=100)
+    # 비교/중복 제거용 정규화 영어 (앞뒤 공백 제거 + 소문자) - 저장 시 자동 계산
+    english_key = models.CharField(max_length=100, db_index=True, default='', editable=False)
     korean = models.CharField(max_length=100)
     example_sentence = models.TextField(null=True, blank=True)
+    # 채점용 정답 후보 (korean 을 정규화/분리/공백 제거한 목록) - 저장 시 자동 계산
+    answer_keys = models.JSONField(null=True, blank=True, editable=False)
 
     class Meta:
         unique_together = ('book', 'english')
@@ -96,6 +96,25 @@ class Word(models.Model):
     def __str__(self):
         return f"{self.english} ({self.korean})"
 
+    def save(self, *args, **kwargs):
+        self.english_key = normalize_word_key(self.english)
+        self.answer_keys = build_answer_keys(self.korean)
+        super().save(*args, **kwargs)
+
+
+class WordSearchToken(models.Model):
+    """
+    단어 검색용 색인 (영어 접두어 / 한글 뜻)
+    - 영어: 소문자 전체 + 띄어쓰기 단위 / 한글: 채점용 정답 후보(answer_keys)
+    """
+    KIND_CHOICES = [('en', '영어'), ('ko', '한글 뜻')]
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='search_tokens')
+    kind = models.CharField(max_length=2, choices=KIND_CHOICES)
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [models.Index(fields=['kind', 'token'])]
+
 
 # ==========================================
 # [2] 시험 결과 관리 (Test Result)
@@ -114,6 +133,7 @@ class TestResult(models.Model):
     total_count = models.IntegerField(default=30)
     wrong_count = models.IntegerField(default=0)
     test_range = models.CharField(max_length=50, blank=True, verbose_name="시험 범위")
+    exam_key = models.CharField(max_length=32, null=True, blank=True, unique=True, editable=False, verbose_name="시험 세션 키")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="응시 일시")
     
     class Meta:
@@ -148,6 +168,7 @@ class MonthlyTestResult(models.Model):
     score = models.IntegerField(default=0)
     total_questions = models.IntegerField(default=100)
     test_range = models.CharField(max_length=50, blank=True)
+    exam_key = models.CharField(max_length=32, null=True, blank=True, unique=True, editable=False, verbose_name="시험 세션 키")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -169,14 +190,75 @@ class MonthlyTestResultDetail(models.Model):
 # ==========================================
 # 정답 정정 요청을 선생님이 수락(is_correct=True로 변경)하면, 점수도 자동으로 오르게 합니다.
 
+@receiver(post_init, sender=TestResultDetail)
+@receiver(post_init, sender=MonthlyTestResultDetail)
+def remember_loaded_correct(sender, instance, **kwargs):
+    # 불러올 때의 정오를 기억 -> 저장 시 바뀐 경우에만 점수 반영 (추가 쿼리 없음, defer 된 경우 None)
+    instance._loaded_is_correct = instance.__dict__.get('is_correct')
+
+
 @receiver(post_save, sender=TestResultDetail)
-def update_score_on_change(sender, instance, **kwargs):
-    result = instance.result
-    # 현재 맞은 개수 다시 세기
-    real_score = result.details.filter(is_correct=True).count()
-    result.score = real_score
-    result.wrong_count = result.total_count - real_score
-    result.save()
+@receiver(post_save, sender=MonthlyTestResultDetail)
+def update_score_on_change(sender, instance, created, **kwargs):
+    from .services import queue_score_change, adjust_word_mastery  # services -> models 순환 import 방지
+
+    loaded = instance._loaded_is_correct
+    instance._loaded_is_correct = instance.is_correct
+    if created or loaded is None:
+        queue_score_change(instance, 0)  # 이전 값을 모름 -> 커밋 때 재계산만
+    elif instance.is_correct != loaded:
+        queue_score_change(instance, 1 if instance.is_correct else -1)
+        # 정답 인정 / 관리자 인라인 수정 등 -> 단어 숙련도 오답수도 같이 보정
+        student_id = sender._meta.get_field('result').related_model.objects.filter(
+            pk=instance.result_id
+        ).values_list('student_id', flat=True).first()
+        adjust_word_mastery(student_id, instance.word_question, -1 if instance.is_correct else 1)
+
+
+@receiver(pre_delete, sender=TestResult)
+@receiver(pre_delete, sender=MonthlyTestResult)
+def remove_deleted_result_details(sender, instance, **kwargs):
+    # 답안은 CASCADE 로 같이 지워지므로 지워지기 전에 단어 숙련도 / 채점 대기 건수에서 빼줌
+    from .services import remove_word_attempts, update_grading_inbox  # services -> models 순환 import 방지
+    rows = list(instance.details.values_list('word_question', 'is_correct', 'is_correction_requested', 'is_resolved'))
+    instance._had_details = bool(rows)  # 답안이 없는 결과(예전에 시험 화면을 열 때 만들던 행)는 집계에 들어간 적 없음
+    remove_word_attempts(instance.student_id, [(question, is_correct) for question, is_correct, _, _ in rows])
+    pending = sum(1 for _, _, requested, resolved in rows if requested and not resolved)
+    if pending:
+        update_grading_inbox(instance.student, -pending)
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+def bump_book_answer_version(sender, instance, **kwargs):
+    # 단어 추가/수정/삭제 시 해당 단어장의 정답지 캐시 버전을 올림
+    WordBook.objects.filter(pk=instance.book_id).update(answer_version=models.F('answer_version') + 1)
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+@receiver(post_save, sender=WordBook)
+@receiver(post_delete, sender=WordBook)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+def invalidate_book_catalog(sender, **kwargs):
+    from .catalog import invalidate_catalog  # catalog -> models 순환 import 방지
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=Word)
+def update_word_search_tokens(sender, instance, **kwargs):
+    from .search import index_words  # search -> models 순환 import 방지
+    index_words([instance])
+
+
+@receiver(post_delete, sender=TestResult)
+def remove_deleted_result_aggregates(sender, instance, **kwargs):
+    # 삭제된 시험을 이달의 왕 / 이벤트 랭킹 집계와 일일 학습 기록(히트맵)에서 빼줌
+    from .services import remove_ranking_points, remove_daily_activity  # services -> models 순환 import 방지
+    remove_ranking_points(instance)
+    if getattr(instance, '_had_details', True):
+        remove_daily_activity(instance)
 
 
 # ==========================================
@@ -213,7 +295,7 @@ def auto_reset_cooldown(sender, instance, **kwargs):
     if not recent_wrong_fails.exists():
         profile.last_wrong_failed_at = None
 
-    profile.save()
+    profile.save(update_fields=['last_failed_at', 'last_wrong_failed_at'])
 
 class PersonalWrongWord(models.Model):
     """
@@ -224,11 +306,15 @@ class PersonalWrongWord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     success_count = models.IntegerField(default=0)  # 맞춘 횟수
     last_correct_at = models.DateTimeField(null=True, blank=True) # 마지막 정답 시간 (쿨타임용)
+    # 복습 일정: 맞출수록 간격이 늘어나고, 끝까지 맞추면 졸업 (due_at=None), 틀리면 처음부터
+    due_at = models.DateTimeField(null=True, blank=True, default=timezone.now, verbose_name="다음 복습 시각")
+    lapse_count = models.IntegerField(default=0, verbose_name="다시 틀린 횟수")
     
     class Meta:
         verbose_name = "학생 추가 오답"
         verbose_name_plural = "학생 추가 오답"
         unique_together = ('student', 'word') # 중복 추가 방지
+        indexes = [models.Index(fields=['student', 'due_at'])]
 
     def __str__(self):
         return f"{self.student.name} - {self.word.english}"
@@ -257,4 +343,190 @@ class RankingEvent(models.Model):
     def __str__(self):
         # 관리자 페이지에서 알아보기 쉽게 표시
         branch_name = self.branch.name if self.branch else "전체 지점"
-        return f"[{branch_name}] {self.title}"
\ No newline at end of file
+        return f"[{branch_name}] {self.title}"
+
+    def rebuild_scores(self):
+        """이벤트 기간/대상 단어장 기준으로 랭킹 집계를 처음부터 다시 계산"""
+        rows = TestResult.objects.filter(
+            book=self.target_book,
+            created_at__gte=self.start_date,
+            created_at__lt=self.end_date + timedelta(days=1),
+            score__gte=27
+        ).values('student_id', 'student__branch_id').annotate(total=models.Sum('score'))
+
+        with transaction.atomic():
+            self.scores.all().delete()
+            EventRankingScore.objects.bulk_create([
+                EventRankingScore(event=self, student_id=r['student_id'], branch_id=r['student__branch_id'], total_score=r['total'])
+                for r in rows
+            ])
+
+# ==========================================
+# [5] 학생별 단어 숙련도 (오답 단어 집계용)
+# ==========================================
+class WordMastery(models.Model):
+    """
+    학생 x 단어(소문자 영어) 단위 누적 통계
+    - save_result / approve_answer 에서 증분으로 갱신되어 오답 단어 조회 시 전체 이력을 다시 읽지 않습니다.
+    """
+    student = models.ForeignKey('core.StudentProfile', on_delete=models.CASCADE, related_name='word_masteries')
+    word_key = models.CharField(max_length=100, verbose_name="단어 (정규화)")
+    attempt_count = models.IntegerField(default=0, verbose_name="출제 횟수")
+    wrong_count = models.IntegerField(default=0, verbose_name="오답 횟수")
+    last_seen_at = models.DateTimeField(null=True, blank=True, verbose_name="마지막 출제 시간")
+
+    class Meta:
+        verbose_name = "단어 숙련도"
+        verbose_name_plural = "단어 숙련도"
+        unique_together = ('student', 'word_key')
+
+    def __str__(self):
+        return f"{self.student.name} - {self.word_key} ({self.wrong_count}/{self.attempt_count})"
+
+
+# ==========================================
+# [6] 랭킹 집계 (이달의 왕 / 랭킹 이벤트)
+# ==========================================
+# 통과(27점 이상)한 도전모드 점수 합계를 시험 저장/정답 인정 시점에 증분으로 반영합니다.
+# 메인 화면은 정렬된 상위 5개만 읽습니다. (전체 재계산: manage.py rebuild_rankings)
+
+class MonthlyRankingScore(models.Model):
+    month = models.DateField(verbose_name="집계 월 (1일)")
+    student = models.ForeignKey('core.StudentProfile', on_delete=models.CASCADE, related_name='monthly_ranking_scores')
+    branch = models.ForeignKey(Branch, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="지점")
+    total_score = models.IntegerField(default=0, verbose_name="누적 점수")
+
+    class Meta:
+        verbose_name = "월간 랭킹 집계"
+        verbose_name_plural = "월간 랭킹 집계"
+        unique_together = ('month', 'student')
+        indexes = [
+            models.Index(fields=['month', '-total_score']),
+            models.Index(fields=['month', 'branch', '-total_score']),
+        ]
+
+class EventRankingScore(models.Model):
+    event = models.ForeignKey(RankingEvent, on_delete=models.CASCADE, related_name='scores')
+    student = models.ForeignKey('core.StudentProfile', on_delete=models.CASCADE, related_name='event_ranking_scores')
+    branch = models.ForeignKey(Branch, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="지점")
+    total_score = models.IntegerField(default=0, verbose_name="누적 점수")
+
+    class Meta:
+        verbose_name = "이벤트 랭킹 집계"
+        verbose_name_plural = "이벤트 랭킹 집계"
+        unique_together = ('event', 'student')
+        indexes = [
+            models.Index(fields=['event', '-total_score']),
+            models.Index(fields=['event', 'branch', '-total_score']),
+        ]
+
+
+@receiver(post_save, sender=RankingEvent)
+def rebuild_event_scores(sender, instance, **kwargs):
+    # 기간이나 대상 단어장이 바뀌면 기존 증분 값이 맞지 않으므로 해당 이벤트만 재계산
+    instance.rebuild_scores()
+
+
+# ==========================================
+# [7] 학생별 일일 학습 기록 (히트맵 / 작심 30일 챌린지)
+# ==========================================
+class DailyStudyActivity(models.Model):
+    student = models.ForeignKey('core.StudentProfile', on_delete=models.CASCADE, related_name='daily_activities')
+    date = models.DateField(verbose_name="날짜")
+    test_count = models.IntegerField(default=0, verbose_name="응시 횟수")
+    pass_count = models.IntegerField(default=0, verbose_name="통과 횟수")
+    best_score = models.IntegerField(default=0, verbose_name="최고 점수")
+
+    class Meta:
+        verbose_name = "일일 학습 기록"
+        verbose_name_plural = "일일 학습 기록"
+        unique_together = ('student', 'date')
+        indexes = [models.Index(fields=['date', 'pass_count'])]
+
+    def __str__(self):
+        return f"[{self.date}] {self.student.name} - {self.test_count}회"
+
+
+
+# ==========================================
+# [8] 외부 사전 검색 캐시
+# ==========================================
+class DictionaryCache(models.Model):
+    """
+    crawl_daum_dic 결과 캐시 (검색어 소문자 기준)
+    - found=False: 뜻을 찾지 못했거나 요청이 실패한 검색어 (짧은 TTL 동안 외부 요청 생략)
+    """
+    query = models.CharField(max_length=100, unique=True, verbose_name="검색어")
+    english = models.CharField(max_length=100, blank=True)
+    korean = models.CharField(max_length=255, blank=True)
+    source = models.CharField(max_length=30, blank=True)
+    found = models.BooleanField(default=False, verbose_name="검색 성공")
+    fetched_at = models.DateTimeField(verbose_name="조회 시간")
+    expires_at = models.DateTimeField(verbose_name="만료 시간")
+
+    class Meta:
+        verbose_name = "외부 사전 캐시"
+        verbose_name_plural = "외부 사전 캐시"
+
+    def __str__(self):
+        return f"{self.query} -> {self.korean if self.found else '(없음)'}"
+
+    def as_result(self):
+        if not self.found: return None
+        return {'english': self.english, 'korean': self.korean, 'source': self.source}
+
+
+
+# ==========================================
+# [9] 선생님별 채점 대기 건수 (알림 배지용)
+# ==========================================
+class GradingInbox(models.Model):
+    """
+    선생님별 '정답 정정 요청 대기' 건수
+    - 정정 요청/승인/기각 시 증분 갱신, 행이 없으면 조회 시 다시 셈 (담당 학생 변경 시 삭제됨)
+    - version: 건수가 바뀔 때마다 증가 -> 알림 API 의 ETag
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='grading_inbox')
+    pending_count = models.IntegerField(default=0)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "채점 대기 건수"
+        verbose_name_plural = "채점 대기 건수"
+
+    def __str__(self):
+        return f"{self.user.username}: {self.pending_count}건"
+
+
+# 담당 선생님/지점/직책이 바뀌면 해당 선생님의 대기 건수만 다시 세도록 초기화
+# (시험 기록 삭제는 remove_deleted_result_details 에서 건수를 직접 뺌)
+INBOX_STUDENT_FIELDS = ['branch_id', 'syntax_teacher_id', 'reading_teacher_id', 'extra_class_teacher_id']
+
+@receiver(post_init, sender=StudentProfile)
+def remember_loaded_assignment(sender, instance, **kwargs):
+    # 불러올 때의 담당 정보를 기억 -> 저장 시 이전 값을 다시 조회하지 않음 (defer 된 경우 None)
+    if all(f in instance.__dict__ for f in INBOX_STUDENT_FIELDS):
+        instance._loaded_assignment = {f: instance.__dict__[f] for f in INBOX_STUDENT_FIELDS}
+    else:
+        instance._loaded_assignment = None
+
+@receiver(post_save, sender=StudentProfile)
+def invalidate_inbox_on_assignment_change(sender, instance, created, update_fields=None, **kwargs):
+    from .services import assignment_inbox_user_ids, invalidate_grading_inbox  # services -> models 순환 import 방지
+
+    if update_fields is not None and not {f[:-3] for f in INBOX_STUDENT_FIELDS} & set(update_fields): return
+    loaded = instance._loaded_assignment
+    current = {f: getattr(instance, f) for f in INBOX_STUDENT_FIELDS}
+    instance._loaded_assignment = current
+    if created: return  # 새 학생은 정정 요청이 없음
+    if loaded is None:
+        invalidate_grading_inbox()  # 이전 값을 모름 -> 전부 다시 셈
+    elif loaded != current:
+        invalidate_grading_inbox(assignment_inbox_user_ids(loaded, current))
+
+@receiver(post_save, sender=StaffProfile)
+@receiver(post_delete, sender=StaffProfile)
+def invalidate_inbox_on_staff_change(sender, instance, **kwargs):
+    # 직책/지점이 바뀌면 그 선생님이 보는 범위만 달라짐
+    from .services import invalidate_grading_inbox  # services -> models 순환 import 방지
+    invalidate_grading_inbox([instance.user_id])
@@ -0,0 +1,134 @@
+# vocab/regrade.py
+"""
+저장된 답안 일괄 재채점 (clean_text 등 채점 규칙을 고친 뒤 과거 시험에 적용)
+- 시험 결과 id 를 chunk 단위로 나눠 답안을 values 로 읽고 메모리에서 채점
+- 정오가 바뀐 답안만 bulk_update (signal 없음) -> 점수/랭킹은 답안이 바뀐 시험만 chunk 마다 한 번 재계산
+- grade_chunk 는 DB 를 읽기만 하므로 프로세스 풀에서 병렬 실행 가능 (쓰기는 호출한 프로세스에서만)
+"""
+import logging
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from django.db import connections, transaction
+from .grading import grade_details
+from .models import TestResult, TestResultDetail, MonthlyTestResult, MonthlyTestResultDetail
+from .services import adjust_word_mastery_bulk, invalidate_grading_inbox, refresh_result_scores
+
+logger = logging.getLogger(__name__)
+
+DETAIL_MODELS = {TestResult: TestResultDetail, MonthlyTestResult: MonthlyTestResultDetail}
+
+# 정오가 바뀐 답안 한 개 (is_correct: 새 판정)
+DetailChange = namedtuple('DetailChange', [
+    'detail_id', 'result_id', 'student_id', 'word_question', 'student_answer', 'correct_answer',
+    'is_correct', 'is_resolved'
+])
+
+
+class RegradeReport:
+    """재채점 결과: 검사한 시험/답안 수 + 바뀐 답안 (diff 는 일부만 보관)"""
+    MAX_DIFFS = 500
+
+    def __init__(self):
+        self.results = 0
+        self.details = 0
+        self.changed_details = 0
+        self.changed_results = set()
+        self.diffs = []
+
+    def add(self, result_count, detail_count, changes):
+        self.results += result_count
+        self.details += detail_count
+        self.changed_details += len(changes)
+        for change in changes:
+            self.changed_results.add(change.result_id)
+            if len(self.diffs) < self.MAX_DIFFS:
+                self.diffs.append(change)
+
+    def __str__(self):
+        return (f"시험 {self.results}건 / 답안 {self.details}건 검사, "
+                f"판정 변경 답안 {self.changed_details}건 (시험 {len(self.changed_results)}건)")
+
+
+def iter_result_chunks(queryset, chunk_size):
+    """결과 id 를 pk 순서로 chunk_size 개씩"""
+    chunk = []
+    for result_id in queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size):
+        chunk.append(result_id)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def grade_chunk(model, result_ids):
+    """시험 결과 chunk 의 답안을 다시 채점 -> (시험 수, 답안 수, [DetailChange])"""
+    rows = DETAIL_MODELS[model].objects.filter(result_id__in=result_ids).order_by('id').values_list(
+        'id', 'result_id', 'result__student_id', 'word_question', 'student_answer', 'correct_answer',
+        'is_correct', 'is_resolved'
+    )
+    rows = [DetailChange(*row) for row in rows]
+    _, _, processed = grade_details([
+        {'english': row.word_question, 'korean': row.correct_answer, 'user_input': row.student_answer}
+        for row in rows
+    ])
+    changes = [
+        row._replace(is_correct=item['c'], is_resolved=row.is_resolved or item['c'])
+        for row, item in zip(rows, processed)
+        if item['c'] != row.is_correct
+    ]
+    return len(result_ids), len(rows), changes
+
+
+def apply_changes(model, changes):
+    """바뀐 답안 저장 + 숙련도 보정 + 답안이 바뀐 시험만 점수/랭킹 재계산 (한 트랜잭션)"""
+    if not changes: return
+    Detail = DETAIL_MODELS[model]
+    with transaction.atomic():
+        Detail.objects.bulk_update(
+            [Detail(id=c.detail_id, is_correct=c.is_correct, is_resolved=c.is_resolved) for c in changes],
+            ['is_correct', 'is_resolved'],
+            batch_size=1000
+        )
+        # 오답 -> 정답: 오답수 -1, 정답 -> 오답: +1
+        adjust_word_mastery_bulk(
+            (c.student_id, c.word_question, -1 if c.is_correct else 1) for c in changes
+        )
+        changed_ids = {c.result_id for c in changes}
+        old_scores = dict(model.objects.filter(pk__in=changed_ids).values_list('pk', 'score'))
+        refresh_result_scores(model, old_scores)
+
+
+def regrade_results(queryset, chunk_size=500, dry_run=False, workers=1):
+    """
+    queryset(TestResult / MonthlyTestResult) 의 답안 전체를 현재 채점 규칙으로 다시 채점
+    - dry_run: 저장하지 않고 바뀔 답안만 보고
+    - workers > 1: 채점을 프로세스 풀에서 병렬로 (fork 방식, 저장은 이 프로세스에서 chunk 순서대로)
+    """
+    model = queryset.model
+    report = RegradeReport()
+    chunks = list(iter_result_chunks(queryset, chunk_size))
+    logger.info("%s 재채점 시작: %d chunk (workers=%d, dry_run=%s)", model.__name__, len(chunks), workers, dry_run)
+
+    if workers > 1 and len(chunks) > 1:
+        connections.close_all()  # fork 된 프로세스가 부모의 DB 연결을 같이 쓰지 않도록
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+        graded = pool.map(grade_chunk, repeat(model), chunks)
+    else:
+        pool = None
+        graded = (grade_chunk(model, result_ids) for result_ids in chunks)
+
+    try:
+        for result_count, detail_count, changes in graded:
+            report.add(result_count, detail_count, changes)
+            if not dry_run:
+                apply_changes(model, changes)
+    finally:
+        if pool: pool.shutdown()
+
+    if not dry_run and report.changed_details:
+        invalidate_grading_inbox()  # 정정 요청이 정답 처리되면서 대기 건수가 바뀌었을 수 있음
+    logger.info("%s 재채점 완료: %s", model.__name__, report)
+    return report
@@ -0,0 +1,82 @@
+# vocab/search.py
+"""
+단어 검색
+- WordSearchToken 색인에서 범위 조건(token >= q AND token < q + U+10FFFF)으로 접두어 검색 -> 인덱스 사용
+- 순위: 영어 완전일치 > 영어 접두어 > 영어 중간 단어 접두어 > 뜻 완전일치 > 뜻 접두어
+"""
+import re
+from .grading import build_answer_keys, normalize_word_key, user_answer_tokens
+from .models import Word, WordSearchToken
+
+_HANGUL = re.compile(r'[가-힣ㄱ-ㅎㅏ-ㅣ]')
+_PREFIX_END = '\U0010ffff'
+
+
+def is_korean_query(query):
+    return bool(_HANGUL.search(query or ""))
+
+
+def build_search_tokens(english, korean, answer_keys=None):
+    """단어 1개 -> [(kind, token)] (영어 전체/띄어쓰기 단위, 한글 정답 후보)"""
+    tokens = set()
+    eng = normalize_word_key(english)
+    if eng:
+        tokens.add(('en', eng))
+        for part in eng.split():
+            tokens.add(('en', part))
+    if answer_keys is None:
+        answer_keys = build_answer_keys(korean)
+    for key in answer_keys:
+        tokens.add(('ko', key[:100]))
+    return sorted(tokens)
+
+
+def index_words(words):
+    """단어들의 검색 색인을 다시 만듦 (bulk_create 로 등록한 단어는 직접 호출해야 함)"""
+    words = [w for w in words if w.pk]
+    if not words: return
+    WordSearchToken.objects.filter(word__in=words).delete()
+    WordSearchToken.objects.bulk_create([
+        WordSearchToken(word_id=w.pk, kind=kind, token=token)
+        for w in words
+        for kind, token in build_search_tokens(w.english, w.korean, w.answer_keys)
+    ], batch_size=1000)
+
+
+def _prefix_q(kind, prefix):
+    return WordSearchToken.objects.filter(kind=kind, token__gte=prefix, token__lt=prefix + _PREFIX_END)
+
+
+def search_words(query, limit=5, scan_limit=200):
+    """검색어 -> 순위순 Word 목록 (book, publisher 포함)"""
+    query = (query or "").strip()
+    if not query: return []
+
+    eng_q = query.lower()
+    ko_terms = user_answer_tokens(query) if is_korean_query(query) else []
+
+    # 사전순으로 읽으면 완전일치(접두어 자체)가 가장 먼저 나옴
+    hits = []
+    for kind, term in [('en', eng_q)] + [('ko', t) for t in ko_terms]:
+        hits += _prefix_q(kind, term).order_by('token').values_list('word_id', 'kind', 'token')[:scan_limit]
+
+    english_by_id = dict(Word.objects.filter(id__in={h[0] for h in hits}).values_list('id', 'english_key'))
+
+    def rank(word_id, kind, token):
+        english = english_by_id.get(word_id) or ""
+        if kind == 'en':
+            if english == eng_q: return 0
+            if english.startswith(eng_q): return 1
+            return 2
+        return 3 if token in ko_terms else 4
+
+    best = {}
+    for word_id, kind, token in hits:
+        if word_id not in english_by_id: continue
+        r = rank(word_id, kind, token)
+        if word_id not in best or r < best[word_id]:
+            best[word_id] = r
+
+    ordered = sorted(best, key=lambda wid: (best[wid], len(english_by_id[wid]), english_by_id[wid], wid))[:limit]
+    words = Word.objects.select_related('book__publisher').in_bulk(ordered)
+    return [words[wid] for wid in ordered if wid in words]
@@ -1,35 +1,34 @@
 # vocab/services.py
+import heapq
+import random
+import secrets
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Greatest, TruncMonth
 from django.utils import timezone
 import unicodedata
-import re
+from .grading import clean_text, normalize_word_key
+from core.models import StaffProfile
+from .models import (
+    Word, WordBook, Publisher, WordMastery, PersonalWrongWord, TestResult, TestResultDetail, MonthlyTestResultDetail, RankingEvent,
+    MonthlyRankingScore, EventRankingScore, DailyStudyActivity, GradingInbox
+)
 # [수정] StudentProfile import 불필요 (인자로 받을 것이므로)
 
-
-def clean_text(text):
-    """
-    텍스트 정제 함수 (업그레이드)
-    1. 괄호와 그 안의 내용 제거
-    2. [수정] 숫자(1. 2.)와 슬래시(/)를 모두 콤마(,)로 치환하여 정답을 분리함
-    3. 나머지 특수문자 제거
-    """
-    if not text: return ""
-    
-    # 1. 괄호와 그 안의 내용 제거 (소괄호, 대괄호)
-    text = re.sub(r'\(.*?\)|\[.*?\]', '', text)
-    
-    # 2. [핵심 수정] 숫자목록(1. 2.) 또는 슬래시(/)를 콤마로 변경
-    # 예: "신뢰, 믿음 / 신뢰하다" -> "신뢰, 믿음 , 신뢰하다"
-    text = re.sub(r'\d+\.|/', ',', text)
-    
-    # 3. 특수문자 제거 (한글, 영문, 숫자, 콤마, 공백 제외하고 모두 제거)
-    text = re.sub(r'[^\w\s,]', ' ', text)
-    
-    return text.strip()
+PASS_SCORE = 27  # 도전모드 통과 점수 (쿨타임 / 랭킹 공통)
 
 
 def calculate_score(details_data):
     """
-    서버 사이드 채점 로직
+    서버 사이드 채점 로직 (기준 구현)
+    - 실제 채점은 grading.grade_details 가 같은 결과를 더 빠르게 계산합니다. (tests.GradingParityTest / check_grading_parity 로 검증)
     - 정답지는 콤마(,)로 구분
     - 비교 시에는 모든 공백을 제거하여 '상호 작용하다' == '상호작용하다' 인정
     """
@@ -106,8 +105,6 @@ def update_cooldown(profile, mode, score, test_range=None):
     점수에 따라 쿨타임(재시험 대기시간) 설정
     [수정] user 대신 profile 객체를 직접 받습니다.
     """
-    PASS_SCORE = 27
-    
     # 1. 도전 모드
     if mode == 'challenge':
         if score >= PASS_SCORE: 
@@ -122,4 +119,575 @@ def update_cooldown(profile, mode, score, test_range=None):
         else: 
             profile.last_wrong_failed_at = timezone.now()
             
-    profile.save()
\ No newline at end of file
+    profile.save(update_fields=['last_failed_at', 'last_wrong_failed_at'])
+
+
+def record_word_attempts(profile, processed_details):
+    """
+    채점 결과(calculate_score의 processed_details)를 학생별 단어 숙련도(WordMastery)에 누적
+    - 단어별 (출제수, 오답수) 증분을 묶어서 F() 업데이트 -> 시험 한 번에 쿼리 3~4개
+    """
+    tally = {}
+    for item in processed_details:
+        key = normalize_word_key(item.get('q'))
+        if not key: continue
+        attempts, wrongs = tally.get(key, (0, 0))
+        tally[key] = (attempts + 1, wrongs + (0 if item.get('c') else 1))
+
+    if not tally: return
+
+    WordMastery.objects.bulk_create(
+        [WordMastery(student=profile, word_key=key) for key in tally],
+        ignore_conflicts=True
+    )
+
+    groups = defaultdict(list)
+    for key, delta in tally.items():
+        groups[delta].append(key)
+
+    now = timezone.now()
+    for (attempts, wrongs), keys in groups.items():
+        WordMastery.objects.filter(student=profile, word_key__in=keys).update(
+            attempt_count=F('attempt_count') + attempts,
+            wrong_count=F('wrong_count') + wrongs,
+            last_seen_at=now
+        )
+
+
+def adjust_word_mastery(profile, word_question, wrong_delta):
+    """
+    이미 저장된 답안의 정오 판정이 바뀐 경우 (정답 인정 / 재채점) 오답수만 보정
+    - 오답 -> 정답: wrong_delta=-1, 정답 -> 오답: wrong_delta=+1
+    - profile 은 StudentProfile 또는 id
+    """
+    key = normalize_word_key(word_question)
+    if not key or not wrong_delta: return
+    WordMastery.objects.filter(student=profile, word_key=key).update(
+        wrong_count=F('wrong_count') + wrong_delta
+    )
+
+
+def remove_word_attempts(student_id, rows):
+    """
+    시험 결과가 삭제된 경우: record_word_attempts 로 쌓인 (출제수, 오답수)를 되돌림
+    - rows: [(word_question, is_correct)]
+    """
+    tally = {}
+    for word_question, is_correct in rows:
+        key = normalize_word_key(word_question)
+        if not key: continue
+        attempts, wrongs = tally.get(key, (0, 0))
+        tally[key] = (attempts + 1, wrongs + (0 if is_correct else 1))
+
+    groups = defaultdict(list)
+    for key, delta in tally.items():
+        groups[delta].append(key)
+
+    for (attempts, wrongs), keys in groups.items():
+        WordMastery.objects.filter(student_id=student_id, word_key__in=keys).update(
+            attempt_count=Greatest(F('attempt_count') - attempts, Value(0)),
+            wrong_count=Greatest(F('wrong_count') - wrongs, Value(0))
+        )
+
+
+def adjust_word_mastery_bulk(adjustments):
+    """adjust_word_mastery 의 일괄 버전: [(student_id, word_question, wrong_delta)] -> (학생, 증감)별 UPDATE 1번"""
+    tally = defaultdict(int)
+    for student_id, word_question, wrong_delta in adjustments:
+        key = normalize_word_key(word_question)
+        if key: tally[(student_id, key)] += wrong_delta
+
+    groups = defaultdict(list)
+    for (student_id, key), wrong_delta in tally.items():
+        if wrong_delta: groups[(student_id, wrong_delta)].append(key)
+
+    for (student_id, wrong_delta), keys in groups.items():
+        WordMastery.objects.filter(student_id=student_id, word_key__in=keys).update(
+            wrong_count=F('wrong_count') + wrong_delta
+        )
+
+
+# ==========================================
+# 오답 노트 복습 일정 (PersonalWrongWord.due_at)
+# ==========================================
+REVIEW_INTERVALS = [timedelta(days=d) for d in (1, 3, 7, 14, 30)]  # n번째 정답 후 다음 복습까지
+
+
+def review_batch(profile, limit=30):
+    """복습할 때가 된 오답 노트 단어 (due_at 오래된 순, (student, due_at) 인덱스로 limit 개만)"""
+    entries = PersonalWrongWord.objects.filter(
+        student=profile, due_at__lte=timezone.now()
+    ).select_related('word__book').order_by('due_at')[:limit]
+    return [entry.word for entry in entries]
+
+
+def update_review_queue(profile, processed_details):
+    """
+    채점 결과로 오답 노트 복습 일정 갱신 (bulk_update 1번)
+    - 복습할 때가 된 단어를 맞추면 다음 간격으로, 마지막 간격까지 맞추면 졸업 (due_at=None)
+    - 아직 졸업하지 않은 단어를 틀리면 처음부터 (바로 다시 복습 대상)
+    """
+    results = {}
+    for item in processed_details:
+        key = normalize_word_key(item.get('q'))
+        if key: results[key] = results.get(key, True) and item.get('c')
+    if not results: return
+
+    now = timezone.now()
+    entries = PersonalWrongWord.objects.filter(
+        student=profile, due_at__isnull=False, word__english_key__in=list(results)
+    ).select_related('word')
+
+    changed = []
+    for entry in entries:
+        if results[entry.word.english_key]:
+            if entry.due_at > now: continue  # 일정보다 일찍 맞춘 건 진도에 반영하지 않음
+            entry.success_count += 1
+            entry.last_correct_at = now
+            entry.due_at = (now + REVIEW_INTERVALS[entry.success_count - 1]) if entry.success_count <= len(REVIEW_INTERVALS) else None
+        else:
+            entry.success_count = 0
+            entry.lapse_count += 1
+            entry.due_at = now
+        changed.append(entry)
+
+    if changed:
+        PersonalWrongWord.objects.bulk_update(changed, ['success_count', 'last_correct_at', 'due_at', 'lapse_count'])
+
+
+def ranking_points(score):
+    """랭킹에는 통과한 시험 점수만 합산됩니다."""
+    return score if score >= PASS_SCORE else 0
+
+
+def update_rankings(result, old_score):
+    """
+    도전모드 결과(TestResult)의 점수가 old_score -> result.score 로 바뀐 만큼 랭킹 집계에 반영
+    - 이달의 왕: 응시 월 기준 / 이벤트: 대상 단어장 + 기간에 해당하는 이벤트 전부
+    """
+    add_ranking_points(result, ranking_points(result.score) - ranking_points(old_score))
+
+
+def remove_ranking_points(result):
+    """도전모드 결과가 삭제된 경우: 그 시험으로 쌓인 랭킹 점수를 되돌림"""
+    add_ranking_points(result, -ranking_points(result.score))
+
+
+def add_ranking_points(result, delta):
+    """결과의 응시 월 랭킹 + 해당 이벤트 랭킹에 delta 점 반영"""
+    if not delta: return
+
+    student = result.student
+    exam_date = result.created_at.date()
+    month = exam_date.replace(day=1)
+
+    # 점수를 빼는 경우는 이미 집계 행이 있음 (학생 삭제로 같이 지워지는 중이면 행을 새로 만들지 않도록)
+    if delta > 0:
+        MonthlyRankingScore.objects.bulk_create(
+            [MonthlyRankingScore(month=month, student=student, branch_id=student.branch_id)],
+            ignore_conflicts=True
+        )
+    MonthlyRankingScore.objects.filter(month=month, student=student).update(
+        total_score=F('total_score') + delta, branch_id=student.branch_id
+    )
+
+    event_ids = list(RankingEvent.objects.filter(
+        target_book_id=result.book_id, start_date__lte=exam_date, end_date__gte=exam_date
+    ).values_list('id', flat=True))
+    if not event_ids: return
+
+    if delta > 0:
+        EventRankingScore.objects.bulk_create(
+            [EventRankingScore(event_id=eid, student=student, branch_id=student.branch_id) for eid in event_ids],
+            ignore_conflicts=True
+        )
+    EventRankingScore.objects.filter(event_id__in=event_ids, student=student).update(
+        total_score=F('total_score') + delta, branch_id=student.branch_id
+    )
+
+
+def update_daily_activity(result, old_score, is_new_submission=False):
+    """
+    히트맵/챌린지용 일일 기록 갱신
+    - 새로 제출된 시험이면 응시 횟수 +1, 통과 여부가 바뀌면 통과 횟수 보정, 최고 점수는 큰 값 유지
+    """
+    was_passed = (not is_new_submission) and old_score >= PASS_SCORE
+    pass_delta = int(result.score >= PASS_SCORE) - int(was_passed)
+    test_delta = 1 if is_new_submission else 0
+    if not test_delta and not pass_delta and result.score <= old_score: return
+
+    exam_date = result.created_at.date()
+    DailyStudyActivity.objects.bulk_create(
+        [DailyStudyActivity(student_id=result.student_id, date=exam_date)],
+        ignore_conflicts=True
+    )
+    DailyStudyActivity.objects.filter(student_id=result.student_id, date=exam_date).update(
+        test_count=F('test_count') + test_delta,
+        pass_count=F('pass_count') + pass_delta,
+        best_score=Greatest(F('best_score'), Value(result.score))
+    )
+
+
+def remove_daily_activity(result):
+    """
+    시험 결과가 삭제된 경우: 그날 응시/통과 횟수를 빼고 최고 점수는 남은 시험 기준으로 다시 계산
+    - 행이 없으면(학생 삭제로 같이 지워지는 중 등) 아무것도 하지 않음
+    """
+    exam_date = result.created_at.date()
+    best_score = TestResult.objects.filter(
+        student_id=result.student_id, created_at__date=exam_date
+    ).aggregate(best=Max('score'))['best'] or 0
+    DailyStudyActivity.objects.filter(student_id=result.student_id, date=exam_date).update(
+        test_count=Greatest(F('test_count') - 1, Value(0)),
+        pass_count=Greatest(F('pass_count') - int(result.score >= PASS_SCORE), Value(0)),
+        best_score=best_score
+    )
+
+
+def apply_score_change(result, old_score, is_new_submission=False):
+    """도전모드 결과 점수가 바뀐 뒤 호출: 랭킹 + 일일 기록 집계를 함께 갱신"""
+    update_rankings(result, old_score)
+    update_daily_activity(result, old_score, is_new_submission)
+
+
+# ==========================================
+# 답안 정오 변경 -> 시험 점수 반영 (트랜잭션 단위로 모아서 처리)
+# ==========================================
+class ScoreBatch:
+    """
+    한 트랜잭션 안에서 바뀐 시험 결과를 모아 두었다가 커밋 때 한 번씩만 재계산
+    - results: {(결과 모델, id): 처음 바뀌기 전 점수}
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def add(self, model, result_id):
+        key = (model, result_id)
+        if key not in self.results:
+            self.results[key] = model.objects.filter(pk=result_id).values_list('score', flat=True).first()
+
+    def __call__(self):
+        by_model = defaultdict(dict)
+        for (model, result_id), old_score in self.results.items():
+            if old_score is not None: by_model[model][result_id] = old_score
+        self.results = {}
+        for model, old_scores in by_model.items():
+            refresh_result_scores(model, old_scores)
+
+
+def _current_score_batch():
+    connection = transaction.get_connection()
+    batch = getattr(connection, 'vocab_score_batch', None)
+    # 롤백되면 on_commit 목록에서 빠지므로 그때는 새 배치를 등록
+    if batch is None or not any(entry[1] is batch for entry in connection.run_on_commit):
+        batch = connection.vocab_score_batch = ScoreBatch()
+        transaction.on_commit(batch)
+    return batch
+
+
+def queue_score_change(detail, delta):
+    """
+    답안 하나의 정오가 바뀌었을 때 (delta: +1 정답 처리, -1 오답 처리)
+    - 점수는 F() 로 바로 증감 (같은 트랜잭션 안에서도 최신 점수가 보이도록)
+    - 랭킹/일일 기록 반영과 최종 재계산은 커밋 때 결과별로 한 번만
+    """
+    model = detail._meta.get_field('result').related_model
+    in_atomic = transaction.get_connection().in_atomic_block
+    batch = _current_score_batch() if in_atomic else ScoreBatch()
+    batch.add(model, detail.result_id)
+    if delta:
+        changes = {'score': F('score') + delta}
+        if model is TestResult: changes['wrong_count'] = F('wrong_count') - delta
+        model.objects.filter(pk=detail.result_id).update(**changes)
+    if not in_atomic: batch()  # 트랜잭션 밖이면 바로 반영
+
+
+def refresh_result_scores(model, old_scores):
+    """맞은 개수로 점수를 다시 계산 (쿼리 1번) 후 도전모드는 랭킹/일일 기록까지 갱신"""
+    results = model.objects.filter(pk__in=old_scores).select_related('student').annotate(
+        correct=Count('details', filter=Q(details__is_correct=True)),
+        total=Count('details')
+    )
+    stale = []
+    for result in results:
+        if model is TestResult:
+            # 출제 수는 실제 저장된 답안 수 기준 (total_count 필드는 항상 기본값 30)
+            if (result.score, result.wrong_count) != (result.correct, result.total - result.correct):
+                result.score, result.wrong_count = result.correct, result.total - result.correct
+                stale.append(result)
+        elif result.score != result.correct:
+            result.score = result.correct
+            stale.append(result)
+    if stale:
+        model.objects.bulk_update(stale, ['score', 'wrong_count'] if model is TestResult else ['score'])
+
+    if model is TestResult:
+        for result in results:
+            apply_score_change(result, old_scores[result.pk])
+
+
+def rebuild_rankings():
+    """랭킹 집계 전체 재계산 (백필 / 데이터 정리 후 사용). 반환: (월간 행 수, 이벤트 수)"""
+    rows = TestResult.objects.filter(score__gte=PASS_SCORE).annotate(
+        month=TruncMonth('created_at')
+    ).values('month', 'student_id', 'student__branch_id').annotate(total=Sum('score'))
+
+    with transaction.atomic():
+        MonthlyRankingScore.objects.all().delete()
+        monthly = MonthlyRankingScore.objects.bulk_create([
+            MonthlyRankingScore(
+                month=r['month'].date() if hasattr(r['month'], 'date') else r['month'],
+                student_id=r['student_id'],
+                branch_id=r['student__branch_id'],
+                total_score=r['total']
+            )
+            for r in rows
+        ], batch_size=1000)
+
+        events = list(RankingEvent.objects.select_related('target_book'))
+        for event in events:
+            event.rebuild_scores()
+
+    return len(monthly), len(events)
+
+
+
+def sample_words(queryset, count=None):
+    """
+    시험 단어 무작위 추출 (영어 기준 중복 제거)
+    - 기존 방식(전체 shuffle 후 처음 나온 영어만 남기고 count개 자르기)과 같은 분포를
+      (id, english) 두 컬럼 스트림 + 크기 count 의 힙으로 계산 -> 단어장 전체를 메모리에 올리지 않음
+    - 각 행에 난수 우선순위를 주고, 영어별 최소 우선순위 행 중 가장 작은 count개를 선택
+    - 반환 개수는 min(count, 서로 다른 영어 수)가 보장됨 (count=None 이면 전부)
+    """
+    picked = sample_word_ids(queryset, count)
+    words = Word.objects.in_bulk(picked)
+    return [words[word_id] for word_id in picked if word_id in words]
+
+
+def sample_word_ids(queryset, count=None, rng=random):
+    """sample_words 의 id 버전 (rng 에 시드를 준 Random 을 넘기면 같은 순서를 다시 만들 수 있음)"""
+    if count is not None and count <= 0: return []
+
+    best = {}   # 영어 키 -> (우선순위, word id)
+    heap = []   # (-우선순위, 영어 키) 최대 힙, best 와 다른 항목은 지연 삭제
+
+    def drop_stale():
+        while heap and best.get(heap[0][1], (None,))[0] != -heap[0][0]:
+            heapq.heappop(heap)
+
+    rows = queryset.order_by('id').values_list('id', 'english_key').iterator(chunk_size=2000)  # 같은 시드 -> 같은 결과
+    for word_id, key in rows:
+        priority = rng.random()
+
+        current = best.get(key)
+        if current is not None and current[0] <= priority: continue
+        if current is None and count is not None and len(best) >= count:
+            drop_stale()
+            if priority >= -heap[0][0]: continue
+
+        best[key] = (priority, word_id)
+        heapq.heappush(heap, (-priority, key))
+
+        if count is not None and len(best) > count:
+            drop_stale()
+            _, evicted = heapq.heappop(heap)
+            del best[evicted]
+
+    return [word_id for _, word_id in sorted(best.values())]
+
+
+def learning_word_ids(queryset):
+    """학습 모드: Day 순서 그대로, 영어 기준 중복만 제거한 id 목록"""
+    seen = set()
+    word_ids = []
+    for word_id, key in queryset.order_by('number', 'id').values_list('id', 'english_key').iterator(chunk_size=2000):
+        if key not in seen:
+            seen.add(key)
+            word_ids.append(word_id)
+    return word_ids
+
+
+
+# ==========================================
+# 시험 세션 토큰 (시험 화면에서는 DB 에 쓰지 않고 제출 때 결과 생성)
+# ==========================================
+EXAM_TOKEN_SALT = 'vocab.exam-session'
+EXAM_TOKEN_MAX_AGE = getattr(settings, 'VOCAB_EXAM_TOKEN_MAX_AGE', 60 * 60 * 3)  # 초
+
+
+def issue_exam_token(profile, mode, words, book_id=None, test_range='전체'):
+    """출제 정보(학생, 모드, 단어장, 범위, 단어 id, 세션 키)를 서명한 토큰"""
+    return signing.dumps({
+        'k': secrets.token_hex(16),
+        's': profile.id,
+        'm': mode,
+        'b': book_id,
+        'r': test_range,
+        'w': [w.id for w in words],
+    }, salt=EXAM_TOKEN_SALT, compress=True)
+
+
+def read_exam_token(token, profile):
+    """토큰 검증 (위조/만료/다른 학생이면 signing.BadSignature)"""
+    data = signing.loads(token or '', salt=EXAM_TOKEN_SALT, max_age=EXAM_TOKEN_MAX_AGE)
+    if data.get('s') != profile.id:
+        raise signing.BadSignature('다른 학생의 시험 정보입니다.')
+    return data
+
+
+# 학습/연습 모드 나머지 페이지 요청용 토큰 (출제 순서 seed 를 서명 -> 학생이 seed 를 바꿔 캐시 키를 늘릴 수 없음)
+EXAM_WORDS_TOKEN_SALT = 'vocab.exam-words'
+
+
+def issue_exam_words_token(profile, mode, book_id, test_range, seed):
+    return signing.dumps({'s': profile.id, 'm': mode, 'b': book_id, 'r': test_range, 'n': seed}, salt=EXAM_WORDS_TOKEN_SALT)
+
+
+def read_exam_words_token(token, profile):
+    """토큰 검증 (위조/만료/다른 학생이면 signing.BadSignature)"""
+    data = signing.loads(token or '', salt=EXAM_WORDS_TOKEN_SALT, max_age=EXAM_TOKEN_MAX_AGE)
+    if data.get('s') != profile.id:
+        raise signing.BadSignature('다른 학생의 시험 정보입니다.')
+    return data
+
+
+# 응시 시작 기록 (쿨타임 / 월말 1회 확인용) - 시험 화면에서 DB 대신 서버 캐시에 저장
+# - 학생(profile) + 모드 기준이라 쿠키를 지우거나 다른 브라우저로 열어도 그대로 적용
+# - 여러 프로세스로 서비스할 때는 CACHES 를 공유 캐시(Redis / Memcached / DB)로 설정해야 함
+EXAM_STARTED_TTL = {'challenge': 5 * 60, 'wrong': 5 * 60, 'monthly': 31 * 24 * 60 * 60}  # 초
+
+
+def _exam_started_key(profile, mode):
+    return f"vocab:exam_started:{profile.id}:{mode}"
+
+
+def mark_exam_started(profile, mode):
+    if mode in EXAM_STARTED_TTL:
+        cache.set(_exam_started_key(profile, mode), timezone.now(), EXAM_STARTED_TTL[mode])
+
+
+def exam_started_at(profile, mode):
+    """제출하지 않은 시험의 시작 시각 (없으면 None)"""
+    if mode not in EXAM_STARTED_TTL: return None
+    return cache.get(_exam_started_key(profile, mode))
+
+
+def clear_exam_started(profile, mode):
+    """제출된 시험의 시작 기록 삭제 (이후 쿨타임은 update_cooldown 으로 저장된 값 기준)"""
+    cache.delete(_exam_started_key(profile, mode))
+
+
+def get_wrong_mode_book(user):
+    """오답모드 결과를 연결할 시스템 단어장 ('🚨 오답 집중 공략')"""
+    system_user = User.objects.filter(is_superuser=True).first() or user
+    sys_pub, _ = Publisher.objects.get_or_create(name="시스템")
+    book, _ = WordBook.objects.get_or_create(
+        title="🚨 오답 집중 공략",
+        publisher=sys_pub,
+        defaults={'uploaded_by': system_user}
+    )
+    return book
+
+# ==========================================
+# 채점 대기 건수 (선생님 알림 배지)
+# ==========================================
+def count_pending_corrections(user):
+    """직책별 담당 범위의 '정정 요청 대기' 답안 수를 직접 셈 (GradingInbox 초기값)"""
+    staff_profile = getattr(user, 'staff_profile', None)
+    position = staff_profile.position if staff_profile else None
+    qs_normal = TestResultDetail.objects.filter(is_correction_requested=True, is_resolved=False)
+    qs_monthly = MonthlyTestResultDetail.objects.filter(is_correction_requested=True, is_resolved=False)
+
+    if position == 'TA': pass 
+    elif position == 'PRINCIPAL':
+        if staff_profile and staff_profile.branch:
+            qs_normal = qs_normal.filter(result__student__branch=staff_profile.branch)
+            qs_monthly = qs_monthly.filter(result__student__branch=staff_profile.branch)
+        else:
+            return 0
+    else:
+        my_student_filter = (
+            Q(result__student__syntax_teacher=user) | 
+            Q(result__student__reading_teacher=user) |
+            Q(result__student__extra_class_teacher=user)
+        )
+        qs_normal = qs_normal.filter(my_student_filter)
+        qs_monthly = qs_monthly.filter(my_student_filter)
+    
+    return qs_normal.count() + qs_monthly.count()
+
+
+def get_grading_inbox(user):
+    inbox = GradingInbox.objects.filter(user=user).first()
+    if inbox is None:
+        # version 은 시각 기반으로 시작 -> 삭제 후 다시 만들어져도 예전 ETag 와 겹치지 않음
+        inbox, _ = GradingInbox.objects.get_or_create(user=user, defaults={
+            'pending_count': count_pending_corrections(user),
+            'version': time.time_ns() // 1000,
+        })
+    return inbox
+
+
+def _inbox_user_ids(branch_id, teacher_ids, include_ta=True):
+    teacher_ids = set(teacher_ids) - {None}
+    scope = Q(user_id__in=teacher_ids)
+    if include_ta:
+        scope |= Q(position='TA')
+    if branch_id:
+        scope |= Q(position='PRINCIPAL', branch_id=branch_id)
+
+    user_ids = set()
+    positions = {}
+    for user_id, position, staff_branch_id in StaffProfile.objects.filter(scope).values_list('user_id', 'position', 'branch_id'):
+        positions[user_id] = position
+        if (position == 'TA' and include_ta) or (position == 'PRINCIPAL' and staff_branch_id and staff_branch_id == branch_id):
+            user_ids.add(user_id)
+    # 원장/조교는 담당 여부가 아니라 지점/전체 기준으로만 셈
+    user_ids |= {uid for uid in teacher_ids if positions.get(uid) not in ('TA', 'PRINCIPAL')}
+    return user_ids
+
+
+def grading_inbox_user_ids(student):
+    """이 학생의 정정 요청을 보는 선생님 user id (조교 전체 + 같은 지점 원장 + 담당 선생님)"""
+    return _inbox_user_ids(
+        student.branch_id, (student.syntax_teacher_id, student.reading_teacher_id, student.extra_class_teacher_id)
+    )
+
+
+def assignment_inbox_user_ids(*assignments):
+    """
+    담당 정보가 바뀐 학생의 정정 요청 건수가 달라지는 선생님 user id
+    - assignments: {'branch_id', 'syntax_teacher_id', 'reading_teacher_id', 'extra_class_teacher_id'} (변경 전/후)
+    - 조교는 전체 기준이라 담당이 바뀌어도 건수가 그대로 -> 제외
+    """
+    user_ids = set()
+    for a in assignments:
+        user_ids |= _inbox_user_ids(
+            a['branch_id'], (a['syntax_teacher_id'], a['reading_teacher_id'], a['extra_class_teacher_id']),
+            include_ta=False
+        )
+    return user_ids
+
+
+def update_grading_inbox(student, delta):
+    """정정 요청 대기 건수 증감 (delta: +1 요청, -1 처리)"""
+    if not delta: return
+    GradingInbox.objects.filter(user_id__in=grading_inbox_user_ids(student)).update(
+        pending_count=F('pending_count') + delta,
+        version=F('version') + 1
+    )
+
+
+def invalidate_grading_inbox(user_ids=None):
+    """담당 관계가 바뀌거나 대량 수정된 경우: 해당 선생님(user_ids 가 없으면 전부) 건수를 지우고 다음 조회 때 다시 셈"""
+    inbox = GradingInbox.objects.all()
+    if user_ids is not None:
+        if not user_ids: return
+        inbox = inbox.filter(user_id__in=user_ids)
+    inbox.delete()
+
+
+def is_pending_correction(detail):
+    return detail.is_correction_requested and not detail.is_resolved
@@ -0,0 +1,903 @@
+import json
+import random
+import shutil
+import tempfile
+import threading
+import unicodedata
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Branch, School, StaffProfile
+from . import services, utils
+from .import_jobs import claim_next_import
+from .grading import build_answer_keys, grade_details, normalize_word_key
+from .models import (
+    Word, WordBook, TestResult, TestResultDetail, MonthlyTestResultDetail, DictionaryCache, GradingInbox,
+    DailyStudyActivity, WordMastery, RankingEvent, MonthlyRankingScore, EventRankingScore, PersonalWrongWord,
+)
+from .views import EXAM_WORD_PAGE_SIZE
+
+
+# ==========================================
+# 채점 목록 (grading_list)
+# ==========================================
+class GradingListTest(TestCase):
+    """학생 / 정정 요청 수가 늘어도 채점 목록의 쿼리 수는 그대로여야 함 (학생마다 쿼리 X) + 학습 현황 정렬 순서"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user('teacher', password='pw', is_staff=True)
+        StaffProfile.objects.update_or_create(user=cls.teacher, defaults={'position': 'TEACHER'})
+        cls.school = School.objects.create(name='테스트고')
+        cls.book = WordBook.objects.create(title='단어장', uploaded_by=cls.teacher)
+        cls.student_count = 0
+
+    def add_students(self, count):
+        for _ in range(count):
+            self.student_count += 1
+            user = User.objects.create_user(f'student{self.student_count}')
+            profile = user.profile
+            profile.name = f'학생{self.student_count}'
+            profile.school = self.school
+            profile.syntax_teacher = self.teacher
+            profile.save()
+
+            # 3명 중 1명은 통과 기록이 있고 통과일은 학생마다 다름
+            score = 30 if self.student_count % 3 == 0 else 25
+            result = TestResult.objects.create(student=profile, book=self.book, score=score, test_range='1-2')
+            TestResult.objects.filter(pk=result.pk).update(
+                created_at=timezone.now() - timedelta(days=self.student_count % 7, hours=self.student_count)
+            )
+            TestResultDetail.objects.create(
+                result=result, word_question='apple', student_answer='사과', correct_answer='사과', is_correct=True
+            )
+            TestResultDetail.objects.create(
+                result=result, word_question='pear', student_answer='배나무', correct_answer='배',
+                is_correction_requested=True
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('vocab:grading_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_students(self):
+        self.client.force_login(self.teacher)
+
+        self.add_students(5)
+        small_count, response = self.count_queries()
+        self.assertEqual(response.context['pending_total'], 5)
+        self.assertEqual(len(response.context['student_stats']), 5)
+
+        self.add_students(80)
+        with self.assertNumQueries(small_count):
+            response = self.client.get(reverse('vocab:grading_list'))
+        self.assertEqual(response.context['pending_total'], 85)
+        self.assertEqual(len(response.context['student_stats']), 50)  # STATS_PER_PAGE
+
+    def test_stats_order_no_record_first_then_most_recent_pass(self):
+        self.client.force_login(self.teacher)
+        self.add_students(12)
+
+        stats = self.client.get(reverse('vocab:grading_list')).context['student_stats']
+
+        self.assertEqual([s['status'] for s in stats[:8]], ['NONE'] * 8)
+        passed = [s['last_test_date'] for s in stats[8:]]
+        self.assertEqual(len(passed), 4)
+        self.assertEqual(passed, sorted(passed, reverse=True))
+
+
+# ==========================================
+# 외부 사전 검색 (crawl_daum_dic / fetch_translation)
+# ==========================================
+class DictionaryStubHandler(BaseHTTPRequestHandler):
+    """구글 번역 API 흉내 - 검색어(q)에 따라 정상 / 뜻 없음 / 500 / 응답 지연"""
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        self.requests_seen.append(query)
+        word = query.lower()
+
+        if word == 'broken':
+            self.send_response(500)
+            self.end_headers()
+            return
+        if word == 'slow':
+            time.sleep(1)
+
+        if word == 'zzzz':
+            body = [None]
+        elif word == 'apple':
+            body = [[["사과", "apple"]], [["명사", ["사과", "사과나무"]]]]
+        else:
+            body = [[[f"{query} 뜻", query]]]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 타임아웃으로 클라이언트가 먼저 끊은 경우
+
+    def log_message(self, *args):
+        pass
+
+
+class DictionaryLookupTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), DictionaryStubHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{cls.server.server_port}/translate_a/single'
+        cls.patches = [
+            mock.patch.object(utils, 'DICTIONARY_URL', url),
+            mock.patch.object(utils, 'DICTIONARY_TIMEOUT', (1.0, 0.2)),
+        ]
+        for patch in cls.patches:
+            patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        for patch in cls.patches:
+            patch.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        DictionaryStubHandler.requests_seen = []
+
+    def test_fetch_translation_parses_dictionary_meanings(self):
+        self.assertEqual(utils.fetch_translation('apple'), {
+            'english': 'apple', 'korean': '사과, 사과나무', 'source': 'google_translate'
+        })
+        self.assertEqual(utils.fetch_translation('banana')['korean'], 'banana 뜻')
+        self.assertIsNone(utils.fetch_translation('zzzz'))
+
+    def test_cache_miss_fetches_and_stores(self):
+        result = utils.crawl_daum_dic(' Apple ')
+
+        self.assertEqual(result['korean'], '사과, 사과나무')
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['Apple'])
+        entry = DictionaryCache.objects.get(query='apple')
+        self.assertTrue(entry.found)
+        self.assertGreater(entry.expires_at, timezone.now() + timedelta(days=29))
+
+    def test_cache_hit_skips_request(self):
+        utils.crawl_daum_dic('apple')
+        result = utils.crawl_daum_dic('APPLE')
+
+        self.assertEqual(result['korean'], '사과, 사과나무')
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['apple'])
+
+    def test_not_found_is_cached_briefly(self):
+        self.assertIsNone(utils.crawl_daum_dic('zzzz'))
+        self.assertIsNone(utils.crawl_daum_dic('zzzz'))
+
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['zzzz'])
+        entry = DictionaryCache.objects.get(query='zzzz')
+        self.assertFalse(entry.found)
+        self.assertLess(entry.expires_at, timezone.now() + timedelta(days=2))
+
+    def test_http_error_returns_none_and_backs_off(self):
+        with self.assertLogs('vocab.utils', 'WARNING'):
+            self.assertIsNone(utils.crawl_daum_dic('broken'))
+        self.assertIsNone(utils.crawl_daum_dic('broken'))
+
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['broken'])
+        entry = DictionaryCache.objects.get(query='broken')
+        self.assertFalse(entry.found)
+        self.assertLessEqual(entry.expires_at, timezone.now() + utils.DICTIONARY_ERROR_TTL)
+
+    def test_timeout_returns_none(self):
+        started = time.monotonic()
+        with self.assertLogs('vocab.utils', 'WARNING'):
+            self.assertIsNone(utils.crawl_daum_dic('slow'))
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(DictionaryCache.objects.get(query='slow').found)
+
+    def test_stale_cache_is_used_when_request_fails(self):
+        past = timezone.now() - timedelta(days=40)
+        DictionaryCache.objects.create(
+            query='broken', english='broken', korean='고장난', source='google_translate',
+            found=True, fetched_at=past, expires_at=past + utils.DICTIONARY_TTL,
+        )
+
+        with self.assertLogs('vocab.utils', 'WARNING'):
+            result = utils.crawl_daum_dic('broken')
+
+        self.assertEqual(result['korean'], '고장난')
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['broken'])
+        entry = DictionaryCache.objects.get(query='broken')
+        self.assertGreater(entry.expires_at, timezone.now())  # 잠시 동안은 다시 요청하지 않음
+        self.assertEqual(utils.crawl_daum_dic('broken')['korean'], '고장난')
+        self.assertEqual(DictionaryStubHandler.requests_seen, ['broken'])
+
+
+# ==========================================
+# 결과 묶음 저장 (save_results_batch)
+# ==========================================
+class SaveResultsBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student', password='pw')
+        cls.profile = cls.user.profile
+        cls.book = WordBook.objects.create(title='단어장', uploaded_by=cls.user)
+        cls.words = [
+            Word.objects.create(book=cls.book, english=f'word{i}', korean=f'뜻{i}', number=1) for i in range(3)
+        ]
+
+    def item(self, details=None):
+        token = services.issue_exam_token(self.profile, 'challenge', self.words, book_id=self.book.id)
+        if details is None:
+            details = [{'english': w.english, 'user_input': w.korean} for w in self.words]
+        return {'exam_token': token, 'details': details}
+
+    def post(self, items):
+        return self.client.post(
+            reverse('vocab:save_results_batch'), json.dumps({'items': items}), content_type='application/json'
+        )
+
+    def test_malformed_items_fail_individually(self):
+        self.client.force_login(self.user)
+        items = [
+            self.item(),
+            'not-a-dict',
+            self.item(details='not-a-list'),
+            self.item(details=['not-a-dict']),
+            self.item(details=[{'english': ['word0'], 'user_input': '뜻0'}]),
+            self.item(details=[{'english': 'word0', 'user_input': 7}]),
+            {'exam_token': 123, 'details': []},
+        ]
+
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['saved'] + ['error'] * 6)
+        self.assertEqual(TestResult.objects.get().score, 3)
+        self.assertEqual(TestResultDetail.objects.count(), 3)
+
+    def test_saved_exam_clears_started_marker(self):
+        self.client.force_login(self.user)
+        services.mark_exam_started(self.profile, 'challenge')
+
+        response = self.post([self.item()])
+
+        self.assertEqual(response.json()['results'][0]['status'], 'saved')
+        self.assertIsNone(services.exam_started_at(self.profile, 'challenge'))
+
+
+# ==========================================
+# 응시 시작 기록 (쿨타임 / 월말 1회)
+# ==========================================
+class ExamStartedTest(TestCase):
+    """시작 기록은 서버에 있으므로 쿠키를 지우거나 다른 브라우저로 열어도 적용되어야 함"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student')
+        cls.profile = cls.user.profile
+        cls.book = WordBook.objects.create(title='단어장', uploaded_by=cls.user)
+        Word.objects.bulk_create([
+            Word(book=cls.book, english=f'word{i}', english_key=f'word{i}', korean=f'뜻{i}', number=1)
+            for i in range(120)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def open_exam(self, mode):
+        self.client.cookies.clear()  # 매번 새 브라우저처럼
+        self.client.force_login(self.user)
+        return self.client.get(reverse('vocab:exam'), {'mode': mode, 'book_id': self.book.id})
+
+    def test_challenge_cooldown_survives_new_browser(self):
+        self.assertIsNotNone(self.open_exam('challenge').context)
+        self.assertIsNotNone(services.exam_started_at(self.profile, 'challenge'))
+
+        response = self.open_exam('challenge')
+        self.assertIn('쿨타임 중입니다', response.content.decode())
+
+    def test_monthly_cannot_be_redrawn(self):
+        self.assertEqual(len(self.open_exam('monthly').context['words_json']), 100)
+
+        response = self.open_exam('monthly')
+        self.assertIn('이미 응시하셨습니다', response.content.decode())
+
+    def test_practice_does_not_mark_start(self):
+        self.open_exam('practice')
+        self.assertIsNone(services.exam_started_at(self.profile, 'practice'))
+        self.assertIsNotNone(self.open_exam('practice').context)
+
+
+# ==========================================
+# 채점 대기 건수 (GradingInbox)
+# ==========================================
+class GradingInboxTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher_a = User.objects.create_user('teacher_a', is_staff=True)
+        cls.teacher_b = User.objects.create_user('teacher_b', is_staff=True)
+        cls.assistant = User.objects.create_user('assistant', is_staff=True)
+        StaffProfile.objects.update_or_create(user=cls.teacher_a, defaults={'position': 'TEACHER'})
+        StaffProfile.objects.update_or_create(user=cls.teacher_b, defaults={'position': 'TEACHER'})
+        StaffProfile.objects.update_or_create(user=cls.assistant, defaults={'position': 'TA'})
+
+        cls.student = User.objects.create_user('student').profile
+        cls.student.name = '학생'
+        cls.student.syntax_teacher = cls.teacher_a
+        cls.student.save()
+        book = WordBook.objects.create(title='단어장', uploaded_by=cls.teacher_a)
+        cls.result = TestResult.objects.create(student=cls.student, book=book, score=29)
+        TestResultDetail.objects.create(
+            result=cls.result, word_question='pear', student_answer='배나무', correct_answer='배',
+            is_correction_requested=True
+        )
+
+    def setUp(self):
+        self.student.refresh_from_db()
+        for user in (self.teacher_a, self.teacher_b, self.assistant):
+            services.get_grading_inbox(user)
+
+    def inbox_counts(self):
+        return dict(GradingInbox.objects.values_list('user__username', 'pending_count'))
+
+    def test_initial_counts(self):
+        self.assertEqual(self.inbox_counts(), {'teacher_a': 1, 'teacher_b': 0, 'assistant': 1})
+
+    def test_saving_student_without_assignment_change_keeps_inbox(self):
+        with self.assertNumQueries(1):  # UPDATE 만 (이전 담당 정보 조회 없음)
+            self.student.save()
+        with self.assertNumQueries(1):
+            self.student.save(update_fields=['name'])
+        self.assertEqual(len(self.inbox_counts()), 3)
+
+    def test_reassigning_student_invalidates_only_old_and_new_teacher(self):
+        self.student.syntax_teacher = self.teacher_b
+        self.student.save()
+
+        self.assertEqual(self.inbox_counts(), {'assistant': 1})
+        self.assertEqual(services.get_grading_inbox(self.teacher_a).pending_count, 0)
+        self.assertEqual(services.get_grading_inbox(self.teacher_b).pending_count, 1)
+
+    def test_staff_profile_save_invalidates_only_that_teacher(self):
+        self.teacher_b.staff_profile.save()
+
+        self.assertEqual(self.inbox_counts(), {'teacher_a': 1, 'assistant': 1})
+
+    def test_deleting_result_decrements_affected_inboxes(self):
+        self.result.delete()
+
+        self.assertEqual(self.inbox_counts(), {'teacher_a': 0, 'teacher_b': 0, 'assistant': 0})
+
+
+# ==========================================
+# 학습/연습 모드 단어 나눠 받기 (api_exam_words)
+# ==========================================
+class ExamWordsPagingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student')
+        cls.book = WordBook.objects.create(title='단어장', uploaded_by=cls.user)
+        Word.objects.bulk_create([
+            Word(book=cls.book, english=f'word{i}', english_key=f'word{i}', korean=f'뜻{i}', number=i // 100 + 1)
+            for i in range(EXAM_WORD_PAGE_SIZE * 2 + 50)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def fetch_pages(self, mode):
+        response = self.client.get(reverse('vocab:exam'), {'mode': mode, 'book_id': self.book.id})
+        url = response.context['words_url']
+        english = [w['english'] for w in response.context['words_json']]
+
+        page, has_next = 1, True
+        while has_next:
+            page += 1
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(f'{url}&page={page}').json()
+            word_queries = [q['sql'] for q in ctx.captured_queries if 'vocab_word"' in q['sql']]
+            self.assertEqual(len(word_queries), 1, word_queries)  # 해당 페이지 단어만 (id 목록은 캐시)
+            english += [w[0] for w in data['words']]
+            has_next = data['has_next']
+        return english
+
+    def test_practice_pages_follow_cached_order(self):
+        english = self.fetch_pages('practice')
+
+        self.assertEqual(len(english), Word.objects.count())
+        self.assertEqual(set(english), set(Word.objects.values_list('english', flat=True)))
+
+    def test_learning_pages_keep_day_order(self):
+        english = self.fetch_pages('learning')
+
+        self.assertEqual(english, list(Word.objects.order_by('number', 'id').values_list('english', flat=True)))
+
+    def test_edited_book_is_read_again(self):
+        self.fetch_pages('practice')
+        Word.objects.create(book=self.book, english='extra', korean='추가', number=9)
+
+        self.assertIn('extra', self.fetch_pages('practice'))
+
+    def test_seed_comes_only_from_signed_token(self):
+        url = self.client.get(reverse('vocab:exam'), {'mode': 'practice', 'book_id': self.book.id}).context['words_url']
+        token = parse_qs(urlparse(url).query)['t'][0]
+        api_url = reverse('vocab:api_exam_words')
+
+        # seed 를 바꾼 토큰 / 쿼리로 넘긴 seed 는 받지 않음 -> 학생이 캐시 키를 늘릴 수 없음
+        forged = f"{token[:-1]}{'A' if token[-1] != 'A' else 'B'}"
+        self.assertEqual(self.client.get(api_url, {'t': forged, 'page': 2}).status_code, 400)
+        self.assertEqual(self.client.get(api_url, {'mode': 'practice', 'book_id': self.book.id, 'seed': 1, 'page': 2}).status_code, 400)
+
+        # 다른 학생의 토큰도 거절
+        other = User.objects.create_user('other')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(api_url, {'t': token, 'page': 2}).status_code, 400)
+
+
+# ==========================================
+# 시험 제출 -> 정답 인정 -> 삭제 흐름의 집계 (숙련도 / 랭킹 / 일일 기록)
+# ==========================================
+class ExamFlowMixin:
+    """도전모드 시험 제출 / 정답 인정 도우미 (커밋 때 실행되는 집계까지 반영)"""
+
+    @staticmethod
+    def make_book(uploaded_by, title='단어장', count=30):
+        book = WordBook.objects.create(title=title, uploaded_by=uploaded_by)
+        words = [Word.objects.create(book=book, english=f'word{i}', korean=f'뜻{i}', number=1) for i in range(count)]
+        return book, words
+
+    def submit(self, user, book, words, wrong=0):
+        """앞의 wrong 개는 틀리게 답해서 제출 -> TestResult"""
+        token = services.issue_exam_token(user.profile, 'challenge', words, book_id=book.id)
+        details = [{'english': w.english, 'user_input': 'x' if i < wrong else w.korean} for i, w in enumerate(words)]
+        self.client.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('vocab:save_result'), json.dumps({'exam_token': token, 'mode': 'challenge', 'details': details}),
+                content_type='application/json'
+            )
+        return TestResult.objects.get(exam_key=services.read_exam_token(token, user.profile)['k'])
+
+    def approve(self, staff, detail):
+        self.client.force_login(staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('vocab:approve_answer'), json.dumps({'detail_id': detail.id}), content_type='application/json'
+            )
+        return response.json()
+
+    def delete(self, result):
+        with self.captureOnCommitCallbacks(execute=True):
+            result.delete()
+
+    @staticmethod
+    def mastery():
+        return {
+            (m.student_id, m.word_key): (m.attempt_count, m.wrong_count)
+            for m in WordMastery.objects.all() if m.attempt_count
+        }
+
+    @staticmethod
+    def rebuilt_mastery():
+        """남아 있는 답안 전체로 다시 센 숙련도"""
+        counts = {}
+        for model in (TestResultDetail, MonthlyTestResultDetail):
+            for student_id, question, is_correct in model.objects.values_list('result__student_id', 'word_question', 'is_correct'):
+                key = (student_id, normalize_word_key(question))
+                attempts, wrongs = counts.get(key, (0, 0))
+                counts[key] = (attempts + 1, wrongs + (0 if is_correct else 1))
+        return counts
+
+
+class WordMasteryFlowTest(ExamFlowMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('teacher', is_staff=True)
+        cls.user = User.objects.create_user('student')
+        cls.book, cls.words = cls.make_book(cls.staff)
+
+    def test_submit_approve_flip_delete(self):
+        student_id = self.user.profile.id
+        result = self.submit(self.user, self.book, self.words, wrong=3)
+        self.assertEqual(self.mastery()[(student_id, 'word0')], (1, 1))
+        self.assertEqual(self.mastery()[(student_id, 'word5')], (1, 0))
+        self.assertEqual(self.mastery(), self.rebuilt_mastery())
+
+        # 정답 인정: 오답수만 -1 (출제수는 그대로)
+        self.assertEqual(self.approve(self.staff, result.details.get(word_question='word0'))['status'], 'success')
+        self.assertEqual(self.mastery()[(student_id, 'word0')], (1, 0))
+        # 이미 정답인 답안을 다시 인정해도 두 번 빠지지 않음
+        self.assertEqual(self.approve(self.staff, result.details.get(word_question='word0'))['status'], 'already_correct')
+        self.assertEqual(self.mastery()[(student_id, 'word0')], (1, 0))
+
+        # 관리자 인라인에서 정답 -> 오답으로 수정
+        detail = result.details.get(word_question='word5')
+        detail.is_correct = False
+        with self.captureOnCommitCallbacks(execute=True):
+            detail.save()
+        self.assertEqual(self.mastery()[(student_id, 'word5')], (1, 1))
+        self.assertEqual(self.mastery(), self.rebuilt_mastery())
+
+        # 두 번째 시험 후 첫 시험 삭제 -> 남은 시험만큼만 남음
+        self.submit(self.user, self.book, self.words, wrong=1)
+        self.delete(result)
+        self.assertEqual(self.mastery()[(student_id, 'word0')], (1, 1))
+        self.assertEqual(self.mastery(), self.rebuilt_mastery())
+
+
+class RankingFlowTest(ExamFlowMixin, TestCase):
+    """증분으로 쌓은 랭킹 / 일일 기록이 전체 재계산(rebuild_rankings) 결과와 같아야 함"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('teacher', is_staff=True)
+        branch = Branch.objects.create(name='본점')
+        cls.students = [User.objects.create_user(f'student{i}') for i in range(2)]
+        profile = cls.students[0].profile
+        profile.branch = branch
+        profile.save()
+        cls.book, cls.words = cls.make_book(cls.staff)
+        cls.other_book, cls.other_words = cls.make_book(cls.staff, title='다른 단어장')
+        today = timezone.now().date()
+        RankingEvent.objects.create(
+            title='이벤트', target_book=cls.book, start_date=today - timedelta(days=1), end_date=today + timedelta(days=1)
+        )
+
+    @staticmethod
+    def ranking_rows():
+        monthly = {
+            (r.month, r.student_id, r.branch_id): r.total_score
+            for r in MonthlyRankingScore.objects.all() if r.total_score
+        }
+        event = {
+            (r.event_id, r.student_id, r.branch_id): r.total_score
+            for r in EventRankingScore.objects.all() if r.total_score
+        }
+        return monthly, event
+
+    @staticmethod
+    def daily_rows():
+        return {
+            (a.student_id, a.date): (a.test_count, a.pass_count, a.best_score)
+            for a in DailyStudyActivity.objects.all() if a.test_count
+        }
+
+    @staticmethod
+    def rebuilt_daily_rows():
+        """답안이 있는 결과로 다시 센 일일 기록 (0007 백필과 같은 기준)"""
+        rows = {}
+        for result in TestResult.objects.filter(details__isnull=False).distinct():
+            t, p, b = rows.get((result.student_id, result.created_at.date()), (0, 0, 0))
+            rows[(result.student_id, result.created_at.date())] = (
+                t + 1, p + int(result.score >= services.PASS_SCORE), max(b, result.score)
+            )
+        return rows
+
+    def assert_matches_rebuild(self):
+        incremental = self.ranking_rows()
+        daily = self.daily_rows()
+        services.rebuild_rankings()
+        self.assertEqual(incremental, self.ranking_rows())
+        self.assertEqual(daily, self.rebuilt_daily_rows())
+
+    def test_submit_approve_delete_matches_rebuild(self):
+        first, second = self.students
+        passed = self.submit(first, self.book, self.words, wrong=1)           # 29점: 랭킹 + 이벤트
+        borderline = self.submit(first, self.book, self.words, wrong=4)       # 26점: 불합격
+        self.submit(first, self.other_book, self.other_words)                 # 30점: 월간만
+        failed = self.submit(second, self.book, self.words, wrong=10)         # 20점
+        self.assert_matches_rebuild()
+        self.assertEqual(MonthlyRankingScore.objects.get(student=first.profile).total_score, 59)
+
+        # 26 -> 27점: 정답 인정으로 통과하면 27점 전체가 랭킹에 들어감
+        self.approve(self.staff, borderline.details.filter(is_correct=False).first())
+        self.assertEqual(MonthlyRankingScore.objects.get(student=first.profile).total_score, 86)
+        self.assert_matches_rebuild()
+
+        # 삭제: 통과한 시험은 랭킹/일일 기록에서 빠지고, 불합격 시험은 응시 횟수만 빠짐
+        self.delete(passed)
+        self.delete(failed)
+        self.assertEqual(MonthlyRankingScore.objects.get(student=first.profile).total_score, 57)
+        self.assert_matches_rebuild()
+
+    def test_deleting_student_removes_aggregates(self):
+        first = self.students[0]
+        self.submit(first, self.book, self.words)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.profile.delete()
+        self.assertEqual(self.ranking_rows(), ({}, {}))
+        self.assertEqual(self.daily_rows(), {})
+
+
+class ScoreBatchTest(TransactionTestCase):
+    """답안 정오 변경은 점수를 바로 바꾸고, 랭킹/일일 기록은 (롤백되지 않은) 커밋 때 결과별로 한 번만 반영"""
+
+    def setUp(self):
+        user = User.objects.create_user('student')
+        self.profile = user.profile
+        book = WordBook.objects.create(title='단어장', uploaded_by=user)
+        self.result = TestResult.objects.create(student=self.profile, book=book, score=26, wrong_count=4)
+        TestResultDetail.objects.bulk_create([
+            TestResultDetail(
+                result=self.result, word_question=f'word{i}', student_answer='x', correct_answer=f'뜻{i}', is_correct=i >= 4
+            )
+            for i in range(30)
+        ])
+        services.apply_score_change(self.result, 0, is_new_submission=True)
+        self.details = list(self.result.details.filter(is_correct=False).order_by('id'))
+
+    def flip(self, detail):
+        detail = TestResultDetail.objects.get(pk=detail.pk)
+        detail.is_correct = True
+        detail.save()
+
+    def score(self):
+        return TestResult.objects.values_list('score', 'wrong_count').get(pk=self.result.pk)
+
+    def ranking(self):
+        return MonthlyRankingScore.objects.filter(student=self.profile).values_list('total_score', flat=True).first()
+
+    def activity(self):
+        return DailyStudyActivity.objects.values_list('test_count', 'pass_count', 'best_score').get(student=self.profile)
+
+    def test_nested_atomic_blocks_refresh_once_on_commit(self):
+        with mock.patch.object(services, 'refresh_result_scores', wraps=services.refresh_result_scores) as refresh:
+            with transaction.atomic():
+                self.flip(self.details[0])
+                with transaction.atomic():
+                    self.flip(self.details[1])
+                with transaction.atomic():
+                    self.flip(self.details[2])
+                self.assertEqual(self.score(), (29, 1))  # 점수는 트랜잭션 안에서도 바로 보임
+                self.assertIsNone(self.ranking())         # 랭킹은 커밋 때
+            self.assertEqual(refresh.call_count, 1)
+
+        self.assertEqual(self.score(), (29, 1))
+        self.assertEqual(self.ranking(), 29)
+        self.assertEqual(self.activity(), (1, 1, 29))
+
+    def test_savepoint_rollback_drops_its_changes(self):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    self.flip(self.details[0])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.flip(self.details[1])
+
+        self.assertEqual(self.score(), (27, 3))
+        self.assertEqual(self.ranking(), 27)
+        self.assertEqual(self.activity(), (1, 1, 27))
+
+    def test_rolled_back_transaction_then_autocommit(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.flip(self.details[0])
+                self.flip(self.details[1])
+                raise RuntimeError
+        self.assertEqual(self.score(), (26, 4))
+        self.assertIsNone(self.ranking())
+
+        self.flip(self.details[2])  # 트랜잭션 밖 -> 바로 반영
+        self.assertEqual(self.score(), (27, 3))
+        self.assertEqual(self.ranking(), 27)
+        self.assertEqual(self.activity(), (1, 1, 27))
+
+
+class ReviewQueueTest(TestCase):
+    """오답 노트 복습 일정: 1 / 3 / 7 / 14 / 30일 간격, 끝까지 맞추면 졸업, 틀리면 처음부터"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('student')
+        cls.profile = user.profile
+        book = WordBook.objects.create(title='단어장', uploaded_by=user)
+        cls.word = Word.objects.create(book=book, english='Apple', korean='사과', number=1)
+
+    def setUp(self):
+        self.entry = PersonalWrongWord.objects.create(student=self.profile, word=self.word)
+
+    def answer(self, correct, overdue=True):
+        if overdue:  # 복습할 때가 된 상태로
+            PersonalWrongWord.objects.filter(pk=self.entry.pk).update(due_at=timezone.now() - timedelta(minutes=1))
+        services.update_review_queue(self.profile, [{'q': 'apple', 'c': correct}])
+        self.entry.refresh_from_db()
+
+    def assert_due_in(self, days):
+        expected = timezone.now() + timedelta(days=days)
+        self.assertAlmostEqual(self.entry.due_at.timestamp(), expected.timestamp(), delta=5)
+
+    def test_intervals_then_graduation(self):
+        self.assertEqual(services.review_batch(self.profile), [self.word])
+
+        for count, days in enumerate((1, 3, 7, 14, 30), 1):
+            self.answer(True)
+            self.assertEqual(self.entry.success_count, count)
+            self.assert_due_in(days)
+            self.assertEqual(services.review_batch(self.profile), [])
+
+        self.answer(True)
+        self.assertIsNone(self.entry.due_at)  # 졸업
+        self.answer(False, overdue=False)
+        self.assertIsNone(self.entry.due_at)  # 졸업한 단어는 다시 틀려도 그대로
+
+    def test_early_correct_answer_does_not_advance(self):
+        self.answer(True)
+        due_at = self.entry.due_at
+        self.answer(True, overdue=False)
+        self.assertEqual((self.entry.success_count, self.entry.due_at), (1, due_at))
+
+    def test_wrong_answer_resets(self):
+        self.answer(True)
+        self.answer(True)
+        self.answer(False, overdue=False)
+
+        self.assertEqual((self.entry.success_count, self.entry.lapse_count), (0, 1))
+        self.assertLessEqual(self.entry.due_at, timezone.now())
+        self.assertEqual(services.review_batch(self.profile), [self.word])
+
+    def test_any_wrong_answer_in_the_exam_counts_as_wrong(self):
+        services.update_review_queue(self.profile, [{'q': 'Apple', 'c': True}, {'q': 'apple ', 'c': False}])
+        self.entry.refresh_from_db()
+        self.assertEqual((self.entry.success_count, self.entry.lapse_count), (0, 1))
+
+
+# ==========================================
+# 일일 학습 기록 (DailyStudyActivity) - 결과 삭제
+# ==========================================
+class DailyActivityDeleteTest(ExamFlowMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student')
+        cls.profile = cls.user.profile
+        cls.book, cls.words = cls.make_book(cls.user)
+
+    def activity(self):
+        return DailyStudyActivity.objects.values_list('test_count', 'pass_count', 'best_score').get(student=self.profile)
+
+    def test_deleting_abandoned_result_keeps_activity(self):
+        submitted = self.submit(self.user, self.book, self.words)
+        # 예전 시험 화면이 열릴 때 만들던 0점 / 답안 없는 행 (일일 기록에 들어간 적 없음)
+        abandoned = TestResult.objects.create(student=self.profile, book=self.book, score=0)
+        self.assertEqual(self.activity(), (1, 1, 30))
+
+        abandoned.delete()
+        self.assertEqual(self.activity(), (1, 1, 30))
+
+        submitted.delete()
+        self.assertEqual(self.activity(), (0, 0, 0))
+
+
+# ==========================================
+# 단어장 CSV 등록 (작은 파일은 저장 직후, 큰 파일은 run_wordbook_imports 워커)
+# ==========================================
+@override_settings(VOCAB_CSV_INLINE_MAX_BYTES=200)
+class WordBookImportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', is_staff=True, is_superuser=True)
+
+    def upload(self, title, rows):
+        content = "Day,영어,뜻\n" + "".join(f"1,word{i},뜻{i}\n" for i in range(rows))
+        with self.captureOnCommitCallbacks(execute=True):
+            return WordBook.objects.create(
+                title=title, uploaded_by=self.admin,
+                csv_file=SimpleUploadedFile(f'{title}.csv', content.encode('utf-8'))
+            )
+
+    def test_small_file_is_imported_on_save(self):
+        book = self.upload('small', 3)
+        book.refresh_from_db()
+        self.assertEqual(book.import_status, 'DONE')
+        self.assertEqual(book.words.count(), 3)
+
+    def test_large_file_is_left_to_the_worker(self):
+        book = self.upload('large', 50)
+        book.refresh_from_db()
+        self.assertEqual(book.import_status, 'PENDING')
+        self.assertFalse(book.words.exists())
+
+        call_command('run_wordbook_imports', '--once', stdout=mock.MagicMock())
+        book.refresh_from_db()
+        self.assertEqual(book.import_status, 'DONE')
+        self.assertEqual(book.words.count(), 50)
+        self.assertIn('등록 50개', book.import_message)
+
+        # 다시 저장해도 다시 등록하지 않음
+        book.save()
+        book.refresh_from_db()
+        self.assertEqual(book.import_status, 'DONE')
+
+    def test_book_is_claimed_once_and_stale_run_is_reclaimed(self):
+        book = self.upload('large', 50)
+        self.assertEqual(claim_next_import(), book)
+        self.assertIsNone(claim_next_import())  # RUNNING 은 다른 워커가 가져가지 않음
+
+        WordBook.objects.filter(pk=book.pk).update(import_started_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(claim_next_import(), book)  # 멈춘 작업은 다시 가져감
+
+
+# ==========================================
+# 채점 엔진 (grade_details) == 기준 구현 (calculate_score)
+# ==========================================
+class GradingParityTest(TestCase):
+    """고정 시드로 만든 정답/답안 조합을 두 채점 함수로 채점해서 결과가 모두 같은지 확인"""
+    CASES = 5000
+    PIECES = [
+        '사과', '배', '회피하다', '외면 하다', '상호 작용하다', 'Apple', 'ABC', 'x', '가', '하다',
+        ' ', '  ', ',', ', ', '/', '(', ')', '[', ']', '1.', '2. ', '10.', '~', '-', '!', '?', '·', "'", '_', '3',
+        '\u1100\u1161',  # 자모로 나뉜 '가' (NFD)
+        '\u00c9',
+    ]
+
+    def random_text(self, rng, max_pieces=6):
+        return ''.join(rng.choice(self.PIECES) for _ in range(rng.randint(0, max_pieces)))
+
+    def random_answer(self, rng, korean):
+        """정답 후보를 조금씩 바꾼 답안 (맞는 경우 / 틀리는 경우가 고르게 나오도록)"""
+        choice = rng.random()
+        if choice < 0.3:
+            return self.random_text(rng, 3)
+        parts = [p for p in korean.replace('/', ',').split(',') if p.strip()] or [korean]
+        answer = rng.choice(parts)
+        if choice < 0.5: answer = answer.upper()
+        elif choice < 0.6: answer = unicodedata.normalize('NFD', answer)
+        elif choice < 0.7: answer = answer.replace(' ', '')
+        elif choice < 0.8: answer = f"{self.random_text(rng, 2)}, {answer}"
+        elif choice < 0.9: answer = answer + rng.choice(['!', '(', ')', '.', ' ', '하'])
+        return answer
+
+    def test_random_cases_match_reference(self):
+        rng = random.Random(20240501)
+        items = []
+        for i in range(self.CASES):
+            korean = self.random_text(rng)
+            items.append({'english': f'w{i}', 'korean': korean, 'user_input': self.random_answer(rng, korean)})
+
+        expected = services.calculate_score(items)
+        self.assertEqual(grade_details(items), expected)
+        # 저장된 정답 후보(Word.answer_keys)로 채점해도 같은 결과
+        stored_keys = {item['english']: frozenset(build_answer_keys(item['korean'])) for item in items}
+        self.assertEqual(grade_details(items, stored_keys), expected)
+
+        correct = expected[0]
+        self.assertGreater(correct, self.CASES // 10)            # 맞는 경우와
+        self.assertGreater(self.CASES - correct, self.CASES // 10)  # 틀리는 경우가 모두 충분히 섞여 있어야 의미가 있음
@@ -7,6 +7,8 @@ urlpatterns = [
     path('', views.index, name='index'),                           # 단어장 선택 (메인)
     path('exam/', views.exam, name='exam'),                        # 시험 화면
     path('save_result/', views.save_result, name='save_result'),   # 결과 저장 API
+    path('save_result/batch/', views.save_results_batch, name='save_results_batch'),   # 오프라인 제출분 묶음 저장
+    path('api/exam/words/', views.api_exam_words, name='api_exam_words'),  # 학습/연습 단어 나눠 받기
     path('wrong_study/', views.wrong_answer_study, name='wrong_study'), # 오답 학습 화면
     path('request_correction/', views.request_correction, name='request_correction'), 
     path('result/<int:result_id>/', views.test_result_detail, name='result_detail'),   # 상세 결과표
@@ -41,6 +43,7 @@ urlpatterns = [
     path('api/search/', views.api_search_word, name='api_search_word'),
     path('api/add_wrong/', views.api_add_personal_wrong, name='api_add_personal_wrong'),
     path('api/history/date/', views.api_date_history, name='api_date_history'),
+    path('api/history/month/', views.api_month_history, name='api_month_history'),
     path('my-wrongs/', views.wrong_word_list, name='wrong_word_list'), # [NEW] 오답 목록 페이지
     path('api/chapters/', views.api_get_chapters, name='api_get_chapters'),
 ]   
@@ -1,42 +1,42 @@
+import logging
+from datetime import timedelta
 import requests
+from django.conf import settings
+from django.db.models import F
 from django.utils import timezone
-from .models import TestResultDetail, MonthlyTestResultDetail, Word, TestResult, PersonalWrongWord
+from .models import Word, TestResult, PersonalWrongWord, WordMastery, DictionaryCache
+
+logger = logging.getLogger(__name__)
 
 # ==============================================================================
 # [1] 기존 로직: 오답 단어 추출 (이 부분이 없으면 에러가 납니다!)
 # ==============================================================================
-def get_vulnerable_words(profile):
+def get_vulnerable_words(profile, include_personal=True):
     """
     오답률 높은 단어 + 학생이 직접 추가한 오답 단어 병합하여 반환
+    - 오답 노트 단어는 복습을 졸업한 것(due_at=None) 제외
     """
-    # 1. 기존 시험 오답 데이터 수집
-    normal_details = TestResultDetail.objects.filter(result__student=profile)
-    monthly_details = MonthlyTestResultDetail.objects.filter(result__student=profile)
-
-    stats = {}
-    def update_stats(queryset):
-        for d in queryset:
-            key = d.word_question.strip().lower()
-            if key not in stats: stats[key] = {'total': 0, 'wrong': 0}
-            stats[key]['total'] += 1
-            if not d.is_correct: stats[key]['wrong'] += 1
-
-    update_stats(normal_details)
-    update_stats(monthly_details)
-
-    # 틀린 비율이 25% 이상인 단어 필터링
-    vulnerable_keys = {text for text, data in stats.items() if data['total'] > 0 and (data['wrong'] / data['total'] >= 0.25)}
+    # 1. 시험 오답 통계 (WordMastery에 증분 누적된 값 사용)
+    # 틀린 비율이 25% 이상인 단어 필터링 (wrong / total >= 0.25  <=>  wrong * 4 >= total)
+    vulnerable_keys = set(
+        WordMastery.objects.filter(
+            student=profile,
+            attempt_count__gt=0,
+            attempt_count__lte=F('wrong_count') * 4
+        ).values_list('word_key', flat=True)
+    )
 
     # 2. 학생이 직접 추가한 오답 단어 수집
-    personal_wrongs = PersonalWrongWord.objects.filter(student=profile).select_related('word')
-    for pw in personal_wrongs:
-        vulnerable_keys.add(pw.word.english.strip().lower())
+    if include_personal:
+        vulnerable_keys.update(
+            PersonalWrongWord.objects.filter(student=profile, due_at__isnull=False).values_list('word__english_key', flat=True)
+        )
     
     if not vulnerable_keys:
         return []
 
-    # 3. 실제 Word 객체 조회
-    candidates = Word.objects.filter(english__in=vulnerable_keys).select_related('book')
+    # 3. 실제 Word 객체 조회 (정규화 키 인덱스로 모든 단어장에서 한 번에)
+    candidates = Word.objects.filter(english_key__in=vulnerable_keys).select_related('book')
 
     # 4. 정렬 (최근 본 단어장 우선)
     recent_tests = TestResult.objects.filter(student=profile).order_by('-created_at').values_list('book_id', flat=True)[:20]
@@ -54,10 +54,9 @@ def get_vulnerable_words(profile):
     seen_english = set()
 
     for w in sorted_candidates:
-        clean_eng = w.english.strip().lower()
-        if clean_eng not in seen_english:
+        if w.english_key not in seen_english:
             unique_words.append(w)
-            seen_english.add(clean_eng)
+            seen_english.add(w.english_key)
     
     return unique_words
 
@@ -70,62 +69,107 @@ def is_monthly_test_period():
 # ==============================================================================
 # [2] 외부 사전 검색 (구글 번역 API - 다의어 지원 버전)
 # ==============================================================================
-def crawl_daum_dic(query):
+# - 결과는 DictionaryCache 에 저장 (성공: 30일, 뜻 없음: 1일, 요청 실패: 10분 동안 재요청 안 함)
+# - 연결 재사용(Session) + 짧은 타임아웃, 실패 시 만료된 캐시라도 있으면 그 값을 사용
+DICTIONARY_URL = getattr(settings, 'VOCAB_DICTIONARY_URL', "https://translate.googleapis.com/translate_a/single")
+DICTIONARY_TIMEOUT = getattr(settings, 'VOCAB_DICTIONARY_TIMEOUT', (1.0, 2.0))  # (연결, 응답) 초
+DICTIONARY_TTL = timedelta(days=30)
+DICTIONARY_NOT_FOUND_TTL = timedelta(days=1)
+DICTIONARY_ERROR_TTL = timedelta(minutes=10)
+
+_dictionary_session = None
+
+def _get_dictionary_session():
+    global _dictionary_session
+    if _dictionary_session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _dictionary_session = session
+    return _dictionary_session
+
+def fetch_translation(query):
     """
     [업그레이드] 구글 번역 API (다의어 지원)
     - dt=['t', 'bd'] 파라미터를 통해 기본 번역 + 사전 정보(여러 뜻)를 함께 요청합니다.
+    - 뜻이 없으면 None, 네트워크/응답 오류는 예외(requests.RequestException, ValueError)
     """
-    print(f"--- [DEBUG] 구글 번역 API 요청(다의어): {query} ---")
-    try:
-        url = "https://translate.googleapis.com/translate_a/single"
-        
-        # t: 문장 번역(Translation), bd: 사전 정보(Back Dictionary)
-        params = {
-            "client": "gtx",
-            "sl": "en",
-            "tl": "ko",
-            "dt": ["t", "bd"], 
-            "q": query
-        }
-        
-        response = requests.get(url, params=params, timeout=5)
-        
-        if response.status_code != 200:
-            print(f"--- [DEBUG] 응답 오류: {response.status_code} ---")
-            return None
-        
-        data = response.json()
-        
-        english = query
-        korean_candidates = []
-        
-        # 1. 사전 데이터(data[1])가 있으면 거기서 여러 뜻을 가져옵니다.
-        if len(data) > 1 and data[1]:
-            for part_of_speech in data[1]:
-                meanings = part_of_speech[1]
-                # 각 품사별로 상위 3개 뜻만
-                for m in meanings[:3]:
-                    if m not in korean_candidates:
-                        korean_candidates.append(m)
-            
-            # 리스트를 콤마로 연결 (최대 5~6개 정도만 표시 추천)
-            korean = ", ".join(korean_candidates[:6])
-            
-        # 2. 사전 데이터가 없으면 기본 번역(data[0])을 사용
-        else:
-            if data and data[0] and data[0][0]:
-                korean = data[0][0][0]
-            else:
-                return None
-
-        print(f"--- [DEBUG] 번역 성공(다의어): {english} -> {korean} ---")
+    # t: 문장 번역(Translation), bd: 사전 정보(Back Dictionary)
+    params = {
+        "client": "gtx",
+        "sl": "en",
+        "tl": "ko",
+        "dt": ["t", "bd"], 
+        "q": query
+    }
+    
+    response = _get_dictionary_session().get(DICTIONARY_URL, params=params, timeout=DICTIONARY_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    
+    korean_candidates = []
+    
+    # 1. 사전 데이터(data[1])가 있으면 거기서 여러 뜻을 가져옵니다.
+    if len(data) > 1 and data[1]:
+        for part_of_speech in data[1]:
+            meanings = part_of_speech[1]
+            # 각 품사별로 상위 3개 뜻만
+            for m in meanings[:3]:
+                if m not in korean_candidates:
+                    korean_candidates.append(m)
         
-        return {
-            'english': english,
-            'korean': korean,
-            'source': 'google_translate'
-        }
+        # 리스트를 콤마로 연결 (최대 5~6개 정도만 표시 추천)
+        korean = ", ".join(korean_candidates[:6])
         
-    except Exception as e:
-        print(f"--- [DEBUG] 예외 발생: {e} ---")
-        return None
\ No newline at end of file
+    # 2. 사전 데이터가 없으면 기본 번역(data[0])을 사용
+    elif data and data[0] and data[0][0]:
+        korean = data[0][0][0]
+    else:
+        return None
+
+    return {
+        'english': query,
+        'korean': korean,
+        'source': 'google_translate'
+    }
+
+def crawl_daum_dic(query):
+    """
+    외부 사전 검색 (캐시 우선)
+    - 반환: {'english', 'korean', 'source'} 또는 None
+    """
+    key = (query or "").strip().lower()
+    if not key or len(key) > 100: return None
+
+    now = timezone.now()
+    entry = DictionaryCache.objects.filter(query=key).first()
+    if entry and entry.expires_at > now:
+        return entry.as_result()
+
+    try:
+        result = fetch_translation(query.strip())
+    except (requests.RequestException, ValueError, IndexError, TypeError) as e:
+        logger.warning("외부 사전 요청 실패 (%s): %s", key, e)
+        if entry and entry.found:
+            # 예전 결과라도 보여주고, 잠시 동안은 다시 요청하지 않음
+            entry.expires_at = now + DICTIONARY_ERROR_TTL
+            entry.save(update_fields=['expires_at'])
+            return entry.as_result()
+        DictionaryCache.objects.update_or_create(query=key, defaults={
+            'english': '', 'korean': '', 'source': '', 'found': False,
+            'fetched_at': now, 'expires_at': now + DICTIONARY_ERROR_TTL,
+        })
+        return None
+
+    if result:
+        DictionaryCache.objects.update_or_create(query=key, defaults={
+            'english': result['english'][:100], 'korean': result['korean'][:255], 'source': result['source'],
+            'found': True, 'fetched_at': now, 'expires_at': now + DICTIONARY_TTL,
+        })
+    else:
+        DictionaryCache.objects.update_or_create(query=key, defaults={
+            'english': '', 'korean': '', 'source': '', 'found': False,
+            'fetched_at': now, 'expires_at': now + DICTIONARY_NOT_FOUND_TTL,
+        })
+    return result
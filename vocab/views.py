@@ -1,23 +1,33 @@
 import json
+import hashlib
 import random, datetime, calendar
 from datetime import timedelta
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
+from django.core import signing
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
-from django.db.models import Avg, Q, Max, Count, Sum
-from django.db.models.functions import TruncDate 
+from django.db.models import Avg, F, Q, Max, Count, Sum, Prefetch
+from django.core.cache import cache
+from django.core.paginator import Paginator
 
-from .models import WordBook, Word, TestResult, TestResultDetail, MonthlyTestResult, MonthlyTestResultDetail, Publisher, RankingEvent, PersonalWrongWord
+from .models import WordBook, Word, TestResult, TestResultDetail, MonthlyTestResult, MonthlyTestResultDetail, Publisher, RankingEvent, PersonalWrongWord, MonthlyRankingScore, DailyStudyActivity
 from core.models import StudentProfile
 
 # 분리한 파일들 가져오기
 from . import utils
 from . import services
+from . import grading
+from . import search
+from . import catalog
+from .answer_cache import answer_key_cache, answers_for_words
 
 def is_monthly_test_period():
      now = timezone.now()
@@ -25,6 +35,16 @@ def is_monthly_test_period():
      # 매달 마지막 8일간을 월말평가 기간으로 설정
      return now.day > (last_day - 8)
 
+def _ranking_rows(scores):
+    rows = []
+    for i, entry in enumerate(scores, 1):
+        student = entry.student
+        name = student.name or student.user.username
+        school = student.school.name if student.school else ""
+        display_name = f"{name} ({school})" if school else name
+        rows.append({'rank': i, 'name': display_name, 'score': entry.total_score})
+    return rows
+
 # ==========================================
 # [View] 메인 화면
 # ==========================================
@@ -35,9 +55,8 @@ def index(request):
     
     profile = request.user.profile
     
-    # [수정] '시스템' 출판사 제외
-    publishers = Publisher.objects.exclude(name='시스템').order_by('name')
-    etc_books = WordBook.objects.filter(publisher__isnull=True).order_by('-created_at')
+    # [수정] '시스템' 출판사 제외 (단어장 목록 캐시에서 본인/관리자 단어장만)
+    publishers, etc_books = catalog.visible_catalog(request.user)
     
     wrong_words = utils.get_vulnerable_words(profile)
     recent_tests = TestResult.objects.filter(student=profile).order_by('-created_at')[:10]
@@ -45,42 +64,30 @@ def index(request):
     graph_data = [t.score for t in reversed(recent_tests)]
 
     # 1. 히트맵(잔디 심기) 데이터 생성
-    one_year_ago = timezone.now() - timedelta(days=365)
-    heatmap_qs = TestResult.objects.filter(
+    one_year_ago = (timezone.now() - timedelta(days=365)).date()
+    heatmap_qs = DailyStudyActivity.objects.filter(
         student=profile,
-        created_at__gte=one_year_ago
-    ).annotate(
-        date=TruncDate('created_at')
-    ).values('date').annotate(
-        count=Count('id')
-    ).order_by('date')
+        date__gte=one_year_ago,
+        test_count__gt=0
+    ).values_list('date', 'test_count').order_by('date')
 
     heatmap_data = {}
-    for item in heatmap_qs:
-        dt = datetime.datetime.combine(item['date'], datetime.datetime.min.time())
+    for date, count in heatmap_qs:
+        dt = datetime.datetime.combine(date, datetime.datetime.min.time())
         timestamp = int(dt.timestamp())
-        heatmap_data[timestamp] = item['count']
+        heatmap_data[timestamp] = count
 
-    # 2. 랭킹 시스템
+    # 2. 랭킹 시스템 (증분 집계 테이블에서 상위 5명만 조회)
     now = timezone.now()
-    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # (A) 이달의 랭킹
-    total_ranks = TestResult.objects.filter(
-        created_at__gte=start_of_month,
-        score__gte=27
-    ).values('student__name', 'student__school__name', 'student__user__username') \
-     .annotate(total_score=Sum('score')) \
-     .order_by('-total_score')[:5]
-
-    monthly_ranking = []
-    for i, r in enumerate(total_ranks, 1):
-        name = r['student__name'] or r['student__user__username']
-        school = r['student__school__name'] or ""
-        display_name = f"{name} ({school})" if school else name
-        monthly_ranking.append({'rank': i, 'name': display_name, 'score': r['total_score']})
+    this_month = now.date().replace(day=1)
+
+    # (A) 이달의 왕
+    monthly_scores = MonthlyRankingScore.objects.filter(
+        month=this_month, total_score__gt=0
+    ).select_related('student__school', 'student__user').order_by('-total_score')[:5]
+    monthly_ranking = _ranking_rows(monthly_scores)
 
-    # (B) 이벤트 랭킹
+    # (B) 이벤트 랭킹 (지점 이벤트는 해당 지점 학생끼리만 경쟁)
     event_list = [] 
     active_events = RankingEvent.objects.filter(
         Q(branch=profile.branch) | Q(branch__isnull=True), 
@@ -88,23 +95,11 @@ def index(request):
     ).order_by('-start_date')
     
     for event in active_events:
-        event_ranks = TestResult.objects.filter(
-            book=event.target_book,
-            created_at__date__gte=event.start_date,
-            created_at__date__lte=event.end_date,
-            score__gte=27
-        ).values('student__name', 'student__school__name', 'student__user__username') \
-         .annotate(event_score=Sum('score')) \
-         .order_by('-event_score')[:5]
-
-        ranking_data = []
-        for i, r in enumerate(event_ranks, 1):
-            name = r['student__name'] or r['student__user__username']
-            school = r['student__school__name'] or ""
-            display_name = f"{name} ({school})" if school else name
-            ranking_data.append({'rank': i, 'name': display_name, 'score': r['event_score']})
-            
-        event_list.append({'info': event, 'rankings': ranking_data})
+        event_scores = event.scores.filter(total_score__gt=0)
+        if event.branch_id:
+            event_scores = event_scores.filter(branch_id=event.branch_id)
+        event_scores = event_scores.select_related('student__school', 'student__user').order_by('-total_score')[:5]
+        event_list.append({'info': event, 'rankings': _ranking_rows(event_scores)})
 
     return render(request, 'vocab/index.html', {
         'publishers': publishers,
@@ -123,6 +118,50 @@ def index(request):
 # ==========================================
 # [View] 시험 페이지 (Exam)
 # ==========================================
+EXAM_WORD_PAGE_SIZE = 200  # 학습/연습 모드 단어 한 번에 보내는 개수
+
+def _exam_word_queryset(book, test_range):
+    """단어장 + Day 범위 ('1-3,5' 형식, '전체') -> Word queryset"""
+    word_qs = Word.objects.filter(book=book)
+    if test_range != '전체':
+        try:
+            targets = []
+            for chunk in test_range.split(','):
+                if '-' in chunk:
+                    s, e = map(int, chunk.split('-'))
+                    targets.extend(range(s, e + 1))
+                else:
+                    targets.append(int(chunk))
+            word_qs = word_qs.filter(number__in=targets)
+        except:
+            pass
+    return word_qs
+
+def _exam_word_ids(word_qs, is_learning, seed):
+    """학습: Day 순서 / 연습: seed 로 섞은 순서 (같은 seed 면 페이지를 나눠 받아도 같은 순서)"""
+    if is_learning: return services.learning_word_ids(word_qs)
+    return services.sample_word_ids(word_qs, rng=random.Random(seed))
+
+EXAM_WORD_IDS_TTL = 60 * 60  # 학습/연습 모드 출제 순서 캐시 (페이지를 나눠 받는 동안)
+
+def _cached_exam_word_ids(book, test_range, is_learning, seed):
+    """
+    _exam_word_ids 결과를 캐시 -> 다음 페이지를 받을 때 단어장을 다시 읽고 섞지 않음
+    - 단어가 추가/수정/삭제되면 answer_version 이 올라가서 키가 바뀜
+    - 학습 모드는 seed 와 상관없이 순서가 같으므로 seed 없이 공유
+    """
+    range_key = hashlib.md5(test_range.encode()).hexdigest()[:12]
+    key = f"vocab:exam_words:{book.id}:{book.answer_version}:{range_key}:{'learning' if is_learning else seed}"
+    word_ids = cache.get(key)
+    if word_ids is None:
+        word_ids = _exam_word_ids(_exam_word_queryset(book, test_range), is_learning, seed)
+        cache.set(key, word_ids, EXAM_WORD_IDS_TTL)
+    return word_ids
+
+def _words_in_order(word_ids):
+    words = Word.objects.in_bulk(word_ids)
+    return [words[word_id] for word_id in word_ids if word_id in words]
+
 @login_required(login_url='core:login')
 def exam(request):
     if not hasattr(request.user, 'profile'):
@@ -137,80 +176,82 @@ def exam(request):
     is_practice = (mode == 'practice')
     is_learning = (mode == 'learning')
 
+    started_at = services.exam_started_at(profile, mode)  # 제출하지 않은 시험의 시작 시각
+
     if is_monthly:
         now = timezone.now()
-        if MonthlyTestResult.objects.filter(student=profile, created_at__year=now.year, created_at__month=now.month).exists():
+        started_this_month = started_at and (started_at.year, started_at.month) == (now.year, now.month)
+        if started_this_month or MonthlyTestResult.objects.filter(student=profile, created_at__year=now.year, created_at__month=now.month).exists():
             return HttpResponse(f"<script>alert('🚫 월말평가는 이번 달에 이미 응시하셨습니다.');window.location.href='/vocab/';</script>")
 
-    # 쿨타임 체크
+    # 쿨타임 체크 (마지막 불합격 시각 / 제출하지 않은 시험의 시작 시각 중 늦은 쪽 기준)
     if is_challenge:
-        if profile.last_failed_at:
-            time_passed = timezone.now() - profile.last_failed_at
+        last_failed_at = max(filter(None, [profile.last_failed_at, started_at]), default=None)
+        if last_failed_at:
+            time_passed = timezone.now() - last_failed_at
             if time_passed < timedelta(minutes=5):
                 remaining = 5 - (time_passed.seconds // 60)
                 return HttpResponse(f"<script>alert('🔥 쿨타임 중입니다. ({remaining}분 남음)');window.location.href='/vocab/';</script>")
     elif is_wrong_mode:
-        if profile.last_wrong_failed_at:
-            time_passed = timezone.now() - profile.last_wrong_failed_at
+        last_failed_at = max(filter(None, [profile.last_wrong_failed_at, started_at]), default=None)
+        if last_failed_at:
+            time_passed = timezone.now() - last_failed_at
             if time_passed < timedelta(minutes=5):
                 remaining = 5 - (time_passed.seconds // 60)
                 return HttpResponse(f"<script>alert('🚨 오답모드 쿨타임 중입니다. ({remaining}분 남음)');window.location.href='/vocab/';</script>")
 
-    raw_candidates = []
+    words = []
     book_title = ""
     book_id = request.GET.get('book_id')
+    word_qs = None
 
     if is_wrong_mode:
-        raw_candidates = utils.get_vulnerable_words(profile)
-        if len(raw_candidates) < 1: return redirect('vocab:index') 
+        # 1) 복습할 때가 된 오답 노트 단어 먼저 (인덱스 조회 1번)
+        words = services.review_batch(profile, 30)
+        if len(words) < 30:
+            # 2) 남는 자리는 오답률 높은 단어로 (이미 영어 기준 중복 제거 + 최근 단어장 우선 정렬되어 있음)
+            seen = {w.english_key for w in words}
+            for w in utils.get_vulnerable_words(profile, include_personal=False):
+                if len(words) >= 30: break
+                if w.english_key not in seen:
+                    words.append(w)
+                    seen.add(w.english_key)
+        if len(words) < 1: return redirect('vocab:index') 
         book_title = "🚨 오답 탈출"
     elif book_id:
         book = get_object_or_404(WordBook, id=book_id)
         book_title = book.title
         if is_monthly: book_title = f"[월말] {book_title}"
 
-        test_range = request.GET.get('day_range', '전체')
-        
-        if test_range != '전체':
-            try:
-                targets = []
-                for chunk in test_range.split(','):
-                    if '-' in chunk:
-                        s, e = map(int, chunk.split('-'))
-                        targets.extend(range(s, e + 1))
-                    else:
-                        targets.append(int(chunk))
-                raw_candidates = list(Word.objects.filter(book=book, number__in=targets))
-            except:
-                raw_candidates = list(Word.objects.filter(book=book))
-        else:
-            raw_candidates = list(Word.objects.filter(book=book))
+        word_qs = _exam_word_queryset(book, request.GET.get('day_range', '전체'))
             
     elif is_monthly:
-        raw_candidates = list(Word.objects.all())
+        word_qs = Word.objects.all()
         book_title = "📅 전체 월말 평가"
     else:
         return redirect('vocab:index')
 
-    # [셔플 및 자르기]
-    if is_learning:
-        raw_candidates.sort(key=lambda x: x.number)
-        target_count = 999999
-    else:
-        if not is_wrong_mode: 
-            random.shuffle(raw_candidates)
-        target_count = 30
-        if is_monthly: target_count = 100
-        elif is_practice: target_count = 999999
-
-    words = []
-    seen = set()
-    for w in raw_candidates:
-        clean_eng = w.english.strip().lower()
-        if clean_eng not in seen:
-            words.append(w)
-            seen.add(clean_eng)
-        if len(words) >= target_count: break
+    words_url = None
+    total_words = None
+    if word_qs is not None:
+        if is_learning or is_practice:
+            # 학습/연습 모드: 순서(id)만 정해서 첫 페이지만 화면에 넣고, 나머지는 api_exam_words 로 나눠 받음
+            # 첫 페이지를 만들면서 출제 순서를 캐시 -> 나머지 페이지는 캐시에서 잘라서 보냄
+            # seed / 단어장 / 범위는 서명된 토큰으로 넘김 -> 나머지 페이지 요청에서 seed 를 바꿔 캐시를 늘릴 수 없음
+            seed = random.randrange(1 << 30)
+            test_range = request.GET.get('day_range', '전체')
+            word_ids = _cached_exam_word_ids(book, test_range, is_learning, seed)
+            words = _words_in_order(word_ids[:EXAM_WORD_PAGE_SIZE])
+            total_words = len(word_ids)
+            if total_words > EXAM_WORD_PAGE_SIZE:
+                words_url = reverse('vocab:api_exam_words') + '?' + urlencode({
+                    't': services.issue_exam_words_token(profile, mode, book.id, test_range, seed)
+                })
+        else:
+            # [무작위 추출] DB에서 (id, 영어)만 읽어서 필요한 개수만 뽑음
+            target_count = 30
+            if is_monthly: target_count = 100
+            words = services.sample_words(word_qs, target_count)
 
     if is_challenge and len(words) < 25:
         return HttpResponse(f"""
@@ -220,56 +261,109 @@ def exam(request):
             </script>
         """)
 
-    pre_saved_id = None
+    # 결과 행은 제출(save_result) 때 생성 -> 여기서는 출제 정보만 서명해서 넘김 (DB 쓰기 없음)
+    exam_token = None
     if not is_practice and not is_learning:
-        if is_monthly:
-            result = MonthlyTestResult.objects.create(
-                student=profile, 
-                book=WordBook.objects.first() if not book_id else WordBook.objects.get(id=book_id),
-                score=0, 
-                test_range=request.GET.get('day_range', '전체')
-            )
-        else:
-            current_book = WordBook.objects.first() if not book_id else WordBook.objects.get(id=book_id)
-            
-            # [수정] 오답모드일 경우 '오답 집중 공략' 전용 단어장 연결
-            if is_wrong_mode: 
-                system_user = User.objects.filter(is_superuser=True).first()
-                if not system_user: system_user = request.user
-                sys_pub, _ = Publisher.objects.get_or_create(name="시스템")
-                current_book, _ = WordBook.objects.get_or_create(
-                    title="🚨 오답 집중 공략",
-                    publisher=sys_pub,
-                    defaults={'uploaded_by': system_user}
-                )
-
-            result = TestResult.objects.create(
-                student=profile, 
-                book=current_book, 
-                score=0, 
-                wrong_count=len(words),
-                test_range="오답집중" if is_wrong_mode else request.GET.get('day_range', '전체')
-            )
-            services.update_cooldown(profile, mode, 0) 
-            
-        pre_saved_id = result.id
+        exam_token = services.issue_exam_token(
+            profile, mode, words,
+            book_id=int(book_id) if book_id else None,
+            test_range="오답집중" if is_wrong_mode else request.GET.get('day_range', '전체')
+        )
 
     word_list = [{'english': w.english, 'korean': w.korean, 'example': w.example_sentence or "", 'day': w.number} for w in words]
 
-    return render(request, 'vocab/exam.html', {
+    response = render(request, 'vocab/exam.html', {
         'words_json': word_list,
         'mode': mode,
         'book_title': book_title,
-        'test_id': pre_saved_id,
+        'exam_token': exam_token,
+        'total_words': total_words or len(word_list),
+        'words_url': words_url,
         'is_practice': is_practice,
         'is_monthly': is_monthly,
         'is_wrong_mode': is_wrong_mode,
         'is_learning': is_learning,
     })
+    if exam_token:
+        # 응시 시작 기록 (기존에 시작할 때 DB 에 저장하던 쿨타임 / 월말 응시 여부를 서버 캐시로 대신)
+        services.mark_exam_started(profile, mode)
+    return response
+
+@gzip_page
+@login_required
+def api_exam_words(request):
+    """
+    학습/연습 모드 단어 나눠 받기: [영어, 뜻, 예문, Day] 배열로 한 페이지씩 (gzip, 출제 순서는 캐시에서)
+    - 모드 / 단어장 / 범위 / seed 는 시험 화면에서 서명한 토큰(t)에서만 읽음
+    """
+    if not hasattr(request.user, 'profile'):
+        return JsonResponse({'status': 'error', 'message': '프로필 없음'}, status=400)
+    try:
+        exam_words = services.read_exam_words_token(request.GET.get('t'), request.user.profile)
+        page = max(int(request.GET.get('page', 1)), 1)
+    except (signing.BadSignature, TypeError, ValueError, AttributeError):
+        return JsonResponse({'status': 'error', 'message': '잘못된 요청'}, status=400)
+
+    book = get_object_or_404(WordBook, id=exam_words['b'])
+    word_ids = _cached_exam_word_ids(book, exam_words['r'], exam_words['m'] == 'learning', exam_words['n'])
+    start = (page - 1) * EXAM_WORD_PAGE_SIZE
+    words = _words_in_order(word_ids[start:start + EXAM_WORD_PAGE_SIZE])
+
+    return JsonResponse({
+        'status': 'success',
+        'page': page,
+        'total': len(word_ids),
+        'has_next': start + EXAM_WORD_PAGE_SIZE < len(word_ids),
+        'words': [[w.english, w.korean, w.example_sentence or "", w.number] for w in words],
+    })
 
 # ==========================================
 # [API] 결과 저장
 # ==========================================
+def _grade_submission(raw_details, book_answers):
+    """학생 답안의 정답란을 DB 정답으로 덮어쓴 뒤 채점 -> (score, wrong_count, processed_details)"""
+    real_answers = book_answers.korean
+    for item in raw_details:
+        question = item.get('english') or item.get('q')
+        if question in real_answers:
+            item['korean'] = real_answers[question]
+            item['a'] = real_answers[question]
+    return grading.grade_details(raw_details, book_answers.candidates)
+
+
+def _create_result(profile, session, book, score, wrong_count):
+    """결과 행 저장 + 점수 집계/쿨타임 반영 (상세 답안은 호출하는 쪽에서 bulk_create)"""
+    if session['m'] == 'monthly':
+        return MonthlyTestResult.objects.create(
+            student=profile, book=book, score=score, test_range=session['r'], exam_key=session['k']
+        )
+    result_obj = TestResult.objects.create(
+        student=profile, book=book, score=score, wrong_count=wrong_count,
+        test_range=session['r'], exam_key=session['k']
+    )
+    services.apply_score_change(result_obj, 0, is_new_submission=True)
+    services.update_cooldown(profile, session['m'], score)
+    return result_obj
+
+
+def _detail_rows(ModelDetail, result_obj, processed_details):
+    return [
+        ModelDetail(
+            result=result_obj, 
+            word_question=item['q'], 
+            student_answer=item['u'], 
+            correct_answer=item['a'], 
+            is_correct=item['c']
+        ) 
+        for item in processed_details
+    ]
+
+
+def _monthly_taken(profile):
+    now = timezone.now()
+    return MonthlyTestResult.objects.filter(student=profile, created_at__year=now.year, created_at__month=now.month).exists()
+
+
 @csrf_exempt
 def save_result(request):
     if request.method == 'POST':
@@ -283,81 +377,188 @@ def save_result(request):
                 return JsonResponse({'status': 'error', 'message': '프로필 없음'})
             profile = request.user.profile
 
-            test_id = data.get('test_id')
+            # 시험 화면에서 받은 토큰으로 출제 정보 확인 (모드/단어장/범위는 토큰 값 사용)
+            try:
+                session = services.read_exam_token(data.get('exam_token'), profile)
+            except signing.BadSignature:
+                return JsonResponse({'status': 'error', 'message': '시험 정보가 만료되었거나 올바르지 않습니다. 다시 응시해주세요.'})
+            mode = session['m']
             is_monthly = (mode == 'monthly')
+            ModelResult = MonthlyTestResult if is_monthly else TestResult
+            ModelDetail = MonthlyTestResultDetail if is_monthly else TestResultDetail
+
+            # 같은 시험을 두 번 제출한 경우 (새로고침 / 재전송)
+            result_obj = ModelResult.objects.filter(exam_key=session['k']).first()
+            if result_obj:
+                detail_ids = list(ModelDetail.objects.filter(result=result_obj).order_by('id').values_list('id', flat=True))
+                return JsonResponse({'status': 'success', 'message': 'Duplicate skipped', 'detail_ids': detail_ids})
             
             raw_details = data.get('details', [])
             
-            if is_monthly:
-                result_obj = get_object_or_404(MonthlyTestResult, id=test_id, student=profile)
-            else:
-                result_obj = get_object_or_404(TestResult, id=test_id, student=profile)
-            
-            # DB 진짜 정답 조회
-            real_answers = {
-                w.english: w.korean 
-                for w in Word.objects.filter(book=result_obj.book)
-            }
-            
-            for item in raw_details:
-                question = item.get('english') or item.get('q')
-                if question in real_answers:
-                    item['korean'] = real_answers[question]
-                    item['a'] = real_answers[question]
+            # DB 진짜 정답 조회 (단어장 시험은 단어장 버전별 캐시, 오답모드/전체 월말은 출제된 단어만)
+            book = WordBook.objects.filter(id=session['b']).first() if session['b'] else None
+            book_answers = answer_key_cache.get(book) if book else answers_for_words(session['w'])
+            score, wrong_count, processed_details = _grade_submission(raw_details, book_answers)
 
-            score, wrong_count, processed_details = services.calculate_score(raw_details)
+            if mode == 'wrong': book = services.get_wrong_mode_book(request.user)
+            elif book is None: book = WordBook.objects.first()
 
             detail_ids = []
 
-            with transaction.atomic():
-                if is_monthly:
-                    if MonthlyTestResultDetail.objects.filter(result=result_obj).exists():
-                         saved_objs = MonthlyTestResultDetail.objects.filter(result=result_obj).order_by('id')
-                         detail_ids = [d.id for d in saved_objs]
-                         return JsonResponse({'status': 'success', 'message': 'Duplicate skipped', 'detail_ids': detail_ids})
-                    
-                    result_obj.score = score
-                    result_obj.save()
-                    ModelDetail = MonthlyTestResultDetail
-                else:
-                    if TestResultDetail.objects.filter(result=result_obj).exists():
-                        saved_objs = TestResultDetail.objects.filter(result=result_obj).order_by('id')
-                        detail_ids = [d.id for d in saved_objs]
-                        return JsonResponse({'status': 'success', 'message': 'Duplicate skipped', 'detail_ids': detail_ids})
-
-                    result_obj.score = score
-                    result_obj.wrong_count = wrong_count
-                    result_obj.save()
-                    ModelDetail = TestResultDetail
-                    
-                    services.update_cooldown(profile, mode, score)
-
-                details = [
-                    ModelDetail(
-                        result=result_obj, 
-                        word_question=item['q'], 
-                        student_answer=item['u'], 
-                        correct_answer=item['a'], 
-                        is_correct=item['c']
-                    ) 
-                    for item in processed_details
-                ]
-                ModelDetail.objects.bulk_create(details)
-
-                saved_objs = ModelDetail.objects.filter(result=result_obj).order_by('id')
-                detail_ids = [d.id for d in saved_objs]
+            try:
+                with transaction.atomic():
+                    if is_monthly and _monthly_taken(profile):
+                        return JsonResponse({'status': 'error', 'message': '월말평가는 이번 달에 이미 응시하셨습니다.'})
+                    result_obj = _create_result(profile, session, book, score, wrong_count)
+
+                    ModelDetail.objects.bulk_create(_detail_rows(ModelDetail, result_obj, processed_details))
+                    services.record_word_attempts(profile, processed_details)
+                    services.update_review_queue(profile, processed_details)
+
+                    detail_ids = list(ModelDetail.objects.filter(result=result_obj).order_by('id').values_list('id', flat=True))
+            except IntegrityError:
+                # 동시에 두 번 제출되어 다른 요청이 먼저 저장한 경우
+                result_obj = ModelResult.objects.get(exam_key=session['k'])
+                detail_ids = list(ModelDetail.objects.filter(result=result_obj).order_by('id').values_list('id', flat=True))
+                return JsonResponse({'status': 'success', 'message': 'Duplicate skipped', 'detail_ids': detail_ids})
             
             # [수정] 채점 결과(processed_details)를 함께 반환하여 프론트엔드 화면을 갱신합니다.
-            return JsonResponse({
+            response = JsonResponse({
                 'status': 'success', 
                 'detail_ids': detail_ids, 
                 'results': processed_details 
             })
+            if not is_monthly:
+                # 제출 후 쿨타임은 update_cooldown 으로 저장된 값 기준
+                services.clear_exam_started(profile, mode)
+            return response
 
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)})
     return JsonResponse({'status': 'error'})
 
+# ==========================================
+# [API] 결과 묶음 저장 (오프라인 제출분 재전송)
+# ==========================================
+EXAM_BATCH_MAX_ITEMS = 20
+
+
+def _submitted_details(item):
+    """제출 항목의 상세 답안 목록 (항목/답안 형식이 잘못되었으면 None)"""
+    if not isinstance(item, dict): return None
+    details = item.get('details') or []
+    if not isinstance(details, list): return None
+    for detail in details:
+        if not isinstance(detail, dict): return None
+        question = detail.get('english') or detail.get('q')
+        if not isinstance(question, str): return None
+        if not all(isinstance(detail.get(f) or '', str) for f in ('user_input', 'korean')): return None
+    return details
+
+
+@csrf_exempt
+def save_results_batch(request):
+    """
+    네트워크 오류로 브라우저에 쌓아둔 시험 결과 여러 개를 한 번에 저장
+    - 요청: {"items": [{"exam_token": ..., "details": [...]}, ...]}
+    - 응답 results 는 items 와 같은 순서로 saved / duplicate / error (exam_key 기준이라 재전송해도 한 번만 저장)
+    - 정답지는 단어장별 한 번만 읽고, 상세 답안은 한 번의 bulk_create 로 저장
+    - 형식이 잘못된 항목은 그 항목만 error (나머지는 그대로 저장)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error'})
+    if not hasattr(request.user, 'profile'):
+        return JsonResponse({'status': 'error', 'message': '프로필 없음'})
+    profile = request.user.profile
+
+    try:
+        items = json.loads(request.body).get('items')
+    except (ValueError, AttributeError):
+        items = None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'status': 'error', 'message': '제출할 시험이 없습니다.'})
+    if len(items) > EXAM_BATCH_MAX_ITEMS:
+        return JsonResponse({'status': 'error', 'message': f'한 번에 최대 {EXAM_BATCH_MAX_ITEMS}개까지 제출할 수 있습니다.'})
+
+    results = [None] * len(items)
+    sessions = {}
+    submitted = {}
+    for i, item in enumerate(items):
+        details = _submitted_details(item)
+        if details is None:
+            results[i] = {'status': 'error', 'message': '제출 형식이 올바르지 않습니다.'}
+            continue
+        try:
+            session = services.read_exam_token(item.get('exam_token'), profile)
+        except (signing.BadSignature, TypeError, AttributeError):
+            results[i] = {'status': 'error', 'message': '시험 정보가 만료되었거나 올바르지 않습니다.'}
+            continue
+        if session['k'] in {s['k'] for s in sessions.values()}:
+            results[i] = {'status': 'duplicate'}
+            continue
+        sessions[i] = session
+        submitted[i] = details
+
+    # 이미 저장된 시험 (이전 요청은 저장됐는데 응답만 못 받은 경우)
+    keys = [s['k'] for s in sessions.values()]
+    saved_keys = set(TestResult.objects.filter(exam_key__in=keys).values_list('exam_key', flat=True))
+    saved_keys.update(MonthlyTestResult.objects.filter(exam_key__in=keys).values_list('exam_key', flat=True))
+    for i in [i for i, s in sessions.items() if s['k'] in saved_keys]:
+        results[i] = {'status': 'duplicate'}
+        del sessions[i]
+
+    # 채점 (정답지는 단어장별 한 번, 오답모드/전체 월말은 출제된 단어만)
+    books = WordBook.objects.in_bulk({s['b'] for s in sessions.values() if s['b']})
+    book_answers = {book_id: answer_key_cache.get(book) for book_id, book in books.items()}
+    graded = {}
+    for i, session in list(sessions.items()):
+        answers = book_answers.get(session['b']) or answers_for_words(session['w'])
+        try:
+            graded[i] = _grade_submission(submitted[i], answers)
+        except (TypeError, ValueError, AttributeError, KeyError):
+            results[i] = {'status': 'error', 'message': '제출 형식이 올바르지 않습니다.'}
+            del sessions[i]
+
+    wrong_book = None
+    detail_rows = {TestResultDetail: [], MonthlyTestResultDetail: []}
+    all_processed = []
+    with transaction.atomic():
+        for i, session in sessions.items():
+            score, wrong_count, processed_details = graded[i]
+            is_monthly = (session['m'] == 'monthly')
+            if is_monthly and _monthly_taken(profile):
+                results[i] = {'status': 'error', 'message': '월말평가는 이번 달에 이미 응시하셨습니다.'}
+                continue
+
+            if session['m'] == 'wrong':
+                book = wrong_book = wrong_book or services.get_wrong_mode_book(request.user)
+            else:
+                book = books.get(session['b']) or WordBook.objects.first()
+
+            try:
+                with transaction.atomic():
+                    result_obj = _create_result(profile, session, book, score, wrong_count)
+            except IntegrityError:
+                # 동시에 들어온 다른 요청이 먼저 저장한 경우
+                results[i] = {'status': 'duplicate'}
+                continue
+
+            ModelDetail = MonthlyTestResultDetail if is_monthly else TestResultDetail
+            detail_rows[ModelDetail] += _detail_rows(ModelDetail, result_obj, processed_details)
+            all_processed += processed_details
+            results[i] = {'status': 'saved', 'score': score}
+
+        for ModelDetail, rows in detail_rows.items():
+            if rows: ModelDetail.objects.bulk_create(rows)
+        services.record_word_attempts(profile, all_processed)
+        services.update_review_queue(profile, all_processed)
+
+    # save_result 와 같이 저장된 시험의 시작 기록 삭제 (쿨타임은 update_cooldown 으로 저장된 값 기준)
+    saved_modes = {s['m'] for i, s in sessions.items() if results[i]['status'] == 'saved'}
+    for mode in saved_modes - {'monthly'}:
+        services.clear_exam_started(profile, mode)
+    return JsonResponse({'status': 'success', 'results': results})
+
 # ==========================================
 # [API] 정답 인정 (관리자용)
 # ==========================================
@@ -383,24 +584,16 @@ def approve_answer(request):
                 if detail.is_correct: 
                     return JsonResponse({'status': 'already_correct'})
                 
+                was_pending = services.is_pending_correction(detail)
                 detail.is_correct = True
                 detail.is_resolved = True
-                detail.save()
+                detail.save()  # 점수 +1 / 숙련도 보정은 update_score_on_change 에서 (랭킹/일일 기록은 커밋 때)
                 
                 result = detail.result
-                if is_monthly_detail:
-                    result = MonthlyTestResult.objects.select_for_update().get(id=result.id)
-                    new_score = MonthlyTestResultDetail.objects.filter(result=result, is_correct=True).count()
-                    result.score = new_score
-                    result.save()
-                else:
-                    result = TestResult.objects.select_for_update().get(id=result.id)
-                    new_score = TestResultDetail.objects.filter(result=result, is_correct=True).count()
-                    total_count = TestResultDetail.objects.filter(result=result).count()
-                    result.score = new_score
-                    result.wrong_count = total_count - new_score
-                    result.save()
-                    
+                result.refresh_from_db(fields=['score'])
+                if was_pending:
+                    services.update_grading_inbox(result.student, -1)
+                if not is_monthly_detail:
                     mode = 'wrong' if result.test_range == '오답집중' else 'challenge'
                     try:
                         services.update_cooldown(result.student, mode, result.score, result.test_range)
@@ -440,9 +633,12 @@ def request_correction(request):
             if detail.is_correct:
                 return JsonResponse({'status': 'error', 'message': '이미 정답 처리된 문제입니다. 👍'})
 
+            was_pending = services.is_pending_correction(detail)
             detail.is_correction_requested = True
             detail.is_resolved = False
             detail.save()
+            if not was_pending:
+                services.update_grading_inbox(detail.result.student, +1)
             return JsonResponse({'status': 'success'})
         except Exception as e: return JsonResponse({'status': 'error', 'message': str(e)})
     return JsonResponse({'status': 'error'})
@@ -464,24 +660,22 @@ def test_result_detail(request, result_id):
 def admin_event_check(request):
     today = timezone.now().date()
     start_date = today - timedelta(days=29)
-    pass_records = TestResult.objects.filter(
-        created_at__date__gte=start_date, score__gte=27
-    ).annotate(exam_date=TruncDate('created_at')).values(
-        'student__user__id', 'student__user__username', 'student__name', 'exam_date'
-    ).distinct()
+    # 통과 기록이 있는 날 = 일일 기록의 pass_count > 0 (학생당 하루 1행)
+    pass_days = DailyStudyActivity.objects.filter(
+        date__gte=start_date, pass_count__gt=0
+    ).values(
+        'student__user__username', 'student__name'
+    ).annotate(days=Count('id'))
     
-    student_stats = {}
-    for record in pass_records:
-        uid = record['student__user__id']
-        name = record['student__name'] 
-        if not name: name = record['student__user__username']
-        if uid not in student_stats: student_stats[uid] = {'name': name, 'days': 0}
-        student_stats[uid]['days'] += 1
-    
-    result_list = [{'name': v['name'], 'days': v['days'], 'success_rate': round((v['days']/30)*100, 1)} for v in student_stats.values()]
+    result_list = []
+    for record in pass_days:
+        name = record['student__name'] or record['student__user__username']
+        result_list.append({'name': name, 'days': record['days'], 'success_rate': round((record['days']/30)*100, 1)})
     result_list.sort(key=lambda x: x['days'], reverse=True)
     return render(request, 'vocab/admin_event_check.html', {'challengers': result_list, 'total_days': 30})
 
+STATS_PER_PAGE = 50  # 학습 현황 탭 한 페이지 학생 수
+
 @staff_member_required
 def grading_list(request):
     sort_by = request.GET.get('sort', 'date')
@@ -499,56 +693,53 @@ def grading_list(request):
     elif position == 'PRINCIPAL':
         if staff_profile and staff_profile.branch:
             pending_filter = Q(student__branch=staff_profile.branch)
-        stats_qs = StudentProfile.objects.filter(my_assign_condition).distinct()
+        stats_qs = StudentProfile.objects.filter(my_assign_condition)
     else:
-        stats_qs = StudentProfile.objects.filter(my_assign_condition).distinct()
+        stats_qs = StudentProfile.objects.filter(my_assign_condition)
         pending_filter = (
             Q(student__syntax_teacher=user) | 
             Q(student__reading_teacher=user) | 
             Q(student__extra_class_teacher=user)
         )
 
-    pending_tests = TestResult.objects.filter(
-        details__is_correction_requested=True, 
-        details__is_resolved=False
-    ).filter(pending_filter).distinct().select_related('student', 'book')
-
-    pending_monthly = MonthlyTestResult.objects.filter(
-        details__is_correction_requested=True, 
-        details__is_resolved=False
-    ).filter(pending_filter).distinct().select_related('student', 'book')
+    # 시험별 요청 건수는 GROUP BY 한 번으로 (시험마다 count() 하지 않음)
+    pending_detail = Q(details__is_correction_requested=True, details__is_resolved=False)
+    exam_fields = ('id', 'student__name', 'book__title', 'test_range', 'score', 'created_at', 'pending_count')
 
     exam_list = []
-    def add_to_list(queryset, q_type):
-        for exam in queryset:
-            req_count = exam.details.filter(is_correction_requested=True, is_resolved=False).count()
+    for model, q_type in ((TestResult, 'normal'), (MonthlyTestResult, 'monthly')):
+        rows = model.objects.filter(pending_filter).annotate(
+            pending_count=Count('details', filter=pending_detail)
+        ).filter(pending_count__gt=0).values_list(*exam_fields)
+        for exam_id, student_name, book_title, test_range, score, created_at, req_count in rows:
             exam_list.append({
-                'id': exam.id, 'type': q_type, 
-                'student_name': exam.student.name,
-                'book_title': exam.book.title, 
-                'test_range': exam.test_range,
-                'score': exam.score, 
+                'id': exam_id, 'type': q_type, 
+                'student_name': student_name,
+                'book_title': book_title, 
+                'test_range': test_range,
+                'score': score, 
                 'pending_count': req_count, 
-                'created_at': exam.created_at
+                'created_at': created_at
             })
-    add_to_list(pending_tests, 'normal')
-    add_to_list(pending_monthly, 'monthly')
     
     if sort_by == 'name': exam_list.sort(key=lambda x: x['student_name'])
     else: exam_list.sort(key=lambda x: x['created_at'], reverse=True)
 
+    # 학습 현황: 마지막 통과일 / 이번 달 응시 수를 학생 쿼리에 같이 집계하고 DB에서 정렬 + 페이지 나눔
     now = timezone.now()
     start_of_month = now.replace(day=1, hour=0, minute=0, second=0)
-    stats_qs = stats_qs.annotate(
+    stats_qs = stats_qs.select_related('school').annotate(
         last_passed_dt=Max(
             'test_results__created_at',
-            filter=Q(test_results__score__gte=27)
-        )
-    )
+            filter=Q(test_results__score__gte=services.PASS_SCORE)
+        ),
+        month_count=Count('test_results', filter=Q(test_results__created_at__gte=start_of_month))
+    ).order_by(F('last_passed_dt').desc(nulls_first=True), 'id')  # 기록 없음 -> 최근 통과 순 (기존 화면과 같은 순서)
+
+    stats_page = Paginator(stats_qs, STATS_PER_PAGE).get_page(request.GET.get('page'))
 
     student_stats = []
-    for student in stats_qs:
-        month_count = TestResult.objects.filter(student=student, created_at__gte=start_of_month).count()
+    for student in stats_page:
         last_date = student.last_passed_dt
         days_since = 999 
         if last_date:
@@ -567,15 +758,16 @@ def grading_list(request):
             'school': student.school.name if student.school else "",
             'last_test_date': last_date, 
             'days_since': days_since,
-            'month_count': month_count,
+            'month_count': student.month_count,
             'status': status
         })
-    student_stats.sort(key=lambda x: (x['status'] == 'NONE', -x['days_since']), reverse=True)
 
     context = {
         'exam_list': exam_list,
         'current_sort': sort_by,
         'student_stats': student_stats,
+        'stats_page': stats_page,
+        'active_tab': 'stats' if request.GET.get('tab') == 'stats' else 'grading',
         'pending_total': len(exam_list)
     }
     return render(request, 'vocab/grading_list.html', context)
@@ -598,37 +790,26 @@ def reject_answer(request):
             q_type = data.get('type')
             if q_type == 'monthly': detail = get_object_or_404(MonthlyTestResultDetail, id=detail_id)
             else: detail = get_object_or_404(TestResultDetail, id=detail_id)
+            was_pending = services.is_pending_correction(detail)
             detail.is_resolved = True; detail.is_correction_requested = False; detail.save()
+            if was_pending:
+                services.update_grading_inbox(detail.result.student, -1)
             return JsonResponse({'status': 'success'})
         except Exception as e: return JsonResponse({'status': 'error', 'message': str(e)})
     return JsonResponse({'status': 'error'})
 
 @staff_member_required
 def api_check_grading_status(request):
-    user = request.user
-    staff_profile = getattr(user, 'staff_profile', None)
-    position = staff_profile.position if staff_profile else None
-    qs_normal = TestResultDetail.objects.filter(is_correction_requested=True, is_resolved=False)
-    qs_monthly = MonthlyTestResultDetail.objects.filter(is_correction_requested=True, is_resolved=False)
-
-    if position == 'TA': pass 
-    elif position == 'PRINCIPAL':
-        if staff_profile and staff_profile.branch:
-            qs_normal = qs_normal.filter(result__student__branch=staff_profile.branch)
-            qs_monthly = qs_monthly.filter(result__student__branch=staff_profile.branch)
-        else:
-            qs_normal = qs_normal.none(); qs_monthly = qs_monthly.none()
+    # 선생님별 대기 건수(GradingInbox)를 그대로 응답, 건수 변경이 없으면 304
+    inbox = services.get_grading_inbox(request.user)
+    etag = f'"grading-{inbox.user_id}-{inbox.version}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
     else:
-        my_student_filter = (
-            Q(result__student__syntax_teacher=user) | 
-            Q(result__student__reading_teacher=user) |
-            Q(result__student__extra_class_teacher=user)
-        )
-        qs_normal = qs_normal.filter(my_student_filter)
-        qs_monthly = qs_monthly.filter(my_student_filter)
-    
-    total_pending = qs_normal.count() + qs_monthly.count()
-    return JsonResponse({'status': 'success', 'pending_count': total_pending})
+        response = JsonResponse({'status': 'success', 'pending_count': inbox.pending_count})
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 @login_required
 def search_word_page(request):
@@ -640,7 +821,8 @@ def api_search_word(request):
     if not query: return JsonResponse({'results': []})
     results = []
     
-    db_words = Word.objects.filter(english__icontains=query).select_related('book')[:5]
+    # 영어 접두어 + 한글 뜻 색인 검색 (완전일치 우선)
+    db_words = search.search_words(query, limit=5)
     for w in db_words:
         results.append({
             'id': w.id,
@@ -651,10 +833,13 @@ def api_search_word(request):
             'is_db': True 
         })
         
-    if not any(r['english'].lower() == query.lower() for r in results):
+    # 외부 사전은 영어 검색어만 (한글 뜻 검색은 DB 결과만 사용)
+    query_key = grading.normalize_word_key(query)
+    if not search.is_korean_query(query) and not any(w.english_key == query_key for w in db_words):
         external_word = utils.crawl_daum_dic(query) 
         if external_word:
-            if not any(r['english'] == external_word['english'] for r in results):
+            external_key = grading.normalize_word_key(external_word['english'])
+            if not any(w.english_key == external_key for w in db_words):
                 results.append({
                     'id': None, 
                     'english': external_word['english'],
@@ -699,22 +884,30 @@ def api_add_personal_wrong(request):
 
 @login_required
 def api_get_chapters(request):
-    book_id = request.GET.get('book_id')
-    if not book_id: return JsonResponse({'chapters': [], 'is_date_based': False})
-    
-    days = Word.objects.filter(book_id=book_id).values_list('number', flat=True).distinct().order_by('number')
-    book = WordBook.objects.get(id=book_id)
-    is_date_based = (book.publisher and book.publisher.name == "개인단어장")
-    
-    chapter_list = []
-    for d in days:
-        label = f"Day {d}"
-        if is_date_based:
-            month = d // 100; day = d % 100
-            label = f"{month}월 {day}일"
-        chapter_list.append({'value': d, 'label': label})
-        
-    return JsonResponse({'chapters': chapter_list, 'is_date_based': is_date_based})
+    # 단어장 목록 캐시에서 Day 목록 (Day별 단어 수 포함)
+    book = catalog.get_book_entry(request.GET.get('book_id'))
+    if not book: return JsonResponse({'chapters': [], 'is_date_based': False})
+    return JsonResponse({'chapters': book['chapters'], 'is_date_based': book['is_date_based']})
+
+HISTORY_CACHE_TTL = 60 * 60 * 24
+
+def _history_results(profile, start, end):
+    """기간 내 도전모드 결과 (틀린 답안만 Prefetch -> 결과 수와 상관없이 쿼리 2번)"""
+    return TestResult.objects.filter(
+        student=profile, created_at__gte=start, created_at__lt=end
+    ).select_related('book').prefetch_related(
+        Prefetch('details', queryset=TestResultDetail.objects.filter(is_correct=False).order_by('id'), to_attr='wrong_details')
+    ).order_by('-created_at')
+
+def _history_row(r):
+    return {
+        'time': r.created_at.strftime('%H:%M'),
+        'book_title': r.book.title,
+        'score': r.score,
+        'total': r.score + r.wrong_count, 
+        'wrong_words': [{'word': d.word_question, 'answer': d.correct_answer} for d in r.wrong_details],
+        'wrong_count': r.wrong_count
+    }
 
 @login_required
 def api_date_history(request):
@@ -726,28 +919,37 @@ def api_date_history(request):
     if hasattr(request.user, 'profile'): profile = request.user.profile
     else: return JsonResponse({'status': 'error', 'message': 'No Profile'})
     
-    results = TestResult.objects.filter(
-        student=profile, created_at__date=target_date
-    ).select_related('book').prefetch_related('details').order_by('-created_at')
-
-    data = []
-    for r in results:
-        wrong_details = r.details.filter(is_correct=False)
-        wrong_words = []
-        for d in wrong_details:
-            wrong_words.append({'word': d.word_question, 'answer': d.correct_answer})
-
-        data.append({
-            'time': r.created_at.strftime('%H:%M'),
-            'book_title': r.book.title,
-            'score': r.score,
-            'total': r.score + r.wrong_count, 
-            'wrong_words': wrong_words,
-            'wrong_count': r.wrong_count
-        })
+    results = _history_results(profile, target_date, target_date + timedelta(days=1))
+    data = [_history_row(r) for r in results]
 
     return JsonResponse({'status': 'success', 'date': date_str, 'exams': data})
 
+@login_required
+def api_month_history(request):
+    """달력용: 한 달치 시험 기록을 날짜별로 한 번에 (학생의 마지막 결과 id 기준으로 캐시)"""
+    month_str = request.GET.get('month')
+    if not month_str: return JsonResponse({'status': 'error', 'message': 'Invalid request'})
+    try: start = datetime.datetime.strptime(month_str, '%Y-%m').date()
+    except ValueError: return JsonResponse({'status': 'error', 'message': 'Invalid month format'})
+
+    if hasattr(request.user, 'profile'): profile = request.user.profile
+    else: return JsonResponse({'status': 'error', 'message': 'No Profile'})
+
+    end = (start + timedelta(days=32)).replace(day=1)
+    # 새 시험(마지막 id) / 삭제(개수) / 정답 인정(점수 합)이 있으면 키가 바뀜
+    stamp = TestResult.objects.filter(student=profile, created_at__gte=start, created_at__lt=end).aggregate(
+        last_id=Max('id'), count=Count('id'), total=Sum('score')
+    )
+    cache_key = f"vocab:history:{profile.id}:{month_str}:{stamp['last_id']}:{stamp['count']}:{stamp['total']}"
+    days = cache.get(cache_key)
+    if days is None:
+        days = {}
+        for r in _history_results(profile, start, end):
+            days.setdefault(r.created_at.strftime('%Y-%m-%d'), []).append(_history_row(r))
+        cache.set(cache_key, days, HISTORY_CACHE_TTL)
+
+    return JsonResponse({'status': 'success', 'month': month_str, 'days': days})
+
 @login_required
 def wrong_word_list(request):
     if not hasattr(request.user, 'profile'): return redirect('vocab:index')